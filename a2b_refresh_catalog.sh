@@ -5,6 +5,15 @@
 
 cd "$(dirname "$0")"
 
+# --delta: apply only what changed to a copy of the live catalog, validate it
+# and publish it as a new version (the live file is not touched), and write
+# backend/app/data/catalog_changes.json (changed / removed sets).
+DELTA=0
+if [ "${1:-}" = "--delta" ]; then
+  DELTA=1
+fi
+export DELTA
+
 CSV_DIR="csv"
 DB_PATH="backend/app/data/lego_catalog.db"
 
@@ -31,18 +40,30 @@ for name in "${FILES[@]}"; do
   URL="https://rebrickable.com/media/downloads/${name}.csv.gz"
   echo "  • $name"
   curl -fsSLO "$URL"
-  gunzip -f "${name}.csv.gz"
+  # The importer reads .csv.gz directly; a stale plain .csv would shadow it.
+  rm -f "${name}.csv"
 done
 popd >/dev/null
 
 echo "🧹 Rebuilding catalog database at $DB_PATH"
-rm -f "$DB_PATH"
+# Builds a new file under backend/app/data/catalogs/, validates it and swaps
+# the $DB_PATH symlink over to it (element_images is carried over). The API
+# keeps serving the previous catalog until the swap and needs no restart.
 
 python - <<'PY'
-from catalog_import.import_csv import import_catalog
+from catalog_import.import_csv import import_catalog, import_catalog_delta
 import json
+import os
 
-result = import_catalog("csv")
+if os.environ.get("DELTA") == "1":
+    result = import_catalog_delta(
+        "csv", report=print, manifest_path="backend/app/data/catalog_changes.json"
+    )
+    # Full lists are in catalog_changes.json.
+    for key in ("sets", "removed_sets", "parts"):
+        result["manifest"][key] = len(result["manifest"][key])
+else:
+    result = import_catalog("csv", bulk=True, report=print)
 print(json.dumps(result, indent=2))
 PY
 
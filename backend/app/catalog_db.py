@@ -1,17 +1,71 @@
 from pathlib import Path
 from contextlib import contextmanager
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from typing import Callable, FrozenSet, Generic, Hashable, List, Dict, Any, Optional, Tuple, TypeVar, Union
+import os
 import sqlite3
+import threading
+import time
+import weakref
 
-# Path to lego_catalog.db
+# Path to lego_catalog.db. The importer publishes each catalog as a versioned
+# file under data/catalogs/ and atomically repoints this symlink at it.
 BASE_DIR = Path(__file__).resolve().parent
 DB_PATH = BASE_DIR / "data" / "lego_catalog.db"
 
+# Every CatalogCache / CatalogResultCache, cleared when a new catalog is published.
+_CACHES: "weakref.WeakSet[Any]" = weakref.WeakSet()
+_SWAP_LOCK = threading.Lock()
+_ACTIVE: Optional[str] = None
+_SWAPS = 0
+
+
+def catalog_path(path: Union[str, Path, None] = None) -> str:
+    """
+    The catalog file `path` (default DB_PATH) currently points at.
+
+    Connections and caches resolve the symlink once and then stick to that
+    file, so one request never mixes two catalog versions; connections still
+    open on the previous file finish on it (its inode outlives the swap).
+    The first call that sees DB_PATH on a new target drops every in-process
+    catalog cache, so the memory held for the old version is released.
+    """
+    pointer = Path(path) if path is not None else DB_PATH
+    resolved = os.path.realpath(pointer)
+    if pointer == DB_PATH:
+        _note_active(resolved)
+    return resolved
+
+
+def _note_active(resolved: str) -> None:
+    global _ACTIVE, _SWAPS
+    if resolved == _ACTIVE:
+        return
+    with _SWAP_LOCK:
+        if resolved == _ACTIVE:
+            return
+        previous, _ACTIVE = _ACTIVE, resolved
+        if previous is None:
+            return
+        _SWAPS += 1
+    for cache in list(_CACHES):
+        cache.clear()
+
+
+def catalog_status() -> Dict[str, Any]:
+    """Published catalog file and how many swaps this process has seen."""
+    path = catalog_path()
+    return {
+        "file": os.path.basename(path),
+        "version": catalog_version(path),
+        "swaps_seen": _SWAPS,
+    }
+
 
 @contextmanager
 def db():
     """Simple SQLite connection helper with row dicts."""
-    con = sqlite3.connect(DB_PATH)
+    con = sqlite3.connect(catalog_path())
     con.row_factory = sqlite3.Row
     try:
         yield con
@@ -19,6 +73,217 @@ def db():
         con.close()
 
 
+def catalog_version(path: Union[str, Path, None] = None) -> Optional[Tuple[int, int, int]]:
+    """
+    Cheap identity of the catalog file: (inode, mtime_ns, size).
+    Changes when the DB is rebuilt (new file) or rewritten in place.
+    None if the file is missing.
+    """
+    try:
+        st = os.stat(path if path is not None else catalog_path())
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+T = TypeVar("T")
+
+
+class CatalogCache(Generic[T]):
+    """
+    One value derived from lego_catalog.db, rebuilt on first use after the
+    catalog version changes. build(path) gets the DB path it should read.
+    """
+
+    def __init__(self, build: Callable[[str], T]):
+        self._build = build
+        self._lock = threading.Lock()
+        self._key: Any = None
+        self._value: Optional[T] = None
+        _CACHES.add(self)
+
+    def get(self, path: Union[str, Path, None] = None) -> T:
+        path = catalog_path(path)
+        key = (path, catalog_version(path))
+        with self._lock:
+            if self._key != key or self._value is None:
+                self._value = self._build(path)
+                self._key = key
+            return self._value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._key = None
+            self._value = None
+
+
+def _table_names(path: str) -> FrozenSet[str]:
+    con = sqlite3.connect(path)
+    try:
+        return frozenset(
+            r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        )
+    finally:
+        con.close()
+
+
+_TABLE_NAMES: CatalogCache[FrozenSet[str]] = CatalogCache(_table_names)
+
+
+def has_catalog_table(name: str) -> bool:
+    """True if lego_catalog.db has this table (checked once per catalog version)."""
+    if catalog_version() is None:
+        return False
+    return name in _TABLE_NAMES.get()
+
+
+def element_images_table() -> str:
+    """
+    Table for exact (part_num, color_id) image lookups.
+
+    element_images_resolved is element_images minus blank urls, built by the
+    importer / refresh_image_tables; catalogs built before it existed fall
+    back to the raw table.
+    """
+    if has_catalog_table("element_images_resolved"):
+        return "element_images_resolved"
+    return "element_images"
+
+
+def _read_stamp(path: str) -> str:
+    con = sqlite3.connect(path)
+    try:
+        row = con.execute("SELECT value FROM catalog_meta WHERE key = 'version'").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    finally:
+        con.close()
+    if row:
+        return str(row[0])
+    # Catalog built before catalog_meta: fall back to the file identity.
+    return "f-" + "-".join(str(x) for x in (catalog_version(path) or ()))
+
+
+_STAMP: CatalogCache[str] = CatalogCache(_read_stamp)
+
+
+def catalog_stamp() -> Optional[str]:
+    """
+    Content version of lego_catalog.db written by the importer
+    (catalog_meta.version). Same value on every replica serving the same
+    import, so it is safe to build ETags from. None if the catalog is missing.
+    """
+    if catalog_version() is None:
+        return None
+    return _STAMP.get()
+
+
+def _load_colors(path: str) -> Dict[int, Dict[str, Any]]:
+    con = sqlite3.connect(path)
+    try:
+        rows = con.execute("SELECT color_id, name, rgb, is_trans FROM colors").fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    finally:
+        con.close()
+    return {
+        int(cid): {"color_name": name, "rgb": rgb or None, "is_trans": bool(is_trans)}
+        for cid, name, rgb, is_trans in rows
+    }
+
+
+_COLORS: CatalogCache[Dict[int, Dict[str, Any]]] = CatalogCache(_load_colors)
+
+
+def colors_map() -> Dict[int, Dict[str, Any]]:
+    """color_id -> {color_name, rgb, is_trans}, loaded once per catalog version."""
+    if catalog_version() is None:
+        return {}
+    return _COLORS.get()
+
+
+class CatalogResultCache:
+    """
+    Bounded LRU + TTL cache for values computed from lego_catalog.db.
+    Everything is dropped when the catalog version changes (DB rebuilt).
+    Cached values are shared between callers: treat them as read-only.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int = 512, ttl: float = 300.0):
+        self.maxsize = max(int(maxsize), 0)
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._version: Any = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        _CACHES.add(self)
+
+    def _check_version(self, path: Union[str, Path, None]) -> None:
+        # caller holds the lock
+        path = catalog_path(path)
+        version = (path, catalog_version(path))
+        if version != self._version:
+            if self._data:
+                self.invalidations += 1
+            self._data.clear()
+            self._version = version
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], T],
+        path: Union[str, Path, None] = None,
+    ) -> T:
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(path)
+            entry = self._data.get(key, self._MISSING)
+            if entry is not self._MISSING and entry[0] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            version = self._version
+
+        value = compute()
+        if self.maxsize == 0:
+            return value
+
+        with self._lock:
+            self._check_version(path)
+            if self._version != version:
+                return value  # catalog swapped while computing; don't cache
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
 def _normalise_set_id(set_num: str) -> str:
     """
     Normalise a set id so both "70618" and "70618-1" work.
@@ -59,7 +324,8 @@ def get_catalog_parts_for_set(set_num: str) -> List[Dict[str, Any]]:
       each row must include: part_num, color_id, quantity (int)
 
     Image source of truth:
-      element_images(part_num, color_id, img_url)
+      element_images(part_num, color_id, img_url), read through
+      element_images_resolved (see element_images_table)
     """
     set_id = _normalise_set_id(set_num)
     if not set_id:
@@ -72,18 +338,20 @@ def get_catalog_parts_for_set(set_num: str) -> List[Dict[str, Any]]:
         ).fetchone()
         return row is not None
 
+    images = element_images_table()
+
     with db() as con:
         # Prefer instruction-derived requirements if present
         if False and _table_exists(con, "instruction_set_requirements"):
             cur = con.execute(
-                """
+                f"""
                 SELECT
                     r.part_num,
                     r.color_id,
                     r.qty AS quantity,
                     ei.img_url AS img_url
                 FROM instruction_set_requirements AS r
-                LEFT JOIN element_images AS ei
+                LEFT JOIN {images} AS ei
                   ON ei.part_num = r.part_num AND ei.color_id = r.color_id
                 WHERE r.set_num = ?
                 ORDER BY r.part_num, r.color_id
@@ -95,14 +363,14 @@ def get_catalog_parts_for_set(set_num: str) -> List[Dict[str, Any]]:
         # Otherwise fall back to set_parts
         elif _table_exists(con, "set_parts"):
             cur = con.execute(
-                """
+                f"""
                 SELECT
                     sp.part_num,
                     sp.color_id,
                     sp.qty_per_set AS quantity,
                     ei.img_url AS img_url
                 FROM set_parts AS sp
-                LEFT JOIN element_images AS ei
+                LEFT JOIN {images} AS ei
                   ON ei.part_num = sp.part_num AND ei.color_id = sp.color_id
                 WHERE sp.set_num = ?
                 ORDER BY sp.part_num, sp.color_id
@@ -114,14 +382,14 @@ def get_catalog_parts_for_set(set_num: str) -> List[Dict[str, Any]]:
         else:
             # Last resort: inventory_parts_summary, but keep the same contract
             cur = con.execute(
-                """
+                f"""
                 SELECT
                     s.part_num,
                     s.color_id,
                     s.quantity AS quantity,
                     ei.img_url AS img_url
                 FROM inventory_parts_summary AS s
-                LEFT JOIN element_images AS ei
+                LEFT JOIN {images} AS ei
                   ON ei.part_num = s.part_num AND ei.color_id = s.color_id
                 WHERE s.set_num = ?
                 ORDER BY s.part_num, s.color_id
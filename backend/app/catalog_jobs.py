@@ -0,0 +1,80 @@
+"""
+Background rebuild of the derived catalog tables (top_common_parts*).
+
+The work runs in its own process (python -m catalog_import.derived_job), not
+in a request: the API only starts it and reads the JSON status file it keeps
+up to date. The job rebuilds the tables on a copy of the live catalog and
+publishes it as a new version (catalog_import/publish.py), so readers keep
+being served from the current version until the swap. One job at a time.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from app.paths import DATA_DIR
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+STATUS_PATH = DATA_DIR / "catalog_derived_job.json"
+LOG_PATH = DATA_DIR / "catalog_derived_job.log"
+
+_LOCK = threading.Lock()
+_PROC: Optional[subprocess.Popen] = None
+
+
+def _pid_alive(pid: Any) -> bool:
+    if not isinstance(pid, int):
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _own_job_running() -> bool:
+    # poll() also reaps the finished child, so its pid stops looking alive.
+    return _PROC is not None and _PROC.poll() is None
+
+
+def derived_job_status() -> Dict[str, Any]:
+    """Last written job status, or {"state": "idle"} if no job ever ran."""
+    running = _own_job_running()
+    try:
+        status = json.loads(STATUS_PATH.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        status = {"state": "idle"}
+    if running and status.get("pid") != _PROC.pid:
+        # Started, but the job has not written its first status yet.
+        return {"state": "running", "pid": _PROC.pid, "step": None, "done": 0, "total": None}
+    if status.get("state") == "running" and not _pid_alive(status.get("pid")):
+        status["state"] = "failed"
+        status["error"] = status.get("error") or "job exited without finishing"
+    return status
+
+
+def start_derived_job() -> Tuple[bool, Dict[str, Any]]:
+    """Start a rebuild unless one is running. Returns (started, status)."""
+    global _PROC
+    with _LOCK:
+        status = derived_job_status()
+        if status.get("state") == "running":
+            return False, status
+        with open(LOG_PATH, "ab") as log:
+            _PROC = subprocess.Popen(
+                [
+                    sys.executable, "-m", "catalog_import.derived_job",
+                    "--status", str(STATUS_PATH),
+                ],
+                cwd=REPO_DIR,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+        return True, derived_job_status()
@@ -0,0 +1,31 @@
+import base64
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """
+    Opaque keyset cursor: urlsafe base64 of compact JSON.
+    Clients must treat it as a token and send it back unchanged.
+    """
+    raw = json.dumps(values, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Inverse of encode_cursor. Empty -> None, garbage -> HTTP 400.
+    """
+    s = (token or "").strip()
+    if not s:
+        return None
+    try:
+        padded = s + "=" * (-len(s) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return data
@@ -17,27 +17,8 @@ def db():
 
 
 def init_db():
-    with db() as con:
-        con.executescript(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-              id INTEGER PRIMARY KEY AUTOINCREMENT,
-              email TEXT NOT NULL UNIQUE,
-              password_hash TEXT NOT NULL,
-              created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-            );
-
-            CREATE TABLE IF NOT EXISTS password_reset_tokens (
-              id INTEGER PRIMARY KEY AUTOINCREMENT,
-              user_id INTEGER NOT NULL,
-              token_hash TEXT NOT NULL,
-              expires_at TEXT NOT NULL,
-              used_at TEXT,
-              created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-              FOREIGN KEY (user_id) REFERENCES users(id)
-            );
+    """Bring aim2build_app.db up to the latest schema (see app.migrations)."""
+    from app.migrations import apply_migrations
 
-            CREATE INDEX IF NOT EXISTS idx_password_reset_token_hash
-            ON password_reset_tokens(token_hash);
-            """
-        )
\ No newline at end of file
+    with db() as con:
+        apply_migrations(con)
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from app.catalog_db import db  # same db helper inventory was using for element_images
+from app.catalog_db import db, element_images_table
 
 
 def get_strict_element_image(part_num: str, color_id: int) -> Optional[str]:
@@ -8,8 +8,9 @@ def get_strict_element_image(part_num: str, color_id: int) -> Optional[str]:
     STRICT image lookup using lego_catalog.db element_images table.
 
     Rules:
-      - Look up EXACT (part_num, color_id) in element_images.
-      - If no row or blank URL -> return None.
+      - Look up EXACT (part_num, color_id) in element_images
+        (element_images_resolved: blank URLs already dropped).
+      - If no row -> return None.
       - No fallback to other colours or parent parts.
     """
     if not part_num or color_id is None:
@@ -17,14 +18,11 @@ def get_strict_element_image(part_num: str, color_id: int) -> Optional[str]:
 
     with db() as con:
         cur = con.execute(
-            """
+            f"""
             SELECT img_url
-            FROM element_images
+            FROM {element_images_table()}
             WHERE part_num = ?
               AND color_id = ?
-              AND img_url IS NOT NULL
-              AND TRIM(img_url) != ''
-            LIMIT 1
             """,
             (part_num, color_id),
         )
@@ -156,6 +156,19 @@ app.include_router(
     tags=["catalog"],
 )
 
+# Derived catalog tables, built at import (read-only)
+app.include_router(
+    top_common_parts.router,
+    prefix="/api/catalog",
+    tags=["catalog"],
+)
+
+app.include_router(
+    top_common_parts_by_color.router,
+    prefix="/api/catalog",
+    tags=["catalog"],
+)
+
 app.include_router(
     buildability_discover.router,
     prefix="/api/buildability",
@@ -0,0 +1,320 @@
+"""
+Versioned schema migrations for the USER DB (aim2build_app.db).
+
+Applied once at startup by app.db.init_db(); request handlers never run DDL.
+
+Rules:
+  - Append new migrations at the end with the next version number.
+  - Never edit or reorder a migration that has shipped.
+  - Statements use IF NOT EXISTS so DBs created by the old per-request
+    _ensure_* helpers (same schema) upgrade cleanly.
+"""
+
+import sqlite3
+from typing import Callable, List, Sequence, Tuple
+
+Migration = Tuple[int, str, Callable[[sqlite3.Connection], None]]
+
+
+def _sql(*statements: str) -> Callable[[sqlite3.Connection], None]:
+    def apply(con: sqlite3.Connection) -> None:
+        for stmt in statements:
+            con.execute(stmt)
+
+    return apply
+
+
+def _columns(con: sqlite3.Connection, table: str) -> set:
+    return {r[1] for r in con.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def _add_poured_floor(con: sqlite3.Connection) -> None:
+    # poured_floor = SUM(user_set_pour_lines.qty) for the lot, maintained by
+    # pour-set / unpour-set so mutations can check it in the same statement.
+    if "poured_floor" in _columns(con, "user_inventory_parts"):
+        return
+    con.execute(
+        "ALTER TABLE user_inventory_parts "
+        "ADD COLUMN poured_floor INTEGER NOT NULL DEFAULT 0"
+    )
+    con.execute(
+        """
+        UPDATE user_inventory_parts
+        SET poured_floor = COALESCE((
+          SELECT SUM(l.qty)
+          FROM user_set_pour_lines AS l
+          WHERE l.user_id = user_inventory_parts.user_id
+            AND l.part_num = user_inventory_parts.part_num
+            AND l.color_id = user_inventory_parts.color_id
+        ), 0)
+        """
+    )
+
+
+def _add_stats_breakdowns(con: sqlite3.Connection) -> None:
+    # Per-colour / per-category counters kept current by every mutation,
+    # replacing the by_color / by_category JSON caches (left NULL from now
+    # on). breakdowns = 1 when a user's counter rows are current; 0 makes
+    # the next /stats read rebuild them.
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_inventory_stats_color (
+          user_id INTEGER NOT NULL,
+          color_id INTEGER NOT NULL,
+          pieces INTEGER NOT NULL DEFAULT 0,
+          lots INTEGER NOT NULL DEFAULT 0,
+          PRIMARY KEY (user_id, color_id)
+        ) WITHOUT ROWID
+        """
+    )
+    # part_cat_id -1: part not found in the catalog.
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_inventory_stats_category (
+          user_id INTEGER NOT NULL,
+          part_cat_id INTEGER NOT NULL,
+          pieces INTEGER NOT NULL DEFAULT 0,
+          lots INTEGER NOT NULL DEFAULT 0,
+          PRIMARY KEY (user_id, part_cat_id)
+        ) WITHOUT ROWID
+        """
+    )
+    if "breakdowns" not in _columns(con, "user_inventory_stats"):
+        con.execute(
+            "ALTER TABLE user_inventory_stats "
+            "ADD COLUMN breakdowns INTEGER NOT NULL DEFAULT 0"
+        )
+    con.execute("UPDATE user_inventory_stats SET by_color = NULL, by_category = NULL")
+
+
+def _add_event_counts(con: sqlite3.Connection) -> None:
+    # events = the user's rows in user_inventory_events, kept by every journal
+    # write and by compaction, so the compaction check needs no index walk.
+    if "events" not in _columns(con, "user_inventory_event_floor"):
+        con.execute(
+            "ALTER TABLE user_inventory_event_floor "
+            "ADD COLUMN events INTEGER NOT NULL DEFAULT 0"
+        )
+    con.execute(
+        """
+        INSERT INTO user_inventory_event_floor(user_id, events)
+        SELECT user_id, COUNT(*) FROM user_inventory_events WHERE true GROUP BY user_id
+        ON CONFLICT(user_id) DO UPDATE SET events = excluded.events
+        """
+    )
+
+
+MIGRATIONS: Sequence[Migration] = (
+    (
+        1,
+        "users",
+        _sql(
+            """
+            CREATE TABLE IF NOT EXISTS users (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              email TEXT NOT NULL UNIQUE,
+              password_hash TEXT NOT NULL,
+              created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        ),
+    ),
+    (
+        2,
+        "password_resets (single reset-token table)",
+        _sql(
+            """
+            CREATE TABLE IF NOT EXISTS password_resets (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              user_id INTEGER NOT NULL,
+              token_hash TEXT NOT NULL,
+              expires_at TEXT NOT NULL,
+              used INTEGER NOT NULL DEFAULT 0,
+              created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+              FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_password_resets_token_hash
+            ON password_resets(token_hash)
+            """,
+            # Legacy duplicate created by the old init_db; never read by auth.
+            "DROP TABLE IF EXISTS password_reset_tokens",
+        ),
+    ),
+    (
+        3,
+        "inventory core tables",
+        _sql(
+            """
+            CREATE TABLE IF NOT EXISTS user_inventory_parts (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              user_id INTEGER NOT NULL,
+              part_num TEXT NOT NULL,
+              color_id INTEGER NOT NULL,
+              qty INTEGER NOT NULL DEFAULT 0,
+              UNIQUE(user_id, part_num, color_id),
+              FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS user_inventory_sets (
+              user_id INTEGER,
+              set_num TEXT,
+              count INTEGER DEFAULT 1,
+              PRIMARY KEY(user_id, set_num)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS user_set_pour_lines (
+              user_id INTEGER NOT NULL,
+              set_num TEXT NOT NULL,
+              part_num TEXT NOT NULL,
+              color_id INTEGER NOT NULL,
+              qty INTEGER NOT NULL DEFAULT 0,
+              PRIMARY KEY (user_id, set_num, part_num, color_id)
+            )
+            """,
+        ),
+    ),
+    (4, "user_inventory_parts.poured_floor", _add_poured_floor),
+    (
+        5,
+        "inventory indexes",
+        _sql(
+            """
+            CREATE INDEX IF NOT EXISTS idx_user_set_pour_lines_part
+            ON user_set_pour_lines(user_id, part_num, color_id)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_user_inventory_parts_qty_asc
+            ON user_inventory_parts(user_id, qty, part_num, color_id)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_user_inventory_parts_qty_desc
+            ON user_inventory_parts(user_id, qty DESC, part_num, color_id)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_user_inventory_parts_color
+            ON user_inventory_parts(user_id, color_id, part_num)
+            """,
+        ),
+    ),
+    (
+        6,
+        "inventory change journal",
+        # seq is global and monotonic; clients only compare it to their own
+        # cursor. event_floor holds the highest seq removed by compaction.
+        _sql(
+            """
+            CREATE TABLE IF NOT EXISTS user_inventory_events (
+              seq INTEGER PRIMARY KEY AUTOINCREMENT,
+              user_id INTEGER NOT NULL,
+              part_num TEXT NOT NULL,
+              color_id INTEGER NOT NULL,
+              delta INTEGER NOT NULL,
+              source TEXT NOT NULL,
+              created_at TEXT NOT NULL DEFAULT (datetime('now'))
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_user_inventory_events_user_seq
+            ON user_inventory_events(user_id, seq)
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS user_inventory_event_floor (
+              user_id INTEGER PRIMARY KEY,
+              compacted_seq INTEGER NOT NULL DEFAULT 0
+            )
+            """,
+        ),
+    ),
+    (
+        7,
+        "inventory stats",
+        # Totals maintained by every mutation; by_color / by_category are JSON
+        # caches, NULL = rebuild on read.
+        _sql(
+            """
+            CREATE TABLE IF NOT EXISTS user_inventory_stats (
+              user_id INTEGER PRIMARY KEY,
+              total_pieces INTEGER NOT NULL DEFAULT 0,
+              lots INTEGER NOT NULL DEFAULT 0,
+              by_color TEXT,
+              by_category TEXT,
+              updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+            )
+            """
+        ),
+    ),
+    (
+        8,
+        "my sets",
+        _sql(
+            """
+            CREATE TABLE IF NOT EXISTS user_mysets (
+              user_id INTEGER NOT NULL,
+              set_num TEXT NOT NULL,
+              created_at TEXT DEFAULT (datetime('now')) NOT NULL,
+              PRIMARY KEY(user_id, set_num)
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_user_mysets_user_created
+            ON user_mysets(user_id, created_at)
+            """,
+        ),
+    ),
+    (9, "inventory stats breakdown counters", _add_stats_breakdowns),
+    (10, "inventory journal per-user event counts", _add_event_counts),
+)
+
+
+def apply_migrations(
+    con: sqlite3.Connection, migrations: Sequence[Migration] = MIGRATIONS
+) -> List[int]:
+    """
+    Apply every migration newer than schema_version, in order, each in its own
+    transaction. Safe to call from several workers at once: the version check
+    happens under BEGIN IMMEDIATE. Returns the versions applied.
+    """
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+          version INTEGER PRIMARY KEY,
+          name TEXT NOT NULL,
+          applied_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+        """
+    )
+    con.commit()
+
+    applied: List[int] = []
+    for version, name, fn in sorted(migrations, key=lambda m: m[0]):
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            row = con.execute(
+                "SELECT 1 FROM schema_version WHERE version = ?", (version,)
+            ).fetchone()
+            if row is not None:
+                con.rollback()
+                continue
+            fn(con)
+            con.execute(
+                "INSERT INTO schema_version(version, name) VALUES (?, ?)",
+                (version, name),
+            )
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+
+def current_version(con: sqlite3.Connection) -> int:
+    try:
+        row = con.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return int(row[0] or 0)
@@ -25,6 +25,13 @@ DEV_RETURN_RESET_TOKEN = os.getenv("AIM2BUILD_DEV_RETURN_RESET_TOKEN", "").strip
     "YES",
 )
 
+# Accounts allowed to run catalog maintenance (comma-separated emails).
+ADMIN_EMAILS = {
+    e.strip().lower()
+    for e in os.getenv("AIM2BUILD_ADMIN_EMAILS", "").split(",")
+    if e.strip()
+}
+
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
@@ -62,29 +69,6 @@ def _hash_token(token: str) -> str:
     return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 
-def _ensure_password_reset_table():
-    with db() as con:
-        con.executescript(
-            """
-            CREATE TABLE IF NOT EXISTS password_resets (
-              id INTEGER PRIMARY KEY AUTOINCREMENT,
-              user_id INTEGER NOT NULL,
-              token_hash TEXT NOT NULL,
-              expires_at TEXT NOT NULL,
-              used INTEGER NOT NULL DEFAULT 0,
-              created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-              FOREIGN KEY (user_id) REFERENCES users(id)
-            );
-            CREATE INDEX IF NOT EXISTS idx_password_resets_token_hash
-            ON password_resets(token_hash);
-            """
-        )
-        con.commit()
-
-
-_ensure_password_reset_table()
-
-
 class RegisterRequest(BaseModel):
     email: EmailStr
     password: str
@@ -130,6 +114,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     return User(id=row["id"], email=row["email"])
 
 
+async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return current_user
+
+
 @router.post("/register")
 def register(payload: RegisterRequest):
     email = payload.email.lower().strip()
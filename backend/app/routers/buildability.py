@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Query, Depends
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Tuple, Set
 
-from app.catalog_db import db, get_catalog_parts_for_set, get_set_num_parts
+from app.catalog_db import db, element_images_table, get_catalog_parts_for_set, get_set_num_parts
 from app.routers.auth import get_current_user, User
 from app.routers.inventory import load_inventory_parts
 
@@ -164,7 +164,7 @@ def compare_buildability(
             with db() as con:
                 query = (
                     "SELECT part_num, color_id, img_url "
-                    "FROM element_images "
+                    f"FROM {element_images_table()} "
                     f"WHERE {' OR '.join(clauses)}"
                 )
                 cur = con.execute(query, params)
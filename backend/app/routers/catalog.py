@@ -1,39 +1,52 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import Optional, List, Dict, Any, Tuple
+import gzip
+import hashlib
+import os
+import random
 import re
-
-from app.catalog_db import db, get_catalog_parts_for_set
+import sqlite3
+
+from app.catalog_db import (
+    catalog_stamp,
+    colors_map,
+    db,
+    element_images_table,
+    get_catalog_parts_for_set,
+    has_catalog_table,
+)
+from app.catalog_jobs import derived_job_status, start_derived_job
+from app.routers.auth import User, require_admin
 
 router = APIRouter()
 
 
-def _resolve_part_img_url_from_db(
-    con,
-    part_num: str,
-    color_id: int,
-) -> Optional[str]:
-    """
-    STRICT image resolution:
-    - element_images is the ONLY source of truth
-    - exact (part_num, color_id) match only
-    - if not found -> None
-    """
-    cur = con.execute(
-        """
-        SELECT ei.img_url
-        FROM element_images ei
-        WHERE ei.part_num = ?
-          AND ei.color_id = ?
-          AND ei.img_url IS NOT NULL
-          AND TRIM(ei.img_url) <> ''
-        LIMIT 1
-        """,
-        (part_num, color_id),
-    )
-    row = cur.fetchone()
-    if not row:
+# Set BOMs only change when the catalog is re-imported; the ETag carries the
+# catalog version, so caches may keep them and revalidate cheaply.
+CATALOG_MAX_AGE = int(os.getenv("AIM2BUILD_CATALOG_MAX_AGE", "3600"))
+
+
+def _catalog_etag(*parts: Any) -> Optional[str]:
+    """Strong ETag for a response that is a pure function of the catalog + parts."""
+    stamp = catalog_stamp()
+    if stamp is None:
         return None
-    return row["img_url"]
+    raw = "|".join([stamp, *(str(p) for p in parts)])
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _cache_headers(etag: str) -> Dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CATALOG_MAX_AGE}",
+    }
 
 
 def _normalize_set_id(raw: str) -> str:
@@ -106,12 +119,62 @@ def get_part_category(part_cat_id: int) -> Dict[str, Any]:
     }
 
 
+def _has_table(con, name: str) -> bool:
+    row = con.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ? LIMIT 1",
+        (name,),
+    ).fetchone()
+    return row is not None
+
+
+def _descendant_ids_sql(con) -> str:
+    """
+    Subquery yielding a category id (bound as ?) and all its descendants:
+    the import-time closure table, or a recursive CTE on older catalogs.
+    """
+    if _has_table(con, "part_category_closure"):
+        return "SELECT descendant_id FROM part_category_closure WHERE ancestor_id = ?"
+    return """
+        WITH RECURSIVE cats(id) AS (
+          SELECT part_cat_id FROM part_categories WHERE part_cat_id = ?
+          UNION ALL
+          SELECT pc.part_cat_id
+          FROM part_categories pc
+          JOIN cats c ON pc.parent_id = c.id
+        )
+        SELECT id FROM cats
+    """
+
+
+def _primary_image_sql(part_num_col: str) -> str:
+    """
+    Any-colour image for a part: lowest non-zero color_id, colour 0 last.
+    A primary-key lookup in part_primary_image when the importer built it.
+    """
+    if has_catalog_table("part_primary_image"):
+        return f"(SELECT ppi.img_url FROM part_primary_image ppi WHERE ppi.part_num = {part_num_col})"
+    return f"""
+        (
+          SELECT ei.img_url
+          FROM element_images ei
+          WHERE ei.part_num = {part_num_col}
+            AND ei.img_url IS NOT NULL
+            AND TRIM(ei.img_url) <> ''
+          ORDER BY
+            CASE WHEN ei.color_id = 0 THEN 1 ELSE 0 END,
+            ei.color_id
+          LIMIT 1
+        )
+    """
+
+
 @router.get("/part-categories/top")
 def list_top_part_categories() -> List[Dict[str, Any]]:
     """
     Return top-level categories (parent_id IS NULL) excluding Duplo/Quatro/Primo.
     Also include a sample_img_url drawn randomly from any part in this category
-    or its descendants (element_images only, exact part_num match, any colour).
+    or its descendants (element_images only, exact part_num match, any colour),
+    picked from the import-time part_category_samples pool.
     """
     with db() as con:
         cur = con.execute(
@@ -127,42 +190,48 @@ def list_top_part_categories() -> List[Dict[str, Any]]:
         )
         top_rows = cur.fetchall()
 
-        out: List[Dict[str, Any]] = []
-        for row in top_rows:
-            cat_id = int(row["part_cat_id"])
-
-            # Recursive CTE to gather descendants for this top category
-            img_cur = con.execute(
+        pools: Dict[int, List[str]] = {}
+        if _has_table(con, "part_category_samples"):
+            for r in con.execute(
                 """
-                WITH RECURSIVE cats(id) AS (
-                  SELECT part_cat_id FROM part_categories WHERE part_cat_id = ?
-                  UNION ALL
-                  SELECT pc.part_cat_id
-                  FROM part_categories pc
-                  JOIN cats c ON pc.parent_id = c.id
-                )
-                SELECT ei.img_url
-                FROM parts p
-                JOIN cats c ON p.part_cat_id = c.id
-                JOIN element_images ei ON ei.part_num = p.part_num
-                WHERE ei.img_url IS NOT NULL
-                  AND TRIM(ei.img_url) <> ''
-                ORDER BY RANDOM()
-                LIMIT 1
-                """,
-                (cat_id,),
-            )
-            img_row = img_cur.fetchone()
-            sample_img = img_row["img_url"] if img_row else None
-
-            out.append(
-                {
-                    "part_cat_id": cat_id,
-                    "name": row["name"],
-                    "parent_id": row["parent_id"],
-                    "sample_img_url": sample_img,
-                }
-            )
+                SELECT s.part_cat_id, s.img_url
+                FROM part_category_samples s
+                JOIN part_categories pc ON pc.part_cat_id = s.part_cat_id
+                WHERE pc.parent_id IS NULL
+                """
+            ):
+                pools.setdefault(int(r["part_cat_id"]), []).append(r["img_url"])
+        else:
+            for row in top_rows:
+                cat_id = int(row["part_cat_id"])
+                img_row = con.execute(
+                    f"""
+                    SELECT ei.img_url
+                    FROM parts p
+                    JOIN element_images ei ON ei.part_num = p.part_num
+                    WHERE p.part_cat_id IN ({_descendant_ids_sql(con)})
+                      AND ei.img_url IS NOT NULL
+                      AND TRIM(ei.img_url) <> ''
+                    ORDER BY RANDOM()
+                    LIMIT 1
+                    """,
+                    (cat_id,),
+                ).fetchone()
+                if img_row:
+                    pools[cat_id] = [img_row["img_url"]]
+
+    out: List[Dict[str, Any]] = []
+    for row in top_rows:
+        cat_id = int(row["part_cat_id"])
+        pool = pools.get(cat_id)
+        out.append(
+            {
+                "part_cat_id": cat_id,
+                "name": row["name"],
+                "parent_id": row["parent_id"],
+                "sample_img_url": random.choice(pool) if pool else None,
+            }
+        )
 
     return out
 
@@ -175,37 +244,28 @@ def parts_by_category(
 ) -> List[Dict[str, Any]]:
     """
     Return parts for a category and all its descendants.
-    Images are strict from element_images (any colour, exact part_num match).
+    Images are strict from element_images (any colour, exact part_num match),
+    via part_primary_image.
     """
     with db() as con:
+        # Page first, then resolve images for the page rows only.
         cur = con.execute(
-            """
-            WITH RECURSIVE cats(id) AS (
-              SELECT part_cat_id FROM part_categories WHERE part_cat_id = ?
-              UNION ALL
-              SELECT pc.part_cat_id
-              FROM part_categories pc
-              JOIN cats c ON pc.parent_id = c.id
-            )
+            f"""
             SELECT
-              p.part_num,
-              p.name AS part_name,
-              p.part_cat_id,
-              (
-                SELECT ei.img_url
-                FROM element_images ei
-                WHERE ei.part_num = p.part_num
-                  AND ei.img_url IS NOT NULL
-                  AND TRIM(ei.img_url) <> ''
-                ORDER BY
-                  CASE WHEN ei.color_id = 0 THEN 1 ELSE 0 END,
-                  ei.color_id
-                LIMIT 1
-              ) AS part_img_url
-            FROM parts p
-            WHERE p.part_cat_id IN (SELECT id FROM cats)
-            ORDER BY p.part_num
-            LIMIT ? OFFSET ?
+              pg.part_num,
+              pg.part_name,
+              pg.part_cat_id,
+              {_primary_image_sql("pg.part_num")} AS part_img_url
+            FROM (
+              SELECT p.part_num, p.name AS part_name, p.part_cat_id
+              FROM parts p
+              WHERE p.part_cat_id IN ({_descendant_ids_sql(con)})
+              -- "+": sort the category's rows; walking parts in part_num
+              -- order until LIMIT matches reads most of the table.
+              ORDER BY +p.part_num
+              LIMIT ? OFFSET ?
+            ) pg
+            ORDER BY pg.part_num
             """,
             (int(category_id), int(limit), int(offset)),
         )
@@ -224,10 +284,18 @@ def parts_by_category(
 
 @router.get("/parts")
 def get_catalog_parts(
+    request: Request,
+    response: Response,
     set: Optional[str] = Query(None, description="LEGO set number (alias: set_num, id)"),
     set_num: Optional[str] = Query(None),
     id: Optional[str] = Query(None),
-) -> List[Dict[str, Any]]:
+) -> Any:
+    """
+    Set BOM: one row per (part_num, color_id) with quantity, exact-match image
+    and colour name / rgb. One catalog query; colours come from the cached
+    colours map. Sends a strong ETag (catalog version + set) and answers a
+    matching If-None-Match with 304.
+    """
     raw = set_num or set or id
     if not raw:
         raise HTTPException(
@@ -236,6 +304,10 @@ def get_catalog_parts(
         )
 
     set_id = _normalize_set_id(raw)
+    etag = _catalog_etag("parts", set_id)
+    if etag and _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=_cache_headers(etag))
+
     base_parts = get_catalog_parts_for_set(set_id)
 
     if not base_parts:
@@ -244,27 +316,107 @@ def get_catalog_parts(
             detail=f"No catalog parts found for set {set_id}",
         )
 
-    enriched: List[Dict[str, Any]] = []
-    with db() as con:
-        for row in base_parts:
-            part_num = str(row["part_num"])
-            color_id = int(row["color_id"])
-            quantity = int(row["quantity"])
-
-            img = _resolve_part_img_url_from_db(con, part_num, color_id)
-
-            enriched.append(
-                {
-                    "part_num": part_num,
-                    "color_id": color_id,
-                    "quantity": quantity,
-                    "part_img_url": img,
-                }
-            )
+    colors = colors_map()
+    no_color: Dict[str, Any] = {"color_name": None, "rgb": None, "is_trans": False}
+    enriched: List[Dict[str, Any]] = [
+        {
+            "part_num": str(row["part_num"]),
+            "color_id": int(row["color_id"]),
+            "quantity": int(row["quantity"]),
+            "part_img_url": row["img_url"],
+            **colors.get(int(row["color_id"]), no_color),
+        }
+        for row in base_parts
+    ]
 
+    if etag:
+        response.headers.update(_cache_headers(etag))
     return enriched
 
 
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        q = params.strip()
+        if not q.startswith("q="):
+            return True
+        try:
+            return float(q[2:]) > 0
+        except ValueError:
+            # Malformed weight: take it as the default q=1.
+            return True
+    return False
+
+
+@router.get("/sets/{set_num}/bundle")
+def get_set_bundle(set_num: str, request: Request) -> Response:
+    """
+    Precompiled set page bundle: {set, parts, totals} built at import
+    (catalog_import set_bundles). Clients that accept gzip get the stored
+    bytes as-is (Content-Encoding: gzip); others get them decompressed.
+    ETag is a hash of the bundle content, so it survives re-imports that
+    do not change the set.
+    """
+    sn = (set_num or "").strip()
+    if not sn:
+        raise HTTPException(status_code=400, detail="set_num is required")
+    if "-" not in sn:
+        sn = f"{sn}-1"
+
+    if not has_catalog_table("set_bundles"):
+        raise HTTPException(status_code=503, detail="set bundles not built; re-import the catalog")
+
+    with db() as con:
+        row = con.execute(
+            "SELECT etag, gz FROM set_bundles WHERE set_num = ?", (sn,)
+        ).fetchone()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"No bundle for set {sn}")
+
+    headers = _cache_headers(f'"{row["etag"]}"')
+    headers["Vary"] = "Accept-Encoding"
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if _accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=bytes(row["gz"]), media_type="application/json", headers=headers)
+    return Response(content=gzip.decompress(row["gz"]), media_type="application/json", headers=headers)
+
+
+_PART_STOP_WORDS = {
+    "brick", "bricks", "plate", "plates", "tile", "tiles",
+    "with", "and", "or", "the", "a", "an", "of",
+    "x", "by",
+}
+
+
+def _part_query_terms(term: str) -> Tuple[Optional[Tuple[int, int]], List[str], List[str]]:
+    """
+    Split a worded part query into (dims, tokens, words):
+      dims    first "N x M" in the query, or None
+      tokens  words minus stop words (AND-matched against the name)
+      words   every word, used as a phrase when all of them are stop words
+    """
+    ql = term.lower().strip()
+    m = re.search(r"(\d+)\s*[xX]\s*(\d+)", ql)
+    dims = (int(m.group(1)), int(m.group(2))) if m else None
+    words = re.findall(r"[a-z0-9]+", ql)
+    tokens = [t for t in words if t not in _PART_STOP_WORDS]
+    return dims, tokens, words
+
+
+def _has_part_search(con) -> bool:
+    """True when the importer built parts_search / parts_fts and this SQLite can read them."""
+    try:
+        con.execute("SELECT 1 FROM parts_search, parts_fts LIMIT 0")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
 @router.get("/parts/search")
 def search_parts(
     q: Optional[str] = Query(None, description="Search term for part_num or name"),
@@ -285,55 +437,165 @@ def search_parts(
           order: exact first, then short suffixes, then longer
         - otherwise: treat as PREFIX -> p.part_num LIKE '<term>%'
     - If q HAS spaces/words (e.g. 'brick 2 x 4'):
-        - search by NAME tokens (AND-match) against lower(p.name)
+        - search by NAME tokens (AND-match, word prefix) via parts_fts
         - ignore stopwords like brick/plate/tile/x/by/and/the/etc.
-        - if dims like '2 x 4' present, require that substring too
+        - if dims like '2 x 4' present, require '2 x 4' or '4 x 2' in the name;
+          parts whose footprint is exactly that come first
 
     Image rules:
     - element_images is the ONLY truth source
     - If color_id provided: STRICT (part_num, color_id)
-    - If color_id NOT provided: pick lowest available element_images.color_id
+    - If color_id NOT provided: part_primary_image (lowest non-zero
+      color_id, colour 0 last), copied into parts_search.primary_img_url
     - Sticker categories => NULL image always
     """
     term = (q or "").strip()
     if not term:
         return []
 
-    is_digits_only = term.isdigit()
+    with db() as con:
+        if _has_part_search(con):
+            rows = _search_parts_indexed(con, term, category_id, color_id, limit, offset)
+        else:
+            rows = _search_parts_like(con, term, category_id, color_id, limit, offset)
+
+    return [
+        {
+            "part_num": r["part_num"],
+            "name": r["name"],
+            "part_img_url": r["part_img_url"],
+            "image_exists": int(r["image_exists"]) if r["image_exists"] is not None else 0,
+        }
+        for r in rows
+    ]
+
+
+def _part_order_sql(term: str, has_spaces: bool, col: str) -> Tuple[str, List[Any]]:
+    if (not has_spaces) and term.isdigit():
+        return (
+            f"""
+            CASE
+              WHEN {col} = ? THEN 0
+              WHEN LENGTH({col}) = ? THEN 1
+              ELSE 2
+            END,
+            LENGTH({col}) ASC,
+            """,
+            [term, len(term) + 1],
+        )
+    return "", []
+
+
+def _search_parts_indexed(
+    con,
+    term: str,
+    category_id: Optional[int],
+    color_id: Optional[int],
+    limit: int,
+    offset: int,
+) -> List[Any]:
     has_spaces = any(ch.isspace() for ch in term)
 
     clauses: List[str] = []
     params: List[Any] = []
+    rank_sql = ""
+    rank_params: List[Any] = []
+    from_sql = "parts_search ps"
+    key_col = "ps.id"
 
     if category_id is not None:
-        clauses.append("p.part_cat_id = ?")
+        clauses.append("ps.part_cat_id = ?")
         params.append(int(category_id))
 
     if not has_spaces:
-        clauses.append("p.part_num LIKE ?")
+        clauses.append("ps.part_num LIKE ?")
         params.append(f"{term}%")
     else:
-        ql = term.lower().strip()
+        dims, tokens, words = _part_query_terms(term)
+        match: List[str] = []
+        if dims:
+            a, b = dims
+            match.append(f'dims:"{a}x{b}"')
+            rank_sql = "CASE WHEN ps.dim_a = ? AND ps.dim_b = ? THEN 0 ELSE 1 END,"
+            rank_params = [min(a, b), max(a, b)]
+            # the dims term already covers these numbers
+            for n in (str(a), str(b)):
+                if n in tokens:
+                    tokens.remove(n)
+        match.extend(f'name:"{t}"*' for t in tokens)
+        if not match:
+            if not words:
+                return []
+            match.append('name:"' + " ".join(words) + '"')
+        # CROSS JOIN keeps parts_fts as the outer loop: hits come back in
+        # rowid (= part_num) order, so an unranked page stops after LIMIT rows
+        from_sql = "parts_fts f CROSS JOIN parts_search ps ON ps.id = f.rowid"
+        key_col = "f.rowid"
+        clauses.append("parts_fts MATCH ?")
+        params.append(" AND ".join(match))
+
+    order_sql, order_params = _part_order_sql(term, has_spaces, "ps.part_num")
 
-        stop = {
-            "brick", "bricks", "plate", "plates", "tile", "tiles",
-            "with", "and", "or", "the", "a", "an", "of",
-            "x", "by",
-        }
+    if color_id is not None:
+        img_join = f"""
+        LEFT JOIN {element_images_table()} ei
+          ON ei.part_num = ps.part_num
+         AND ei.color_id = ?
+        """
+        img_params: List[Any] = [int(color_id)]
+        img_col = "ei.img_url"
+    else:
+        img_join = ""
+        img_params = []
+        img_col = "ps.primary_img_url"
 
-        m = re.search(r"(\d+)\s*[xX]\s*(\d+)", ql)
-        dims: List[str] = []
-        if m:
-            a, b = m.group(1), m.group(2)
-            dims.append(f"{a} x {b}")
-            dims.append(f"{b} x {a}")
+    cur = con.execute(
+        f"""
+        SELECT
+          ps.part_num,
+          ps.name,
+          CASE WHEN ps.is_sticker = 1 THEN NULL ELSE {img_col} END AS part_img_url,
+          CASE WHEN ps.is_sticker = 0 AND {img_col} IS NOT NULL THEN 1 ELSE 0 END AS image_exists
+        FROM {from_sql}
+        {img_join}
+        WHERE {" AND ".join(clauses)}
+        ORDER BY {rank_sql} {order_sql} {key_col} ASC
+        LIMIT ?
+        OFFSET ?
+        """,
+        (*img_params, *params, *rank_params, *order_params, min(int(limit), 100), int(offset)),
+    )
+    return cur.fetchall()
 
-        raw_tokens = re.findall(r"[a-z0-9]+", ql)
-        tokens = [t for t in raw_tokens if t not in stop]
 
-        for d in dims:
-            clauses.append("lower(p.name) LIKE ?")
-            params.append(f"%{d}%")
+def _search_parts_like(
+    con,
+    term: str,
+    category_id: Optional[int],
+    color_id: Optional[int],
+    limit: int,
+    offset: int,
+) -> List[Any]:
+    """Fallback for catalogs imported before parts_search existed."""
+    has_spaces = any(ch.isspace() for ch in term)
+
+    clauses: List[str] = []
+    params: List[Any] = []
+
+    if category_id is not None:
+        clauses.append("p.part_cat_id = ?")
+        params.append(int(category_id))
+
+    if not has_spaces:
+        clauses.append("p.part_num LIKE ?")
+        params.append(f"{term}%")
+    else:
+        dims, tokens, _ = _part_query_terms(term)
+
+        if dims:
+            a, b = dims
+            clauses.append("(lower(p.name) LIKE ? OR lower(p.name) LIKE ?)")
+            params.extend([f"%{a} x {b}%", f"%{b} x {a}%"])
 
         for t in tokens:
             clauses.append("lower(p.name) LIKE ?")
@@ -341,164 +603,161 @@ def search_parts(
 
         if not dims and not tokens:
             clauses.append("lower(p.name) LIKE ?")
-            params.append(f"%{ql}%")
+            params.append(f"%{term.lower()}%")
 
-    where_sql = " WHERE " + " AND ".join(clauses)
-
-    order_params: List[Any] = []
-    if (not has_spaces) and is_digits_only:
-        order_sql = """
-        ORDER BY
-          CASE
-            WHEN p.part_num = ? THEN 0
-            WHEN LENGTH(p.part_num) = ? THEN 1
-            ELSE 2
-          END,
-          LENGTH(p.part_num) ASC,
-          p.part_num ASC
-        """
-        order_params.extend([term, len(term) + 1])
-    else:
-        order_sql = "ORDER BY p.part_num ASC"
+    order_sql, order_params = _part_order_sql(term, has_spaces, "p.part_num")
 
+    # Same image rules as the indexed search: exact colour, else the primary.
     if color_id is not None:
-        img_sql = """
+        img_sql = f"""
         (
           SELECT ei.img_url
-          FROM element_images ei
+          FROM {element_images_table()} ei
           WHERE ei.part_num = p.part_num
             AND ei.color_id = ?
-            AND ei.img_url IS NOT NULL
-            AND TRIM(ei.img_url) <> ''
-          LIMIT 1
         )
         """
         img_params: List[Any] = [int(color_id)]
     else:
-        img_sql = """
-        (
-          SELECT ei.img_url
-          FROM element_images ei
-          WHERE ei.part_num = p.part_num
-            AND ei.img_url IS NOT NULL
-            AND TRIM(ei.img_url) <> ''
-          ORDER BY ei.color_id ASC
-          LIMIT 1
-        )
-        """
+        img_sql = _primary_image_sql("p.part_num")
         img_params = []
 
-    with db() as con:
-        cur = con.execute(
-            f"""
-            SELECT
-              p.part_num,
-              p.name,
-              CASE
-                WHEN p.part_cat_id IN (
-                  SELECT part_cat_id
-                  FROM part_categories
-                  WHERE lower(name) LIKE '%sticker%'
-                )
-                THEN NULL
-                ELSE {img_sql}
-              END AS part_img_url,
-              CASE
-                WHEN p.part_cat_id IN (
-                  SELECT part_cat_id
-                  FROM part_categories
-                  WHERE lower(name) LIKE '%sticker%'
-                )
-                THEN 0
-                WHEN {img_sql} IS NOT NULL THEN 1
-                ELSE 0
-              END AS image_exists
-            FROM parts p
-            {where_sql}
-            {order_sql}
-            LIMIT ?
-            OFFSET ?
-            """,
-            (*img_params, *img_params, *params, *order_params, min(int(limit), 100), int(offset)),
-        )
-        rows = cur.fetchall()
+    cur = con.execute(
+        f"""
+        SELECT
+          p.part_num,
+          p.name,
+          CASE
+            WHEN p.part_cat_id IN (
+              SELECT part_cat_id
+              FROM part_categories
+              WHERE lower(name) LIKE '%sticker%'
+            )
+            THEN NULL
+            ELSE {img_sql}
+          END AS part_img_url,
+          CASE
+            WHEN p.part_cat_id IN (
+              SELECT part_cat_id
+              FROM part_categories
+              WHERE lower(name) LIKE '%sticker%'
+            )
+            THEN 0
+            WHEN {img_sql} IS NOT NULL THEN 1
+            ELSE 0
+          END AS image_exists
+        FROM parts p
+        WHERE {" AND ".join(clauses)}
+        ORDER BY {order_sql} p.part_num ASC
+        LIMIT ?
+        OFFSET ?
+        """,
+        (*img_params, *img_params, *params, *order_params, min(int(limit), 100), int(offset)),
+    )
+    return cur.fetchall()
 
-    return [
-        {
-            "part_num": r["part_num"],
-            "name": r["name"],
-            "part_img_url": r["part_img_url"],
-            "image_exists": int(r["image_exists"]) if r["image_exists"] is not None else 0,
-        }
-        for r in rows
-    ]
+
+# Upper bound on part numbers per /elements/by-part call (grid views).
+ELEMENTS_BY_PART_MAX = 200
 
 
 @router.get("/elements/by-part")
 def get_elements_by_part(
-    part_num: str = Query(..., description="Canonical part number (e.g. 3005 for 1x1 brick)"),
+    part_num: List[str] = Query(
+        ...,
+        description="Canonical part number (e.g. 3005 for 1x1 brick); repeat or comma-separate for several",
+    ),
 ) -> List[Dict[str, Any]]:
     """
     Single-brick flow:
     - Given canonical part_num (e.g. 3005), return ONE row per colour_id.
-    - Images-first ordering.
+    - Several part_nums: rows for each part, grouped in request order.
+    - Images-first ordering within a part.
     - Source of truth for images is element_images (part_num, color_id).
     - Also returns an example element_id (useful for debugging / future expansion).
+    - Reads the import-time part_colors table: one primary-key range scan per part.
     """
-    pn = (part_num or "").strip()
-    if not pn:
+    pns: List[str] = []
+    for raw in part_num:
+        for pn in (raw or "").split(","):
+            pn = pn.strip()
+            if pn and pn not in pns:
+                pns.append(pn)
+    if not pns:
         raise HTTPException(status_code=400, detail="part_num is required")
+    if len(pns) > ELEMENTS_BY_PART_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {ELEMENTS_BY_PART_MAX} part numbers per request",
+        )
 
+    placeholders = ",".join("?" for _ in pns)
     with db() as con:
-        cur = con.execute(
+        if has_catalog_table("part_colors"):
+            sql = f"""
+            SELECT part_num, color_id, color_name, img_url, element_id, year_from, year_to
+            FROM part_colors
+            WHERE part_num IN ({placeholders})
+            ORDER BY has_image DESC, LOWER(COALESCE(color_name, '')) ASC, color_id ASC
             """
+        else:
+            sql = f"""
             SELECT
               e.part_num AS part_num,
               e.color_id AS color_id,
               c.name     AS color_name,
-              (
-                SELECT ei.img_url
-                FROM element_images ei
-                WHERE ei.part_num = e.part_num
-                  AND ei.color_id = e.color_id
-                  AND ei.img_url IS NOT NULL
-                  AND TRIM(ei.img_url) <> ''
-                LIMIT 1
-              ) AS img_url,
-              MIN(e.element_id) AS element_id
+              ei.img_url AS img_url,
+              MIN(e.element_id) AS element_id,
+              MIN(e.year_from) AS year_from,
+              MAX(e.year_to) AS year_to
             FROM elements e
             LEFT JOIN colors c
               ON c.color_id = e.color_id
-            WHERE e.part_num = ?
+            LEFT JOIN {element_images_table()} ei
+              ON ei.part_num = e.part_num
+             AND ei.color_id = e.color_id
+             AND ei.img_url IS NOT NULL
+             AND TRIM(ei.img_url) <> ''
+            WHERE e.part_num IN ({placeholders})
               AND e.color_id IS NOT NULL
             GROUP BY e.part_num, e.color_id, c.name
             ORDER BY
-              CASE
-                WHEN (
-                  SELECT ei2.img_url
-                  FROM element_images ei2
-                  WHERE ei2.part_num = e.part_num
-                    AND ei2.color_id = e.color_id
-                    AND ei2.img_url IS NOT NULL
-                    AND TRIM(ei2.img_url) <> ''
-                  LIMIT 1
-                ) IS NOT NULL THEN 0
-                ELSE 1
-              END,
+              ei.img_url IS NULL,
               LOWER(COALESCE(c.name, '')) ASC,
               e.color_id ASC
-            """,
-            (pn,),
+            """
+        rows = con.execute(sql, pns).fetchall()
+
+    by_part: Dict[str, List[Dict[str, Any]]] = {pn: [] for pn in pns}
+    for r in rows:
+        by_part[r["part_num"]].append(
+            {
+                "part_num": r["part_num"],
+                "color_id": int(r["color_id"]) if r["color_id"] is not None else None,
+                "color_name": r["color_name"],
+                "img_url": r["img_url"],
+                "element_id": r["element_id"],
+                "year_from": r["year_from"],
+                "year_to": r["year_to"],
+            }
         )
-        rows = cur.fetchall()
+    return [row for pn in pns for row in by_part[pn]]
 
-    return [
-        {
-            "part_num": r["part_num"],
-            "color_id": int(r["color_id"]) if r["color_id"] is not None else None,
-            "color_name": r["color_name"],
-            "img_url": r["img_url"],
-            "element_id": r["element_id"],
-        }
-        for r in rows
-    ]
+
+@router.post("/derived/rebuild", status_code=202)
+def rebuild_derived_tables(_: User = Depends(require_admin)) -> Dict[str, Any]:
+    """
+    Start a background rebuild of the derived tables (top_common_parts*)
+    from the live catalog. Imports build them already; this is for ad-hoc
+    refreshes. Poll /derived/status for progress.
+    """
+    started, status = start_derived_job()
+    if not started:
+        raise HTTPException(status_code=409, detail="A derived table rebuild is already running")
+    return status
+
+
+@router.get("/derived/status")
+def derived_tables_status(_: User = Depends(require_admin)) -> Dict[str, Any]:
+    """State, current step and progress of the last derived table rebuild."""
+    return derived_job_status()
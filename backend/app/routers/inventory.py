@@ -2,78 +2,155 @@ from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any, Tuple
 
-from app.user_db import user_db
+from app.user_db import user_db, attach_catalog, attached_table_exists
 from app.routers.auth import get_current_user, User
-from app.catalog_db import db as catalog_db
+from app.cursors import encode_cursor, decode_cursor
+from app.catalog_db import db as catalog_db, element_images_table
 
 router = APIRouter()
 
 
 # -----------------------
-# DB ensure (matches your aim2build_app.db schema)
+# Change journal
 # -----------------------
 
-
-def _ensure_user_inventory_tables(con) -> None:
+# Events kept per user after compaction.
+EVENTS_KEEP_PER_USER = 2000
+# A user's events are compacted once they exceed the kept count by this many.
+EVENTS_COMPACT_SLACK = 256
+# More pending events than this and /changes answers with a snapshot instead.
+CHANGES_MAX_EVENTS = 1000
+
+
+def _record_change(
+    con,
+    user_id: int,
+    part_num: str,
+    color_id: int,
+    old_qty: int,
+    new_qty: int,
+    source: str,
+    has_catalog: bool = False,
+) -> None:
+    """
+    Bookkeeping for ONE (part_num, color_id) qty change: journal row + stats.
+    MUST be called on the same connection, before the same commit, as the
+    mutation it describes. has_catalog: the catalog is ATTACHed as cat
+    (_attach_catalog_for_stats), so the category counters can be updated.
     """
-    USER DB (aim2build_app.db) is source of truth for inventory.
+    old_qty = max(int(old_qty), 0)
+    new_qty = max(int(new_qty), 0)
+    delta = new_qty - old_qty
+    if delta == 0:
+        return
+    lots_delta = int(new_qty > 0) - int(old_qty > 0)
+
+    # Stats rows are only created by a full rebuild (/stats), so a user whose
+    # inventory predates the stats table is never left with partial totals.
+    # Without the catalog the part's category is unknown: flag the breakdown
+    # counters for a rebuild on the next read instead.
+    row = con.execute(
+        """
+        UPDATE user_inventory_stats
+        SET total_pieces = total_pieces + ?,
+            lots = lots + ?,
+            breakdowns = breakdowns AND ?,
+            updated_at = datetime('now')
+        WHERE user_id = ?
+        RETURNING breakdowns
+        """,
+        (delta, lots_delta, int(has_catalog), user_id),
+    ).fetchone()
+    if row is not None and row[0]:
+        _bump_breakdowns(con, user_id, part_num, int(color_id), delta, lots_delta)
 
-    This matches the schema you showed from sqlite_master:
+    con.execute(
+        """
+        INSERT INTO user_inventory_events(user_id, part_num, color_id, delta, source)
+        VALUES (?,?,?,?,?)
+        """,
+        (user_id, part_num, int(color_id), int(delta), source),
+    )
+    _count_events(con, user_id, 1)
 
-    user_inventory_parts:
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      user_id INTEGER NOT NULL,
-      part_num TEXT NOT NULL,
-      color_id INTEGER NOT NULL,
-      qty INTEGER NOT NULL DEFAULT 0,
-      UNIQUE(user_id, part_num, color_id)
 
-    user_inventory_sets:
-      user_id INTEGER, set_num TEXT, count INTEGER DEFAULT 1,
-      PRIMARY KEY(user_id, set_num)
+# user_inventory_stats_category key for parts missing from the catalog.
+NO_CATEGORY = -1
 
-    user_set_pour_lines:
-      user_id INTEGER NOT NULL, set_num TEXT NOT NULL,
-      part_num TEXT NOT NULL, color_id INTEGER NOT NULL,
-      qty INTEGER NOT NULL DEFAULT 0,
-      PRIMARY KEY(user_id, set_num, part_num, color_id)
-    """
-    con.execute(
-        """
-        CREATE TABLE IF NOT EXISTS user_inventory_parts (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          user_id INTEGER NOT NULL,
-          part_num TEXT NOT NULL,
-          color_id INTEGER NOT NULL,
-          qty INTEGER NOT NULL DEFAULT 0,
-          UNIQUE(user_id, part_num, color_id),
-          FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+
+def _bump_breakdowns(
+    con, user_id: int, part_num: str, color_id: int, pieces: int, lots: int
+) -> None:
+    """Apply one change to the user's colour and category counters."""
+    cat_row = con.execute(
+        "SELECT part_cat_id FROM cat.parts WHERE part_num = ?", (part_num,)
+    ).fetchone()
+    cat_id = cat_row[0] if cat_row is not None and cat_row[0] is not None else NO_CATEGORY
+    for table, key_col, key in (
+        ("user_inventory_stats_color", "color_id", color_id),
+        ("user_inventory_stats_category", "part_cat_id", int(cat_id)),
+    ):
+        con.execute(
+            f"""
+            INSERT INTO {table}(user_id, {key_col}, pieces, lots)
+            VALUES (?,?,?,?)
+            ON CONFLICT(user_id, {key_col}) DO UPDATE SET
+              pieces = pieces + excluded.pieces,
+              lots = lots + excluded.lots
+            """,
+            (user_id, key, pieces, lots),
         )
-        """
-    )
 
-    con.execute(
+
+def _count_events(con, user_id: int, added: int) -> None:
+    """
+    Add `added` new journal rows to the user's event count and compact their
+    journal once it exceeds EVENTS_KEEP_PER_USER by EVENTS_COMPACT_SLACK.
+    Counted per user: seq is shared by all users.
+    """
+    row = con.execute(
         """
-        CREATE TABLE IF NOT EXISTS user_inventory_sets (
-          user_id INTEGER,
-          set_num TEXT,
-          count INTEGER DEFAULT 1,
-          PRIMARY KEY(user_id, set_num)
-        )
+        INSERT INTO user_inventory_event_floor(user_id, events)
+        VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET events = events + excluded.events
+        RETURNING events
+        """,
+        (user_id, int(added)),
+    ).fetchone()
+    if int(row[0]) > EVENTS_KEEP_PER_USER + EVENTS_COMPACT_SLACK:
+        _compact_events(con, user_id, EVENTS_KEEP_PER_USER)
+
+
+def _compact_events(con, user_id: int, keep: int) -> None:
+    """
+    Drop all but the newest `keep` events for a user and raise their floor.
+    """
+    row = con.execute(
         """
-    )
+        SELECT seq FROM user_inventory_events
+        WHERE user_id = ?
+        ORDER BY seq DESC
+        LIMIT 1 OFFSET ?
+        """,
+        (user_id, int(keep)),
+    ).fetchone()
+    if row is None:
+        return
 
+    cutoff = int(row["seq"])
+    deleted = con.execute(
+        "DELETE FROM user_inventory_events WHERE user_id = ? AND seq <= ?",
+        (user_id, cutoff),
+    ).rowcount
     con.execute(
         """
-        CREATE TABLE IF NOT EXISTS user_set_pour_lines (
-          user_id INTEGER NOT NULL,
-          set_num TEXT NOT NULL,
-          part_num TEXT NOT NULL,
-          color_id INTEGER NOT NULL,
-          qty INTEGER NOT NULL DEFAULT 0,
-          PRIMARY KEY (user_id, set_num, part_num, color_id)
-        )
-        """
+        INSERT INTO user_inventory_event_floor(user_id, compacted_seq)
+        VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+          compacted_seq = MAX(compacted_seq, excluded.compacted_seq),
+          events = MAX(events - ?, 0)
+        """,
+        (user_id, cutoff, deleted),
     )
 
 
@@ -149,7 +226,6 @@ def _load_db_parts(user_id: int) -> List[dict]:
     Returns list of dicts with qty_total for frontend compat.
     """
     with user_db() as con:
-        _ensure_user_inventory_tables(con)
         cur = con.cursor()
         cur.execute(
             """
@@ -184,25 +260,60 @@ def _load_db_parts(user_id: int) -> List[dict]:
     return out
 
 
-def _img_for(part_num: str, color_id: int) -> Optional[str]:
+def _load_db_parts_with_images(user_id: int) -> List[dict]:
     """
-    Images source of truth: catalog DB element_images(part_num,color_id,img_url)
+    Same rows as _load_db_parts, enriched with part_img_url in ONE query.
+
+    Images source of truth: catalog DB element_images(part_num,color_id,img_url),
+    read through element_images_resolved and joined via ATTACH instead of one
+    catalog connection + query per row.
     """
-    try:
-        with catalog_db() as con:
-            cur = con.cursor()
-            cur.execute(
-                "SELECT img_url FROM element_images WHERE part_num=? AND color_id=? LIMIT 1",
-                (part_num, int(color_id)),
+    images = element_images_table()
+    with user_db() as con:
+
+        has_images = False
+        try:
+            has_images = attach_catalog(con) and attached_table_exists(
+                con, "cat", images
             )
-            row = cur.fetchone()
-            if not row:
-                return None
-            if hasattr(row, "keys"):
-                return row["img_url"]
-            return row[0]
-    except Exception:
-        return None
+        except Exception:
+            has_images = False
+
+        if has_images:
+            img_select = "ei.img_url"
+            img_join = (
+                f"LEFT JOIN cat.{images} AS ei "
+                "ON ei.part_num = p.part_num AND ei.color_id = p.color_id"
+            )
+        else:
+            img_select = "NULL"
+            img_join = ""
+
+        cur = con.execute(
+            f"""
+            SELECT p.part_num, p.color_id, p.qty, {img_select} AS img_url
+            FROM user_inventory_parts AS p
+            {img_join}
+            WHERE p.user_id = ?
+            ORDER BY p.part_num, p.color_id
+            """,
+            (user_id,),
+        )
+        rows = cur.fetchall()
+
+    out: List[dict] = []
+    for r in rows:
+        qty = int(r["qty"])
+        out.append(
+            {
+                "part_num": str(r["part_num"]),
+                "color_id": int(r["color_id"]),
+                "qty": qty,
+                "qty_total": qty,
+                "part_img_url": r["img_url"],
+            }
+        )
+    return out
 
 
 def load_inventory_parts(user_id: int) -> List[dict]:
@@ -252,18 +363,152 @@ def has_any_inventory(current_user: User = Depends(get_current_user)):
 
 @router.get("/parts", response_model=List[InventoryPart])
 def get_parts(current_user: User = Depends(get_current_user)):
-    parts = _load_db_parts(current_user.id)
-    for p in parts:
-        p["part_img_url"] = _img_for(p["part_num"], int(p["color_id"]))
-    return parts
+    return _load_db_parts_with_images(current_user.id)
 
 
 @router.get("/parts_with_images", response_model=List[InventoryPart])
 def get_parts_with_images(current_user: User = Depends(get_current_user)):
-    parts = _load_db_parts(current_user.id)
-    for p in parts:
-        p["part_img_url"] = _img_for(p["part_num"], int(p["color_id"]))
-    return parts
+    return _load_db_parts_with_images(current_user.id)
+
+
+# Keyset sorts for /parts/paged: ORDER BY sql + the columns carried in the cursor.
+_PAGED_SORTS: Dict[str, str] = {
+    "part": "ORDER BY p.part_num, p.color_id",
+    "qty_desc": "ORDER BY p.qty DESC, p.part_num, p.color_id",
+    "qty_asc": "ORDER BY p.qty ASC, p.part_num, p.color_id",
+}
+
+PAGED_DEFAULT_LIMIT = 200
+PAGED_MAX_LIMIT = 1000
+
+
+def _keyset_clause(sort: str, cur: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    try:
+        part_num = str(cur["p"])
+        color_id = int(cur["c"])
+        qty = int(cur["q"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+    if sort == "qty_desc":
+        return (
+            " AND (p.qty < ? OR (p.qty = ? AND (p.part_num, p.color_id) > (?, ?)))",
+            [qty, qty, part_num, color_id],
+        )
+    if sort == "qty_asc":
+        return " AND (p.qty, p.part_num, p.color_id) > (?, ?, ?)", [qty, part_num, color_id]
+    return " AND (p.part_num, p.color_id) > (?, ?)", [part_num, color_id]
+
+
+@router.get("/parts/paged")
+def get_parts_paged(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(PAGED_DEFAULT_LIMIT, ge=1, le=PAGED_MAX_LIMIT),
+    sort: str = Query("part", description="part | qty_desc | qty_asc"),
+    color_id: Optional[List[int]] = Query(None, description="repeatable colour filter"),
+    part_cat_id: Optional[int] = Query(None, description="catalog parts.part_cat_id"),
+    min_qty: Optional[int] = Query(None, ge=0),
+    max_qty: Optional[int] = Query(None, ge=0),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Keyset-paginated, filterable inventory listing (user_inventory_parts).
+
+    Same rows/images as /parts, but one page at a time:
+      { "items": [...], "next_cursor": "..." | null, "has_more": bool }
+
+    The cursor is bound to the sort it was issued for; filters must be
+    resent unchanged with every page.
+    """
+    sort_key = (sort or "part").strip().lower()
+    if sort_key not in _PAGED_SORTS:
+        raise HTTPException(status_code=400, detail="sort must be part, qty_desc or qty_asc")
+
+    after = decode_cursor(cursor)
+    if after is not None and after.get("s") != sort_key:
+        raise HTTPException(status_code=400, detail="cursor does not match sort")
+
+    where = "p.user_id = ?"
+    params: List[Any] = [current_user.id]
+
+    if color_id:
+        where += f" AND p.color_id IN ({','.join('?' * len(color_id))})"
+        params.extend(int(c) for c in color_id)
+    if min_qty is not None:
+        where += " AND p.qty >= ?"
+        params.append(int(min_qty))
+    if max_qty is not None:
+        where += " AND p.qty <= ?"
+        params.append(int(max_qty))
+
+    with user_db() as con:
+
+        has_catalog = False
+        try:
+            has_catalog = attach_catalog(con)
+        except Exception:
+            has_catalog = False
+
+        if part_cat_id is not None:
+            if not (has_catalog and attached_table_exists(con, "cat", "parts")):
+                raise HTTPException(status_code=503, detail="catalog unavailable")
+            where += " AND p.part_num IN (SELECT part_num FROM cat.parts WHERE part_cat_id = ?)"
+            params.append(int(part_cat_id))
+
+        images = element_images_table()
+        if has_catalog and attached_table_exists(con, "cat", images):
+            img_select = "ei.img_url"
+            img_join = (
+                f"LEFT JOIN cat.{images} AS ei "
+                "ON ei.part_num = p.part_num AND ei.color_id = p.color_id"
+            )
+        else:
+            img_select = "NULL"
+            img_join = ""
+
+        if after is not None:
+            keyset_sql, keyset_params = _keyset_clause(sort_key, after)
+            where += keyset_sql
+            params.extend(keyset_params)
+
+        # fetch one extra row to know if there is another page
+        cur = con.execute(
+            f"""
+            SELECT p.part_num, p.color_id, p.qty, {img_select} AS img_url
+            FROM user_inventory_parts AS p
+            {img_join}
+            WHERE {where}
+            {_PAGED_SORTS[sort_key]}
+            LIMIT ?
+            """,
+            (*params, int(limit) + 1),
+        )
+        rows = cur.fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items: List[dict] = []
+    for r in rows:
+        qty = int(r["qty"])
+        items.append(
+            {
+                "part_num": str(r["part_num"]),
+                "color_id": int(r["color_id"]),
+                "qty": qty,
+                "qty_total": qty,
+                "part_img_url": r["img_url"],
+            }
+        )
+
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        next_cursor = encode_cursor(
+            {"s": sort_key, "p": last["part_num"], "c": last["color_id"], "q": last["qty"]}
+        )
+
+    return {"items": items, "next_cursor": next_cursor, "has_more": has_more}
 
 
 @router.get("/sets")
@@ -273,7 +518,6 @@ def list_poured_sets(current_user: User = Depends(get_current_user)) -> List[str
     Returns set_nums that are currently poured (ON).
     """
     with user_db() as con:
-        _ensure_user_inventory_tables(con)
         cur = con.execute(
             "SELECT set_num FROM user_inventory_sets WHERE user_id=? ORDER BY set_num",
             (current_user.id,),
@@ -296,7 +540,6 @@ def list_canonical_inventory_parts(current_user: User = Depends(get_current_user
     Returns ONLY what is in user_inventory_parts.
     """
     with user_db() as con:
-        _ensure_user_inventory_tables(con)
         cur = con.cursor()
         cur.execute(
             """
@@ -326,6 +569,275 @@ def list_canonical_inventory_parts(current_user: User = Depends(get_current_user
     return out
 
 
+@router.get("/changes")
+def list_inventory_changes(
+    since: int = Query(0, ge=0, description="cursor from the previous /changes response"),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Delta sync for user_inventory_parts.
+
+    - { "mode": "delta", "cursor": N, "events": [{seq, part_num, color_id, delta, source}] }
+      apply each delta to the local (part_num, color_id) qty, drop rows at <= 0.
+    - { "mode": "snapshot", "cursor": N, "parts": [{part_num, color_id, qty}] }
+      replace local state; sent for since=0, after compaction has removed
+      events the client never saw, or when more than CHANGES_MAX_EVENTS are pending.
+
+    Send the returned cursor back as `since` next time.
+    """
+    user_id = current_user.id
+
+    with user_db() as con:
+        # one read transaction so events/snapshot and cursor agree
+        con.execute("BEGIN")
+
+        head_row = con.execute(
+            "SELECT MAX(seq) AS head FROM user_inventory_events WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        floor_row = con.execute(
+            "SELECT compacted_seq FROM user_inventory_event_floor WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        floor = int(floor_row["compacted_seq"]) if floor_row else 0
+        head = max(int(head_row["head"] or 0), floor)
+
+        events = []
+        snapshot = since <= 0 or since < floor
+        if not snapshot:
+            cur = con.execute(
+                """
+                SELECT seq, part_num, color_id, delta, source
+                FROM user_inventory_events
+                WHERE user_id = ? AND seq > ?
+                ORDER BY seq
+                LIMIT ?
+                """,
+                (user_id, int(since), CHANGES_MAX_EVENTS + 1),
+            )
+            events = cur.fetchall()
+            snapshot = len(events) > CHANGES_MAX_EVENTS
+
+        if snapshot:
+            cur = con.execute(
+                """
+                SELECT part_num, color_id, qty
+                FROM user_inventory_parts
+                WHERE user_id = ?
+                ORDER BY part_num, color_id
+                """,
+                (user_id,),
+            )
+            parts = [
+                {"part_num": r["part_num"], "color_id": int(r["color_id"]), "qty": int(r["qty"])}
+                for r in cur.fetchall()
+            ]
+            con.rollback()
+            return {"mode": "snapshot", "cursor": head, "parts": parts}
+
+        con.rollback()
+
+    return {
+        "mode": "delta",
+        "cursor": head,
+        "events": [
+            {
+                "seq": int(r["seq"]),
+                "part_num": r["part_num"],
+                "color_id": int(r["color_id"]),
+                "delta": int(r["delta"]),
+                "source": r["source"],
+            }
+            for r in events
+        ],
+    }
+
+
+def _attach_catalog_for_stats(con) -> bool:
+    # ATTACH is not allowed inside a transaction: call before BEGIN.
+    try:
+        return attach_catalog(con) and all(
+            attached_table_exists(con, "cat", t) for t in ("colors", "parts", "part_categories")
+        )
+    except Exception:
+        return False
+
+
+def _rebuild_inventory_stats(con, user_id: int, has_catalog: bool) -> None:
+    """
+    Recompute one user's stats row and breakdown counters from a single
+    grouped query over user_inventory_parts joined to the ATTACHed catalog
+    (parts). Caller owns the transaction.
+    """
+    if has_catalog:
+        sql = """
+            SELECT
+              p.color_id,
+              pt.part_cat_id,
+              SUM(p.qty) AS pieces,
+              COUNT(*) AS lots
+            FROM user_inventory_parts AS p
+            LEFT JOIN cat.parts AS pt ON pt.part_num = p.part_num
+            WHERE p.user_id = ? AND p.qty > 0
+            GROUP BY p.color_id, pt.part_cat_id
+        """
+    else:
+        sql = """
+            SELECT
+              p.color_id,
+              NULL AS part_cat_id,
+              SUM(p.qty) AS pieces,
+              COUNT(*) AS lots
+            FROM user_inventory_parts AS p
+            WHERE p.user_id = ? AND p.qty > 0
+            GROUP BY p.color_id
+        """
+
+    by_color: Dict[int, List[int]] = {}
+    by_category: Dict[int, List[int]] = {}
+    total_pieces = 0
+    lots = 0
+
+    for r in con.execute(sql, (user_id,)).fetchall():
+        pieces = int(r["pieces"] or 0)
+        n = int(r["lots"] or 0)
+        total_pieces += pieces
+        lots += n
+
+        for buckets, key in (
+            (by_color, int(r["color_id"])),
+            (by_category, int(r["part_cat_id"]) if r["part_cat_id"] is not None else NO_CATEGORY),
+        ):
+            bucket = buckets.setdefault(key, [0, 0])
+            bucket[0] += pieces
+            bucket[1] += n
+
+    for table, key_col, buckets in (
+        ("user_inventory_stats_color", "color_id", by_color),
+        ("user_inventory_stats_category", "part_cat_id", by_category),
+    ):
+        con.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
+        con.executemany(
+            f"INSERT INTO {table}(user_id, {key_col}, pieces, lots) VALUES (?,?,?,?)",
+            [(user_id, key, pieces, n) for key, (pieces, n) in buckets.items()],
+        )
+
+    # Rebuilt without the catalog, every lot sits in NO_CATEGORY: keep the
+    # flag off so the first read with a catalog sorts them properly.
+    con.execute(
+        """
+        INSERT INTO user_inventory_stats(user_id, total_pieces, lots, breakdowns, updated_at)
+        VALUES (?,?,?,?, datetime('now'))
+        ON CONFLICT(user_id) DO UPDATE SET
+          total_pieces = excluded.total_pieces,
+          lots = excluded.lots,
+          breakdowns = excluded.breakdowns,
+          updated_at = excluded.updated_at
+        """,
+        (user_id, total_pieces, lots, int(has_catalog)),
+    )
+
+
+def _read_breakdowns(
+    con, user_id: int, has_catalog: bool
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """by_color / by_category lists, largest first, named from the catalog."""
+    if has_catalog:
+        color_name = "c.name, c.rgb"
+        color_join = "LEFT JOIN cat.colors AS c ON c.color_id = s.color_id"
+        cat_name = "pc.name"
+        cat_join = "LEFT JOIN cat.part_categories AS pc ON pc.part_cat_id = s.part_cat_id"
+    else:
+        color_name, color_join, cat_name, cat_join = "NULL AS name, NULL AS rgb", "", "NULL AS name", ""
+
+    colors = con.execute(
+        f"""
+        SELECT s.color_id, {color_name}, s.pieces, s.lots
+        FROM user_inventory_stats_color AS s
+        {color_join}
+        WHERE s.user_id = ? AND s.lots > 0
+        ORDER BY s.pieces DESC, s.lots DESC, s.color_id
+        """,
+        (user_id,),
+    ).fetchall()
+    categories = con.execute(
+        f"""
+        SELECT s.part_cat_id, {cat_name}, s.pieces, s.lots
+        FROM user_inventory_stats_category AS s
+        {cat_join}
+        WHERE s.user_id = ? AND s.lots > 0
+        ORDER BY s.pieces DESC, s.lots DESC, s.part_cat_id
+        """,
+        (user_id,),
+    ).fetchall()
+
+    by_color = [
+        {
+            "color_id": int(r["color_id"]),
+            "name": r["name"],
+            "rgb": r["rgb"],
+            "pieces": int(r["pieces"]),
+            "lots": int(r["lots"]),
+        }
+        for r in colors
+    ]
+    by_category = [
+        {
+            "part_cat_id": None if r["part_cat_id"] == NO_CATEGORY else int(r["part_cat_id"]),
+            "name": r["name"],
+            "pieces": int(r["pieces"]),
+            "lots": int(r["lots"]),
+        }
+        for r in categories
+    ]
+    return by_color, by_category
+
+
+@router.get("/stats")
+def get_inventory_stats(current_user: User = Depends(get_current_user)):
+    """
+    Dashboard aggregates for the current user:
+      { total_pieces, lots, by_color: [...], by_category: [...], updated_at }
+
+    Served from user_inventory_stats and its colour / category counters,
+    which every mutation keeps current. Only rebuilt (one grouped query) when
+    the row is missing or predates the counters.
+    """
+    with user_db() as con:
+        has_catalog = _attach_catalog_for_stats(con)
+        # One read transaction: totals and counters come from the same state.
+        con.execute("BEGIN")
+        try:
+            row = con.execute(
+                "SELECT * FROM user_inventory_stats WHERE user_id = ?",
+                (current_user.id,),
+            ).fetchone()
+
+            if row is None or not row["breakdowns"]:
+                # IMMEDIATE: no mutation can slip in between the read and the write
+                con.rollback()
+                con.execute("BEGIN IMMEDIATE")
+                _rebuild_inventory_stats(con, current_user.id, has_catalog)
+                row = con.execute(
+                    "SELECT * FROM user_inventory_stats WHERE user_id = ?",
+                    (current_user.id,),
+                ).fetchone()
+
+            by_color, by_category = _read_breakdowns(con, current_user.id, has_catalog)
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+
+    return {
+        "total_pieces": int(row["total_pieces"]),
+        "lots": int(row["lots"]),
+        "by_color": by_color,
+        "by_category": by_category,
+        "updated_at": row["updated_at"],
+    }
+
+
 # -----------------------
 # Pour / Unpour endpoints (SET TOGGLE SPINE)
 # -----------------------
@@ -355,8 +867,10 @@ def pour_set(
         )
 
     with user_db() as con:
-        _ensure_user_inventory_tables(con)
+        has_catalog = _attach_catalog_for_stats(con)
         cur = con.cursor()
+        # write lock up-front so two taps cannot both pass the guard
+        cur.execute("BEGIN IMMEDIATE")
 
         # Idempotent guard
         cur.execute(
@@ -367,6 +881,7 @@ def pour_set(
         if row is not None:
             already = int(row["count"] if hasattr(row, "keys") else row[0] or 0)
             if already > 0:
+                con.rollback()
                 return {"ok": True, "set_num": set_id, "already_poured": True}
 
         # Mark poured set
@@ -401,14 +916,22 @@ def pour_set(
                 (current_user.id, set_id, part_num, color_id, qty),
             )
 
-            # Inventory increment
+            # Inventory increment (+ poured floor)
             cur.execute(
                 """
-                INSERT INTO user_inventory_parts(user_id, part_num, color_id, qty)
-                VALUES (?,?,?,?)
-                ON CONFLICT(user_id, part_num, color_id) DO UPDATE SET qty = qty + excluded.qty
+                INSERT INTO user_inventory_parts(user_id, part_num, color_id, qty, poured_floor)
+                VALUES (?,?,?,?,?)
+                ON CONFLICT(user_id, part_num, color_id) DO UPDATE SET
+                  qty = qty + excluded.qty,
+                  poured_floor = poured_floor + excluded.poured_floor
+                RETURNING qty
                 """,
-                (current_user.id, part_num, color_id, qty),
+                (current_user.id, part_num, color_id, qty, qty),
+            )
+            new_qty = int(cur.fetchone()[0])
+            _record_change(
+                con, current_user.id, part_num, color_id, new_qty - qty, new_qty, "pour-set",
+                has_catalog,
             )
 
             poured_lines += 1
@@ -442,8 +965,9 @@ def unpour_set(
         raise HTTPException(status_code=400, detail="set required")
 
     with user_db() as con:
-        _ensure_user_inventory_tables(con)
+        has_catalog = _attach_catalog_for_stats(con)
         cur = con.cursor()
+        cur.execute("BEGIN IMMEDIATE")
 
         cur.execute(
             """
@@ -518,11 +1042,15 @@ def unpour_set(
                 cur.execute(
                     """
                     UPDATE user_inventory_parts
-                    SET qty=?
+                    SET qty=?, poured_floor=MAX(poured_floor - ?, 0)
                     WHERE user_id=? AND part_num=? AND color_id=?
                     """,
-                    (new_qty, current_user.id, part_num, color_id),
+                    (new_qty, delta, current_user.id, part_num, color_id),
                 )
+            _record_change(
+                con, current_user.id, part_num, color_id, current_qty, new_qty, "unpour-set",
+                has_catalog,
+            )
 
             removed_lines += 1
             total_qty += delta
@@ -562,7 +1090,7 @@ def add_canonical_part(
         raise HTTPException(status_code=400, detail="part_num required")
 
     with user_db() as con:
-        _ensure_user_inventory_tables(con)
+        has_catalog = _attach_catalog_for_stats(con)
         cur = con.cursor()
         cur.execute(
             """
@@ -570,20 +1098,17 @@ def add_canonical_part(
             VALUES (?, ?, ?, ?)
             ON CONFLICT(user_id, part_num, color_id)
             DO UPDATE SET qty = qty + excluded.qty
+            RETURNING user_id, part_num, color_id, qty
             """,
             (current_user.id, part_num, int(payload.color_id), int(payload.qty)),
         )
-        con.commit()
-
-        cur.execute(
-            """
-            SELECT user_id, part_num, color_id, qty
-            FROM user_inventory_parts
-            WHERE user_id = ? AND part_num = ? AND color_id = ?
-            """,
-            (current_user.id, part_num, int(payload.color_id)),
-        )
         row = cur.fetchone()
+        if row is not None:
+            _record_change(
+                con, current_user.id, part_num, int(payload.color_id),
+                int(row["qty"]) - int(payload.qty), int(row["qty"]), "add", has_catalog,
+            )
+        con.commit()
 
     if row is None:
         raise HTTPException(
@@ -617,21 +1142,59 @@ def set_canonical(payload: dict, current_user: User = Depends(get_current_user))
         raise HTTPException(status_code=400, detail="qty must be >= 0")
 
     with user_db() as con:
-        _ensure_user_inventory_tables(con)
+        has_catalog = _attach_catalog_for_stats(con)
         cur = con.cursor()
+        # write lock up-front: the journal read and the write cannot interleave
+        # with another tap on the same lot
+        cur.execute("BEGIN IMMEDIATE")
 
-        # Floor from poured sets (sum of receipt lines)
         cur.execute(
             """
-            SELECT COALESCE(SUM(qty), 0)
-            FROM user_set_pour_lines
-            WHERE user_id = ? AND part_num = ? AND color_id = ?
+            SELECT qty FROM user_inventory_parts
+            WHERE user_id=? AND part_num=? AND color_id=?
             """,
             (current_user.id, part_num, color_id),
         )
-        floor = int(cur.fetchone()[0] or 0)
+        prev_row = cur.fetchone()
+        prev_qty = int(prev_row["qty"]) if prev_row is not None else 0
+
+        # One conditional statement per mutation: the poured-set floor is
+        # checked against the row itself, so it can never be undercut.
+        if qty == 0:
+            cur.execute(
+                """
+                DELETE FROM user_inventory_parts
+                WHERE user_id=? AND part_num=? AND color_id=? AND poured_floor <= 0
+                RETURNING poured_floor
+                """,
+                (current_user.id, part_num, color_id),
+            )
+            row = cur.fetchone()
+            applied = row is not None or prev_row is None
+        else:
+            cur.execute(
+                """
+                INSERT INTO user_inventory_parts(user_id, part_num, color_id, qty)
+                VALUES (?,?,?,?)
+                ON CONFLICT(user_id, part_num, color_id) DO UPDATE SET qty=excluded.qty
+                WHERE excluded.qty >= user_inventory_parts.poured_floor
+                RETURNING poured_floor
+                """,
+                (current_user.id, part_num, color_id, qty),
+            )
+            row = cur.fetchone()
+            applied = row is not None
 
-        if qty < floor:
+        if not applied:
+            cur.execute(
+                """
+                SELECT poured_floor FROM user_inventory_parts
+                WHERE user_id=? AND part_num=? AND color_id=?
+                """,
+                (current_user.id, part_num, color_id),
+            )
+            floor_row = cur.fetchone()
+            floor = int(floor_row["poured_floor"]) if floor_row is not None else 0
             cur.execute(
                 """
                 SELECT set_num
@@ -642,6 +1205,7 @@ def set_canonical(payload: dict, current_user: User = Depends(get_current_user))
                 (current_user.id, part_num, color_id),
             )
             sets = [r["set_num"] if hasattr(r, "keys") else r[0] for r in cur.fetchall()]
+            con.rollback()
 
             raise HTTPException(
                 status_code=409,
@@ -656,24 +1220,10 @@ def set_canonical(payload: dict, current_user: User = Depends(get_current_user))
                 },
             )
 
-        # qty is valid vs floor
-        if qty == 0:
-            cur.execute(
-                """
-                DELETE FROM user_inventory_parts
-                WHERE user_id=? AND part_num=? AND color_id=?
-                """,
-                (current_user.id, part_num, color_id),
-            )
-        else:
-            cur.execute(
-                """
-                INSERT INTO user_inventory_parts(user_id, part_num, color_id, qty)
-                VALUES (?,?,?,?)
-                ON CONFLICT(user_id, part_num, color_id) DO UPDATE SET qty=excluded.qty
-                """,
-                (current_user.id, part_num, color_id, qty),
-            )
+        floor = int(row["poured_floor"]) if row is not None else 0
+        _record_change(
+            con, current_user.id, part_num, color_id, prev_qty, qty, "set", has_catalog
+        )
 
         con.commit()
 
@@ -703,47 +1253,48 @@ def decrement_canonical_part(
         raise HTTPException(status_code=400, detail="delta/qty must be > 0")
 
     with user_db() as con:
-        _ensure_user_inventory_tables(con)
+        has_catalog = _attach_catalog_for_stats(con)
         cur = con.cursor()
 
-        # current qty (0 if missing)
+        # Single atomic statement: only applies if the lot exists and stays at
+        # or above its poured-set floor. Concurrent taps serialize on the row.
         cur.execute(
             """
-            SELECT qty
-            FROM user_inventory_parts
+            UPDATE user_inventory_parts
+            SET qty = qty - ?
             WHERE user_id = ? AND part_num = ? AND color_id = ?
+              AND qty > 0
+              AND qty - ? >= poured_floor
+            RETURNING qty, poured_floor
             """,
-            (current_user.id, part_num, color_id),
+            (delta, current_user.id, part_num, color_id, delta),
         )
         row = cur.fetchone()
-        current_qty = int(row["qty"]) if (row is not None and hasattr(row, "keys")) else int(row[0]) if row else 0
-
-        if current_qty <= 0:
-            return {
-                "ok": True,
-                "user_id": current_user.id,
-                "part_num": part_num,
-                "color_id": color_id,
-                "qty": 0,
-                "changed": False,
-            }
-
-        # floor = qty locked-in by poured sets (sum of receipt lines)
-        cur.execute(
-            """
-            SELECT COALESCE(SUM(qty), 0) AS floor
-            FROM user_set_pour_lines
-            WHERE user_id = ? AND part_num = ? AND color_id = ?
-            """,
-            (current_user.id, part_num, color_id),
-        )
-        floor_row = cur.fetchone()
-        floor = int(floor_row["floor"]) if (floor_row is not None and hasattr(floor_row, "keys")) else int(floor_row[0] if floor_row else 0)
 
-        requested = current_qty - delta
+        if row is None:
+            # Not applied: find out why (missing/empty lot vs floor).
+            cur.execute(
+                """
+                SELECT qty, poured_floor
+                FROM user_inventory_parts
+                WHERE user_id = ? AND part_num = ? AND color_id = ?
+                """,
+                (current_user.id, part_num, color_id),
+            )
+            cur_row = cur.fetchone()
+            con.rollback()
+
+            current_qty = int(cur_row["qty"]) if cur_row is not None else 0
+            if current_qty <= 0:
+                return {
+                    "ok": True,
+                    "user_id": current_user.id,
+                    "part_num": part_num,
+                    "color_id": color_id,
+                    "qty": 0,
+                    "changed": False,
+                }
 
-        # If trying to go below floor, block with a clear message
-        if requested < floor:
             raise HTTPException(
                 status_code=409,
                 detail={
@@ -751,31 +1302,26 @@ def decrement_canonical_part(
                     "part_num": part_num,
                     "color_id": color_id,
                     "qty": current_qty,
-                    "floor": floor,
+                    "floor": int(cur_row["poured_floor"]),
                     "message": "This part is locked by poured set(s). Unpour the set (Remove from Inventory on My Sets) to go below this amount.",
                 },
             )
 
-        new_qty = requested
-        changed = new_qty != current_qty
+        new_qty = int(row["qty"])
+        floor = int(row["poured_floor"])
 
         if new_qty <= 0:
             cur.execute(
                 """
                 DELETE FROM user_inventory_parts
-                WHERE user_id = ? AND part_num = ? AND color_id = ?
+                WHERE user_id = ? AND part_num = ? AND color_id = ? AND qty <= 0
                 """,
                 (current_user.id, part_num, color_id),
             )
-        else:
-            cur.execute(
-                """
-                UPDATE user_inventory_parts
-                SET qty = ?
-                WHERE user_id = ? AND part_num = ? AND color_id = ?
-                """,
-                (new_qty, current_user.id, part_num, color_id),
-            )
+        _record_change(
+            con, current_user.id, part_num, color_id, new_qty + delta, new_qty, "decrement",
+            has_catalog,
+        )
 
         con.commit()
 
@@ -786,9 +1332,10 @@ def decrement_canonical_part(
             "color_id": color_id,
             "qty": max(new_qty, 0),
             "floor": floor,
-            "changed": changed,
+            "changed": True,
         }
-        
+
+
 @router.post("/clear-canonical")
 def clear_canonical(current_user: User = Depends(get_current_user)):
     """
@@ -796,10 +1343,32 @@ def clear_canonical(current_user: User = Depends(get_current_user)):
     This guarantees the frontend pills/toggles reset after a clear.
     """
     with user_db() as con:
-        _ensure_user_inventory_tables(con)
+        cur = con.execute(
+            """
+            INSERT INTO user_inventory_events(user_id, part_num, color_id, delta, source)
+            SELECT user_id, part_num, color_id, -qty, 'clear'
+            FROM user_inventory_parts
+            WHERE user_id=? AND qty <> 0
+            ORDER BY part_num, color_id
+            """,
+            (current_user.id,),
+        )
+        if cur.rowcount > 0:
+            _count_events(con, current_user.id, cur.rowcount)
         con.execute(
             "DELETE FROM user_inventory_parts WHERE user_id=?", (current_user.id,)
         )
+        con.execute(
+            """
+            UPDATE user_inventory_stats
+            SET total_pieces = 0, lots = 0, breakdowns = 1,
+                updated_at = datetime('now')
+            WHERE user_id=?
+            """,
+            (current_user.id,),
+        )
+        for table in ("user_inventory_stats_color", "user_inventory_stats_category"):
+            con.execute(f"DELETE FROM {table} WHERE user_id=?", (current_user.id,))
         con.execute(
             "DELETE FROM user_inventory_sets WHERE user_id=?", (current_user.id,)
         )
@@ -8,20 +8,6 @@ from app.routers.auth import get_current_user, User
 router = APIRouter()
 
 
-def _ensure_user_mysets_table(con) -> None:
-    """
-    USER DB (aim2build_app.db) source of truth for My Sets.
-    """
-    con.execute(
-        "CREATE TABLE IF NOT EXISTS user_mysets ("
-        "user_id INTEGER NOT NULL, "
-        "set_num TEXT NOT NULL, "
-        "created_at TEXT DEFAULT (datetime('now')) NOT NULL, "
-        "PRIMARY KEY(user_id, set_num)"
-        ")"
-    )
-
-
 def _norm_set_id(raw: str) -> str:
     sn = (raw or "").strip()
     if not sn:
@@ -72,7 +58,6 @@ def list_mysets(current_user: User = Depends(get_current_user)) -> Dict[str, Any
     Returns { sets: [...] } from USER DB, enriched from catalog DB.
     """
     with user_db() as con:
-        _ensure_user_mysets_table(con)
         cur = con.cursor()
         cur.execute(
             "SELECT set_num FROM user_mysets "
@@ -103,7 +88,6 @@ def add_myset(
         raise HTTPException(status_code=422, detail="Missing set id")
 
     with user_db() as con:
-        _ensure_user_mysets_table(con)
         con.execute(
             "INSERT OR IGNORE INTO user_mysets (user_id, set_num) VALUES (?, ?)",
             (current_user.id, sn),
@@ -126,7 +110,6 @@ def remove_myset(
         raise HTTPException(status_code=422, detail="Missing set id")
 
     with user_db() as con:
-        _ensure_user_mysets_table(con)
         con.execute(
             "DELETE FROM user_mysets WHERE user_id = ? AND set_num = ?",
             (current_user.id, sn),
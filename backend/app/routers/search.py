@@ -1,11 +1,22 @@
+import bisect
+import hashlib
 import os
 import re
 import sqlite3
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+import numpy as np
 from fastapi import APIRouter, HTTPException, Query
-from rapidfuzz import fuzz
-
+from rapidfuzz import fuzz, process
+
+from app.catalog_db import (
+    CatalogCache,
+    CatalogResultCache,
+    catalog_path,
+    catalog_status,
+    catalog_version,
+)
+from app.cursors import decode_cursor, encode_cursor
 from app.paths import DATA_DIR
 
 router = APIRouter()
@@ -39,7 +50,7 @@ def _clamp_limit(n: int) -> int:
 def _db() -> sqlite3.Connection:
     if not os.path.exists(DB_PATH):
         raise HTTPException(status_code=500, detail="lego_catalog.db missing")
-    con = sqlite3.connect(DB_PATH)
+    con = sqlite3.connect(catalog_path(DB_PATH))
     con.row_factory = sqlite3.Row
     return con
 
@@ -111,25 +122,74 @@ def _row_to_set(row: sqlite3.Row) -> Dict:
     }
 
 
-def _order_by(sort: str) -> str:
+# ORDER BY keys per sort: (sql expr, descending). Keyset cursors for
+# /search/paged compare against the same keys, so they must be NOT NULL on
+# searchable rows (see _base_where_clause) and end with the unique s.set_num.
+_SORT_KEYS: Dict[str, List[Tuple[str, bool]]] = {
+    "recent": [("s.year", True), ("s.set_num", False)],
+    "popular": [("s.num_parts", True), ("s.year", True), ("s.set_num", False)],
+    # fts.rank = bm25(); lower is better
+    "relevance": [("fts.rank", False), ("s.year", True), ("s.set_num", False)],
+}
+
+
+def _sort_key(sort: str, ranked: bool = False) -> str:
     s = (sort or "").strip().lower()
+    if s == "relevance" and ranked:
+        return "relevance"
     if s == "popular":
-        return "ORDER BY COALESCE(s.num_parts,0) DESC, s.year DESC, s.set_num"
+        return "popular"
     # default = recent
-    return "ORDER BY s.year DESC, s.set_num"
+    return "recent"
+
+
+def _order_by(sort: str, ranked: bool = False) -> str:
+    keys = _SORT_KEYS[_sort_key(sort, ranked)]
+    return "ORDER BY " + ", ".join(f"{expr} DESC" if desc else expr for expr, desc in keys)
+
+
+def _sets_columns(path: str) -> Set[str]:
+    con = sqlite3.connect(path)
+    try:
+        return {r[1] for r in con.execute("PRAGMA table_info(sets)").fetchall()}
+    finally:
+        con.close()
+
+
+_SETS_COLUMNS: CatalogCache[Set[str]] = CatalogCache(_sets_columns)
+
+
+def _has_set_flags() -> bool:
+    """True when the importer precomputed is_valid_set / is_gear / is_figure."""
+    if not os.path.exists(DB_PATH):
+        return False
+    return "is_valid_set" in _SETS_COLUMNS.get(DB_PATH)
 
 
 def _base_where_clause(min_parts: int) -> str:
+    # year and num_parts are keyset sort keys (_SORT_KEYS): a row with either
+    # NULL is not searchable.
+    if _has_set_flags():
+        return f"""
+            s.is_valid_set = 1
+            AND s.year IS NOT NULL
+            AND s.num_parts IS NOT NULL
+            AND s.num_parts >= {int(min_parts)}
+        """
     return f"""
         s.name IS NOT NULL
         AND TRIM(s.name) != ''
-        AND COALESCE(s.num_parts, 0) >= {int(min_parts)}
+        AND s.year IS NOT NULL
+        AND s.num_parts IS NOT NULL
+        AND s.num_parts >= {int(min_parts)}
         AND s.set_num LIKE '%-%'
     """
 
 
 def _theme_noise_clause() -> str:
     # Use themes to drop obvious non-set lines
+    if _has_set_flags():
+        return " AND s.is_gear = 0 "
     return """
         AND (
           t.name IS NULL OR (
@@ -150,6 +210,8 @@ def _theme_noise_clause() -> str:
 
 def _no_figures_clause() -> str:
     # Extra guard: exclude minifigs/collectibles unless requested (BrickHeadz are treated as sets)
+    if _has_set_flags():
+        return " AND s.is_figure = 0 "
     return """
         AND (
           (t.name IS NULL) OR (
@@ -193,10 +255,7 @@ def _alias_theme_phrase(phrase_norm: str) -> str:
     return _THEME_ALIASES.get(p, p)
 
 
-def _extract_theme_from_tokens(
-    con: sqlite3.Connection,
-    q_raw: str,
-) -> Tuple[List[int], str, bool]:
+def _extract_theme_from_tokens(q_raw: str) -> Tuple[List[int], str, bool]:
     """
     Multi-intent support:
       - If the query contains a recognizable theme phrase, extract it and return:
@@ -212,6 +271,7 @@ def _extract_theme_from_tokens(
     if not toks:
         return [], q_raw0, False
 
+    themes = _themes()
     best = None  # (start, end, root_theme_ids)
 
     # Priority special-case: if BrickHeadz appears anywhere in the query,
@@ -220,9 +280,9 @@ def _extract_theme_from_tokens(
     for i in range(len(toks)):
         # single-token form
         if toks[i] == "brickheadz":
-            tid_bh = _theme_id_by_exact_name(con, "brickheadz")
+            tid_bh = themes.by_exact_name("brickheadz")
             if tid_bh is None:
-                roots_bh = _theme_ids_by_prefix(con, "brickheadz", limit=10)
+                roots_bh = themes.by_prefix("brickheadz", limit=10)
                 if roots_bh:
                     best = (i, i + 1, roots_bh)
                     break
@@ -232,9 +292,9 @@ def _extract_theme_from_tokens(
 
         # two-token form: "brick headz"
         if i + 1 < len(toks) and toks[i] == "brick" and toks[i + 1] == "headz":
-            tid_bh = _theme_id_by_exact_name(con, "brickheadz")
+            tid_bh = themes.by_exact_name("brickheadz")
             if tid_bh is None:
-                roots_bh = _theme_ids_by_prefix(con, "brickheadz", limit=10)
+                roots_bh = themes.by_prefix("brickheadz", limit=10)
                 if roots_bh:
                     best = (i, i + 2, roots_bh)
                     break
@@ -244,7 +304,7 @@ def _extract_theme_from_tokens(
 
     if best is not None:
         i0, i1, roots = best
-        theme_ids = _expand_theme_descendants(con, roots)
+        theme_ids = themes.expand_descendants(roots)
 
         remaining_toks = toks[:i0] + toks[i1:]
         remaining_q = " ".join(remaining_toks).strip()
@@ -266,14 +326,14 @@ def _extract_theme_from_tokens(
             if n == 1 and phrase in _GENERIC_THEME_WORDS:
                 continue
 
-            tid_exact = _theme_id_by_exact_name(con, phrase)
+            tid_exact = themes.by_exact_name(phrase)
             if tid_exact is not None:
                 best = (i, i + n, [tid_exact])
                 break
 
             # prefix theme match: allow single-word or 2/3-word prefixes
             if len(phrase) >= 3:
-                roots = _theme_ids_by_prefix(con, phrase, limit=10)
+                roots = themes.by_prefix(phrase, limit=10)
                 if roots:
                     best = (i, i + n, roots)
                     break
@@ -284,7 +344,7 @@ def _extract_theme_from_tokens(
         return [], q_raw0, False
 
     i0, i1, roots = best
-    theme_ids = _expand_theme_descendants(con, roots)
+    theme_ids = themes.expand_descendants(roots)
 
     remaining_toks = toks[:i0] + toks[i1:]
     remaining_q = " ".join(remaining_toks).strip()
@@ -320,86 +380,118 @@ def _parse_theme_token(q_raw: str) -> Tuple[Optional[int], str]:
     return theme_id, rest
 
 
-def _theme_id_by_exact_name(con: sqlite3.Connection, q_norm: str) -> Optional[int]:
+class _ThemeIndex:
     """
-    Resolve a theme name -> theme_id using case-insensitive exact match.
+    All themes, loaded once per catalog version:
+      - exact:    trim(lower(name)) -> theme_id (first in catalog order)
+      - trie:     per-character trie over trim(lower(name)); every node keeps
+                  the theme_ids under it ordered by (length(name), catalog order)
+      - closure:  theme_id -> the theme and all its descendants, breadth
+                  first (children, then grandchildren...)
     """
-    qn = (q_norm or "").strip().lower()
-    if not qn:
-        return None
-
-    row = con.execute(
-        "SELECT theme_id FROM themes WHERE trim(lower(name)) = ? LIMIT 1",
-        (qn,),
-    ).fetchone()
-    if row:
-        return int(row["theme_id"])
-    return None
-
 
-def _theme_ids_by_prefix(con: sqlite3.Connection, q_norm: str, limit: int = 50) -> List[int]:
-    """
-    Resolve "brickheadz" -> [610] by prefix match,
-    but also allows multi-word themes like "star wars".
-    """
-    qn = (q_norm or "").strip().lower()
-    if not qn:
-        return []
-    rows = con.execute(
+    _IDS = "\0"  # trie node key holding the ids list
+    _PREFIX_KEEP = 50  # largest prefix limit any caller asks for
+
+    def __init__(self, path: str):
+        con = sqlite3.connect(path)
+        try:
+            rows = con.execute(
+                "SELECT theme_id, name, parent_id FROM themes ORDER BY rowid"
+            ).fetchall()
+        finally:
+            con.close()
+
+        order: List[int] = []
+        children: Dict[int, List[int]] = {}
+        self.exact: Dict[str, int] = {}
+        self.closure: Dict[int, List[int]] = {}
+        self.trie: Dict[str, Any] = {}
+
+        keyed: List[Tuple[int, int, str, int]] = []
+        for pos, (theme_id, name, parent_id) in enumerate(rows):
+            if theme_id is None:
+                continue
+            tid = int(theme_id)
+            key = (name or "").strip().lower()
+            order.append(tid)
+            self.exact.setdefault(key, tid)
+            if parent_id is not None:
+                children.setdefault(int(parent_id), []).append(tid)
+            keyed.append((len(name or ""), pos, key, tid))
+
+        for tid in order:
+            family = [tid]
+            seen = {tid}
+            i = 0
+            while i < len(family):
+                for kid in children.get(family[i], ()):
+                    if kid not in seen:
+                        seen.add(kid)
+                        family.append(kid)
+                i += 1
+            self.closure[tid] = family
+
+        for _, _, key, tid in sorted(keyed):
+            node = self.trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+                ids = node.setdefault(self._IDS, [])
+                if len(ids) < self._PREFIX_KEEP:
+                    ids.append(tid)
+
+    def by_exact_name(self, q_norm: str) -> Optional[int]:
+        qn = (q_norm or "").strip().lower()
+        if not qn:
+            return None
+        return self.exact.get(qn)
+
+    def by_prefix(self, q_norm: str, limit: int = 50) -> List[int]:
+        """Themes whose name starts with q_norm, shortest name first."""
+        qn = (q_norm or "").strip().lower()
+        if not qn:
+            return []
+        node = self.trie
+        for ch in qn:
+            node = node.get(ch)
+            if node is None:
+                return []
+        return list(node.get(self._IDS, [])[: int(limit)])
+
+    def expand_descendants(self, root_ids: List[int], max_ids: int = 300) -> List[int]:
         """
-        SELECT theme_id
-        FROM themes
-        WHERE trim(lower(name)) LIKE ? || '%'
-        ORDER BY length(name) ASC
-        LIMIT ?
-        """,
-        (qn, int(limit)),
-    ).fetchall()
-    return [int(r["theme_id"]) for r in rows]
-
-
-def _expand_theme_descendants(con: sqlite3.Connection, root_ids: List[int], max_ids: int = 300) -> List[int]:
-    """
-    Expand theme family DOWNWARD (theme + children + grandchildren...) using parent_id.
-    """
-    ids = [int(x) for x in (root_ids or []) if int(x) > 0]
-    if not ids:
-        return []
+        Theme family DOWNWARD (theme + children + grandchildren...), roots first.
+        """
+        ids = [int(x) for x in (root_ids or []) if int(x) > 0]
+        if not ids:
+            return []
+
+        out: List[int] = []
+        done: Set[int] = set()
+        for x in ids:
+            if x not in done:
+                done.add(x)
+                out.append(x)
+        for tid in ids:
+            for x in self.closure.get(tid, ()):
+                if len(out) >= int(max_ids):
+                    return out
+                if x not in done:
+                    done.add(x)
+                    out.append(x)
+        return out
 
-    placeholders = ",".join(["?"] * len(ids))
-    rows = con.execute(
-        f"""
-        WITH RECURSIVE kids(theme_id) AS (
-            SELECT theme_id
-            FROM themes
-            WHERE theme_id IN ({placeholders})
-            UNION ALL
-            SELECT t.theme_id
-            FROM themes t
-            JOIN kids k ON t.parent_id = k.theme_id
-        )
-        SELECT DISTINCT theme_id
-        FROM kids
-        LIMIT ?
-        """,
-        tuple(ids + [int(max_ids)]),
-    ).fetchall()
 
-    out = [int(r["theme_id"]) for r in rows]
+_THEME_INDEX: CatalogCache[_ThemeIndex] = CatalogCache(_ThemeIndex)
 
-    root_set = set(ids)
-    ordered = ids[:] + [x for x in out if x not in root_set]
 
-    seen: Set[int] = set()
-    final: List[int] = []
-    for x in ordered:
-        if x not in seen:
-            seen.add(x)
-            final.append(x)
-    return final
+def _themes() -> _ThemeIndex:
+    if not os.path.exists(DB_PATH):
+        raise HTTPException(status_code=500, detail="lego_catalog.db missing")
+    return _THEME_INDEX.get(DB_PATH)
 
 
-def _theme_filter_from_query(con: sqlite3.Connection, q_raw: str) -> Tuple[List[int], str, bool]:
+def _theme_filter_from_query(q_raw: str) -> Tuple[List[int], str, bool]:
     """
     Returns: (theme_ids_expanded, remaining_query, theme_forced)
 
@@ -414,10 +506,10 @@ def _theme_filter_from_query(con: sqlite3.Connection, q_raw: str) -> Tuple[List[
     # 1) explicit token
     tid, rest = _parse_theme_token(q_raw0)
     if tid is not None:
-        return _expand_theme_descendants(con, [tid]), rest, True
+        return _themes().expand_descendants([tid]), rest, True
 
     # 2) try to extract theme phrase from within the query (multi-intent)
-    theme_ids, remaining_q_norm, theme_forced = _extract_theme_from_tokens(con, q_raw0)
+    theme_ids, remaining_q_norm, theme_forced = _extract_theme_from_tokens(q_raw0)
     if theme_ids:
         return theme_ids, remaining_q_norm, theme_forced
 
@@ -431,10 +523,236 @@ def _in_clause_ints(col_sql: str, values: List[int]) -> Tuple[str, List[int]]:
     return f" AND {col_sql} IN ({placeholders}) ", [int(v) for v in values]
 
 
+# -------------------------
+# Token matching (FTS5 sets_fts, LIKE fallback)
+# -------------------------
+
+# bm25 column weights: set_num (unindexed), num, name, themes
+_FTS_RANK = "bm25(sets_fts, 0.0, 4.0, 10.0, 2.0)"
+
+
+def _has_sets_fts(con: sqlite3.Connection) -> bool:
+    """True when the importer built sets_fts and this SQLite can read it."""
+    try:
+        con.execute("SELECT 1 FROM sets_fts LIMIT 0")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def _fts_join(match: str) -> Tuple[str, List[str]]:
+    return (
+        f"""
+        JOIN (
+            SELECT set_num, {_FTS_RANK} AS rank
+            FROM sets_fts
+            WHERE sets_fts MATCH ?
+        ) AS fts ON fts.set_num = s.set_num
+        """,
+        [match],
+    )
+
+
+def _token_match(
+    con: sqlite3.Connection,
+    q_rest_raw: str,
+    q_tokens: List[str],
+) -> Tuple[str, List[str], str, List[str], bool]:
+    """
+    Every token must prefix-match a word of the set number, set name or any
+    theme on the set's theme path.
+
+    Returns (join_sql, join_params, where_sql, where_params, ranked); ranked
+    means fts.rank is available for ORDER BY.
+    """
+    if not q_tokens:
+        return "", [], "", [], False
+
+    if _has_sets_fts(con):
+        match = " AND ".join(f'"{t}"*' for t in q_tokens)
+        join_sql, join_params = _fts_join(match)
+        return join_sql, join_params, "", [], True
+
+    token_sql_parts: List[str] = []
+    token_params: List[str] = []
+    for tok in q_tokens:
+        like_tok = f"%{tok}%"
+        token_sql_parts.append(
+            "(LOWER(REPLACE(s.name, '-', ' ')) LIKE ? OR (t.name IS NOT NULL AND LOWER(REPLACE(t.name, '-', ' ')) LIKE ?))"
+        )
+        token_params.extend([like_tok, like_tok])
+
+    set_like_1 = f"%{q_rest_raw}%"
+    q2 = _norm_set_num(q_rest_raw)
+    set_like_2 = f"%{q2}%" if q2 != q_rest_raw else set_like_1
+
+    where_sql = f"""
+        AND (
+            s.set_num LIKE ?
+            OR s.set_num LIKE ?
+            OR ({" AND ".join(token_sql_parts)})
+        )
+    """
+    return "", [], where_sql, [set_like_1, set_like_2, *token_params], False
+
+
+# -------------------------
+# Result cache
+# -------------------------
+
+SEARCH_CACHE = CatalogResultCache(
+    maxsize=int(os.getenv("AIM2BUILD_SEARCH_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("AIM2BUILD_SEARCH_CACHE_TTL", "300")),
+)
+
+
+def _query_intent(q_raw_full: str) -> Tuple[Any, ...]:
+    """
+    What the search paths actually use from the raw query. Queries with the
+    same intent ("Brick Headz" / "brickheadz") return the same results, so
+    this (not the raw text) is the cache key.
+    """
+    theme_ids, q_rest_raw, theme_forced = _theme_filter_from_query(q_raw_full)
+    q_norm_full = _norm_q(q_raw_full)
+    return (
+        tuple(sorted(theme_ids)),
+        # remainder as typed: the LIKE fallback matches it against set_num
+        # (case-insensitively); everything else uses _norm_q of it
+        q_rest_raw.strip().lower(),
+        theme_forced,
+        _wants_figures(q_norm_full),
+        _allow_small_sets(q_norm_full),
+        _looks_like_set_num(q_raw_full),
+        _base_set_num(q_raw_full),
+    )
+
+
+def _cache_sort(sort: str) -> str:
+    return _sort_key(sort, ranked=True)
+
+
+@router.get("/search/cache/stats")
+def search_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters for the search result cache (monitoring)."""
+    stats = SEARCH_CACHE.stats()
+    stats["catalog_version"] = catalog_version(DB_PATH)
+    stats["catalog"] = catalog_status()
+    return stats
+
+
 # -------------------------
 # Search
 # -------------------------
 
+def _keyset_after(keys: List[Tuple[str, bool]], values: List[Any]) -> Tuple[str, List[Any]]:
+    """Rows strictly after `values` in ORDER BY `keys` order."""
+    (expr, desc), v = keys[0], values[0]
+    op = "<" if desc else ">"
+    if len(keys) == 1:
+        return f"{expr} {op} ?", [v]
+    rest_sql, rest_params = _keyset_after(keys[1:], values[1:])
+    return f"({expr} {op} ? OR ({expr} = ? AND {rest_sql}))", [v, v, *rest_params]
+
+
+def _query_key(intent: Tuple[Any, ...], sort: str, fuzzy: bool) -> str:
+    """Ties a cursor to the search intent it was issued for."""
+    raw = f"{intent!r}|{(sort or '').strip().lower()}|{int(bool(fuzzy))}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _check_cursor(after: Dict[str, Any], sort_key: str, qkey: str, n_values: int) -> None:
+    if after.get("s") != sort_key or after.get("q") != qkey:
+        raise HTTPException(status_code=400, detail="cursor does not match query")
+    values = after.get("v")
+    if (
+        not isinstance(values, list)
+        or len(values) != n_values
+        or not all(isinstance(v, (int, float, str)) and not isinstance(v, bool) for v in values)
+        or not isinstance(after.get("t"), int)
+        or not isinstance(after.get("p"), int)
+    ):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def _paged_sets(
+    cur: sqlite3.Cursor,
+    from_sql: str,
+    where_sql: str,
+    params: Tuple[Any, ...],
+    sort: str,
+    ranked: bool,
+    page: int,
+    page_size: int,
+    after: Optional[Dict[str, Any]],
+    qkey: str,
+) -> Dict[str, Any]:
+    """
+    One page of sets. Without a cursor: COUNT once, then OFFSET by `page`
+    (page 1 = no offset). With a cursor: keyset seek after the last row of the
+    previous page; total and page number ride along in the cursor.
+    """
+    sort_key = _sort_key(sort, ranked)
+    keys = _SORT_KEYS[sort_key]
+
+    keyset_sql, keyset_params = "", []
+    if after is None:
+        total = int(
+            cur.execute(f"SELECT COUNT(1) AS n {from_sql} WHERE {where_sql}", params).fetchone()["n"]
+        )
+        page_no = int(page)
+        offset = (page_no - 1) * int(page_size)
+    else:
+        _check_cursor(after, sort_key, qkey, len(keys))
+        total = int(after["t"])
+        page_no = int(after["p"])
+        offset = 0
+        # leading-key bound lets SQLite seek the sort index
+        lead_expr, lead_desc = keys[0]
+        keyset_sql, keyset_params = _keyset_after(keys, after["v"])
+        keyset_sql = f" AND {lead_expr} {'<=' if lead_desc else '>='} ? AND {keyset_sql}"
+        keyset_params = [after["v"][0], *keyset_params]
+
+    rows = cur.execute(
+        f"""
+        SELECT
+            s.set_num, s.name, s.year, s.num_parts, s.set_img_url,
+            {"fts.rank" if ranked else "NULL"} AS rank
+        {from_sql}
+        WHERE {where_sql}
+        {keyset_sql}
+        {_order_by(sort, ranked)}
+        LIMIT ? OFFSET ?
+        """,
+        (*params, *keyset_params, int(page_size) + 1, int(offset)),
+    ).fetchall()
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        cols = {"s.year": "year", "s.num_parts": "num_parts", "s.set_num": "set_num", "fts.rank": "rank"}
+        next_cursor = encode_cursor(
+            {
+                "s": sort_key,
+                "q": qkey,
+                "v": [last[cols[expr]] for expr, _ in keys],
+                "t": total,
+                "p": page_no + 1,
+            }
+        )
+
+    return {
+        "results": [_row_to_set(r) for r in rows],
+        "page": page_no,
+        "page_size": page_size,
+        "total": total,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+    }
+
+
 @router.get("/search/paged")
 def search_paged(
     q: str = Query("", min_length=0),
@@ -442,10 +760,32 @@ def search_paged(
     page_size: int = Query(60, ge=1, le=200),
     fuzzy: bool = Query(False),
     sort: str = Query("recent"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides page)"),
 ):
     q_raw_full = (q or "").strip()
     if not q_raw_full:
-        return {"results": [], "page": page, "page_size": page_size, "total": 0, "has_more": False}
+        return {"results": [], "page": page, "page_size": page_size, "total": 0, "has_more": False, "next_cursor": None}
+
+    intent = _query_intent(q_raw_full)
+    key = ("paged", intent, _cache_sort(sort), bool(fuzzy), int(page), int(page_size), cursor or "")
+    return SEARCH_CACHE.get_or_compute(
+        key,
+        lambda: _search_paged(q_raw_full, intent, page, page_size, fuzzy, sort, cursor),
+        DB_PATH,
+    )
+
+
+def _search_paged(
+    q_raw_full: str,
+    intent: Tuple[Any, ...],
+    page: int,
+    page_size: int,
+    fuzzy: bool,
+    sort: str,
+    cursor: Optional[str],
+) -> Dict[str, Any]:
+    qkey = _query_key(intent, sort, fuzzy)
+    after = decode_cursor(cursor)
 
     # ---------- NUMERIC SET SEARCH (no theme interference) ----------
     base = _base_set_num(q_raw_full)
@@ -454,15 +794,25 @@ def search_paged(
         cur = con.cursor()
 
         # Pick the highest suffix (-3 > -2 > -1) for the same base
-        sql = """
-            SELECT
-                s.set_num, s.name, s.year, s.num_parts, s.set_img_url
-            FROM sets s
-            WHERE s.set_num LIKE ? || '-%'
-            ORDER BY
-                CAST(substr(s.set_num, instr(s.set_num,'-')+1) AS INTEGER) DESC
-            LIMIT 1
-        """
+        if _has_set_flags():
+            sql = """
+                SELECT
+                    s.set_num, s.name, s.year, s.num_parts, s.set_img_url
+                FROM sets s
+                WHERE s.base_set_num = ? AND s.variant IS NOT NULL
+                ORDER BY s.variant DESC
+                LIMIT 1
+            """
+        else:
+            sql = """
+                SELECT
+                    s.set_num, s.name, s.year, s.num_parts, s.set_img_url
+                FROM sets s
+                WHERE s.set_num LIKE ? || '-%'
+                ORDER BY
+                    CAST(substr(s.set_num, instr(s.set_num,'-')+1) AS INTEGER) DESC
+                LIMIT 1
+            """
         row = cur.execute(sql, (base,)).fetchone()
         con.close()
 
@@ -474,22 +824,30 @@ def search_paged(
                 "page_size": 1,
                 "total": 1,
                 "has_more": False,
+                "next_cursor": None,
             }
 
-    # True pagination: exact search only (fuzzy slices a precomputed candidate list).
+    # Fuzzy slices a precomputed candidate list; its cursor is a plain offset.
     if fuzzy:
         rows = fuzzy_search_sets(q_raw_full, limit=2500)
         total = len(rows)
-        start = (page - 1) * page_size
+        if after is not None:
+            if after.get("s") != "fuzzy" or after.get("q") != qkey or not isinstance(after.get("o"), int):
+                raise HTTPException(status_code=400, detail="cursor does not match query")
+            start = max(int(after["o"]), 0)
+            page = int(after["p"]) if isinstance(after.get("p"), int) else page
+        else:
+            start = (page - 1) * page_size
         end = start + page_size
         results = rows[start:end]
-        return {"results": results, "page": page, "page_size": page_size, "total": total, "has_more": end < total}
+        next_cursor = encode_cursor({"s": "fuzzy", "q": qkey, "o": end, "p": page + 1}) if end < total else None
+        return {"results": results, "page": page, "page_size": page_size, "total": total, "has_more": end < total, "next_cursor": next_cursor}
 
     con = _db()
     cur = con.cursor()
 
-    # Theme filtering (DB-driven)
-    theme_ids, q_rest_raw, theme_forced = _theme_filter_from_query(con, q_raw_full)
+    # Theme filtering (in-memory theme index)
+    theme_ids, q_rest_raw, theme_forced = _theme_filter_from_query(q_raw_full)
     theme_sql, theme_params = _in_clause_ints("s.theme_id", theme_ids)
 
     # intent based on full query
@@ -499,7 +857,10 @@ def search_paged(
     looks_set = _looks_like_set_num(q_raw_full)
     min_parts = 20 if (looks_set or allow_small) else 50
 
-    offset = (page - 1) * page_size
+    from_sql = """
+        FROM sets s
+        LEFT JOIN themes t ON t.theme_id = s.theme_id
+    """
 
     # ---------- PURE THEME MODE ----------
     q_rest_norm = _norm_q(q_rest_raw)
@@ -510,29 +871,9 @@ def search_paged(
             {" " if (wants_figures or theme_forced) else _no_figures_clause()}
             {theme_sql}
         """
-
-        count_sql = f"""
-            SELECT COUNT(1) AS n
-            FROM sets s
-            LEFT JOIN themes t ON t.theme_id = s.theme_id
-            WHERE {where_sql}
-        """
-        total = int(cur.execute(count_sql, (*theme_params,)).fetchone()["n"])
-
-        page_sql = f"""
-            SELECT
-                s.set_num, s.name, s.year, s.num_parts, s.set_img_url,
-                t.name AS theme_name
-            FROM sets s
-            LEFT JOIN themes t ON t.theme_id = s.theme_id
-            WHERE {where_sql}
-            {_order_by(sort)}
-            LIMIT ? OFFSET ?
-        """
-        cur.execute(page_sql, (*theme_params, int(page_size), int(offset)))
-        results = [_row_to_set(r) for r in cur.fetchall()]
+        out = _paged_sets(cur, from_sql, where_sql, (*theme_params,), sort, False, page, page_size, after, qkey)
         con.close()
-        return {"results": results, "page": page, "page_size": page_size, "total": total, "has_more": (offset + len(results)) < total}
+        return out
 
     # ---------- DEFAULT LIST MODE ----------
     q_norm = _strip_stopwords(_norm_q(q_rest_raw))
@@ -544,89 +885,32 @@ def search_paged(
             {_theme_noise_clause()}
             {_no_figures_clause()}
         """
-
-        count_sql = f"""
-            SELECT COUNT(1) AS n
-            FROM sets s
-            LEFT JOIN themes t ON t.theme_id = s.theme_id
-            WHERE {where_sql}
-        """
-        total = int(cur.execute(count_sql).fetchone()["n"])
-
-        page_sql = f"""
-            SELECT
-                s.set_num, s.name, s.year, s.num_parts, s.set_img_url,
-                t.name AS theme_name
-            FROM sets s
-            LEFT JOIN themes t ON t.theme_id = s.theme_id
-            WHERE {where_sql}
-            {_order_by(sort)}
-            LIMIT ? OFFSET ?
-        """
-        cur.execute(page_sql, (int(page_size), int(offset)))
-        results = [_row_to_set(r) for r in cur.fetchall()]
+        out = _paged_sets(cur, from_sql, where_sql, (), sort, False, page, page_size, after, qkey)
         con.close()
-        return {"results": results, "page": page, "page_size": page_size, "total": total, "has_more": (offset + len(results)) < total}
+        return out
 
     # ---------- NORMAL MODE ----------
-    token_sql_parts: List[str] = []
-    token_params: List[str] = []
-    for tok in q_tokens:
-        like_tok = f"%{tok}%"
-        token_sql_parts.append(
-            "(LOWER(REPLACE(s.name, '-', ' ')) LIKE ? OR (t.name IS NOT NULL AND LOWER(REPLACE(t.name, '-', ' ')) LIKE ?))"
-        )
-        token_params.extend([like_tok, like_tok])
-
-    token_sql = " AND ".join(token_sql_parts) if token_sql_parts else "1=1"
-
-    set_like_1 = f"%{q_rest_raw}%"
-    q2 = _norm_set_num(q_rest_raw)
-    set_like_2 = f"%{q2}%" if q2 != q_rest_raw else set_like_1
+    match_join, match_join_params, match_sql, match_params, ranked = _token_match(
+        con, q_rest_raw, q_tokens
+    )
 
     where_sql = f"""
         ({_base_where_clause(min_parts)})
         {_theme_noise_clause()}
         {" " if (wants_figures or theme_forced) else _no_figures_clause()}
         {theme_sql}
-        AND (
-            s.set_num LIKE ?
-            OR s.set_num LIKE ?
-            OR ({token_sql})
-        )
+        {match_sql}
     """
-
-    count_sql = f"""
-        SELECT COUNT(1) AS n
+    from_sql = f"""
         FROM sets s
+        {match_join}
         LEFT JOIN themes t ON t.theme_id = s.theme_id
-        WHERE {where_sql}
     """
-    total = int(
-        cur.execute(
-            count_sql,
-            (*theme_params, set_like_1, set_like_2, *token_params),
-        ).fetchone()["n"]
-    )
+    params = (*match_join_params, *theme_params, *match_params)
 
-    page_sql = f"""
-        SELECT
-            s.set_num, s.name, s.year, s.num_parts, s.set_img_url,
-            t.name AS theme_name
-        FROM sets s
-        LEFT JOIN themes t ON t.theme_id = s.theme_id
-        WHERE {where_sql}
-        {_order_by(sort)}
-        LIMIT ? OFFSET ?
-    """
-    cur.execute(
-        page_sql,
-        (*theme_params, set_like_1, set_like_2, *token_params, int(page_size), int(offset)),
-    )
-    results = [_row_to_set(r) for r in cur.fetchall()]
+    out = _paged_sets(cur, from_sql, where_sql, params, sort, ranked, page, page_size, after, qkey)
     con.close()
-
-    return {"results": results, "page": page, "page_size": page_size, "total": total, "has_more": (offset + len(results)) < total}
+    return out
 
 
 def _do_search(q: str, limit: int = DEFAULT_LIMIT, sort: str = "recent") -> List[Dict]:
@@ -634,11 +918,16 @@ def _do_search(q: str, limit: int = DEFAULT_LIMIT, sort: str = "recent") -> List
     if not q_raw_full:
         return []
 
+    key = ("exact", _query_intent(q_raw_full), _cache_sort(sort), _clamp_limit(limit))
+    return SEARCH_CACHE.get_or_compute(key, lambda: _run_search(q_raw_full, limit, sort), DB_PATH)
+
+
+def _run_search(q_raw_full: str, limit: int, sort: str) -> List[Dict]:
     con = _db()
     cur = con.cursor()
     limit = _clamp_limit(limit)
 
-    theme_ids, q_rest_raw, theme_forced = _theme_filter_from_query(con, q_raw_full)
+    theme_ids, q_rest_raw, theme_forced = _theme_filter_from_query(q_raw_full)
     theme_sql, theme_params = _in_clause_ints("s.theme_id", theme_ids)
 
     q_norm_full = _norm_q(q_raw_full)
@@ -690,57 +979,213 @@ def _do_search(q: str, limit: int = DEFAULT_LIMIT, sort: str = "recent") -> List
         con.close()
         return out
 
-    token_sql_parts: List[str] = []
-    token_params: List[str] = []
-    for tok in q_tokens:
-        like_tok = f"%{tok}%"
-        token_sql_parts.append(
-            "(LOWER(REPLACE(s.name, '-', ' ')) LIKE ? OR (t.name IS NOT NULL AND LOWER(REPLACE(t.name, '-', ' ')) LIKE ?))"
-        )
-        token_params.extend([like_tok, like_tok])
-
-    token_sql = " AND ".join(token_sql_parts) if token_sql_parts else "1=1"
-
-    set_like_1 = f"%{q_rest_raw}%"
-    q2 = _norm_set_num(q_rest_raw)
-    set_like_2 = f"%{q2}%" if q2 != q_rest_raw else set_like_1
+    match_join, match_join_params, match_sql, match_params, ranked = _token_match(
+        con, q_rest_raw, q_tokens
+    )
 
     sql = f"""
         SELECT
             s.set_num, s.name, s.year, s.num_parts, s.set_img_url,
             t.name AS theme_name
         FROM sets s
+        {match_join}
         LEFT JOIN themes t ON t.theme_id = s.theme_id
         WHERE
             ({_base_where_clause(min_parts)})
             {_theme_noise_clause()}
             {" " if (wants_figures or theme_forced) else _no_figures_clause()}
             {theme_sql}
-            AND (
-                s.set_num LIKE ?
-                OR s.set_num LIKE ?
-                OR ({token_sql})
-            )
-        {_order_by(sort)}
+            {match_sql}
+        {_order_by(sort, ranked)}
         LIMIT ?
     """
-    cur.execute(sql, (*theme_params, set_like_1, set_like_2, *token_params, int(limit)))
+    cur.execute(sql, (*match_join_params, *theme_params, *match_params, int(limit)))
     out: List[Dict] = [_row_to_set(r) for r in cur.fetchall()]
     con.close()
     return out
 
 
+# -------------------------
+# Resident fuzzy index
+# -------------------------
+
+class _FuzzySetIndex:
+    """
+    Every set with its pre-normalized haystack (set_num + name + theme) and
+    the base / noise / figure filters evaluated once as boolean masks.
+    Rows keep catalog (rowid) order, which is the tie-break for equal scores.
+
+    token_set_ratio(q, h) only differs from ratio(sorted(q), sorted(h)) (on
+    deduplicated tokens) when q and h share a token, so search() scores every
+    row with the cheap ratio over pre-sorted token strings and re-scores just
+    the rows found through the token postings. Of those, rows whose length-only
+    upper bound cannot reach the cutoff are skipped before the full scorer.
+    """
+
+    def __init__(self, path: str):
+        con = sqlite3.connect(path)
+        con.row_factory = sqlite3.Row
+        try:
+            rows = con.execute(
+                f"""
+                SELECT
+                    s.set_num, s.name, s.year, s.num_parts, s.set_img_url,
+                    s.theme_id,
+                    t.name AS theme_name,
+                    ({_base_where_clause(0)}) AS is_base,
+                    (1 {_theme_noise_clause()}) AS not_noise,
+                    (1 {_no_figures_clause()}) AS not_figure
+                FROM sets s
+                LEFT JOIN themes t ON t.theme_id = s.theme_id
+                ORDER BY s.rowid
+                """
+            ).fetchall()
+        finally:
+            con.close()
+
+        self.items: List[Dict] = [_row_to_set(r) for r in rows]
+        self.haystacks: List[str] = [
+            _norm_q(f"{(r['set_num'] or '').strip()} {(r['name'] or '').strip()} {(r['theme_name'] or '').strip()}")
+            for r in rows
+        ]
+        self.sorted_tokens: List[str] = [" ".join(sorted(set(h.split()))) for h in self.haystacks]
+        self.tok_chars = np.array(
+            [len(t) - t.count(" ") for t in self.sorted_tokens], dtype=np.int64
+        )
+        self.tok_count = np.array([len(t.split()) for t in self.sorted_tokens], dtype=np.int64)
+        postings: Dict[str, List[int]] = {}
+        for i, h in enumerate(self.haystacks):
+            for tok in set(h.split()):
+                postings.setdefault(tok, []).append(i)
+        self.postings: Dict[str, np.ndarray] = {
+            tok: np.asarray(rows, dtype=np.int64) for tok, rows in postings.items()
+        }
+        self.theme_ids = np.array(
+            [int(r["theme_id"]) if r["theme_id"] is not None else -1 for r in rows], dtype=np.int64
+        )
+        self.num_parts = np.array([int(r["num_parts"] or 0) for r in rows], dtype=np.int64)
+        self.base_ok = np.array([bool(r["is_base"]) and bool(r["not_noise"]) for r in rows], dtype=bool)
+        self.not_figure = np.array([bool(r["not_figure"]) for r in rows], dtype=bool)
+
+    def _shared_token_scores(
+        self, q_norm: str, q_tokens: Set[str], rows: np.ndarray, cutoff: int
+    ) -> np.ndarray:
+        """token_set_ratio for rows sharing at least one token with the query."""
+        # per row: shared token count and characters (sect), query-only (ab)
+        # and row-only (ba) token counts and characters
+        shared = np.zeros(rows.size, dtype=np.int64)
+        sect_chars = np.zeros(rows.size, dtype=np.int64)
+        for tok in q_tokens:
+            post = self.postings.get(tok)
+            if post is None:
+                continue
+            has = np.isin(rows, post, assume_unique=True)
+            shared += has
+            sect_chars += has * len(tok)
+        ab_n = len(q_tokens) - shared
+        ba_n = self.tok_count[rows] - shared
+        ab_chars = sum(len(t) for t in q_tokens) - sect_chars
+        ba_chars = self.tok_chars[rows] - sect_chars
+
+        # joined lengths ("a b c"); shared >= 1 on every row
+        sect_len = sect_chars + shared - 1
+        ab_len = ab_chars + np.maximum(ab_n - 1, 0)
+        ba_len = ba_chars + np.maximum(ba_n - 1, 0)
+
+        out = np.zeros(rows.size, dtype=np.float64)
+        subset = (ab_n == 0) | (ba_n == 0)
+        out[subset] = 100
+
+        # token_set_ratio is the best of: indel(ab, ba) normalized over
+        # len(sect+ab) + len(sect+ba), and ratio(sect, sect+ab|ba). The last two
+        # are exact from lengths; indel(ab, ba) >= |len(ab) - len(ba)|.
+        sect_ab = sect_len + 1 + ab_len
+        sect_ba = sect_len + 1 + ba_len
+        r_diff = 100.0 * (1.0 - np.abs(ab_len - ba_len) / (sect_ab + sect_ba))
+        r_ab = 100.0 * (1.0 - (ab_len + 1) / (sect_len + sect_ab))
+        r_ba = 100.0 * (1.0 - (ba_len + 1) / (sect_len + sect_ba))
+        bound = np.maximum(r_diff, np.maximum(r_ab, r_ba))
+        need = ~subset & (bound >= cutoff - 1e-6)
+
+        if need.any():
+            out[need] = process.cdist(
+                [q_norm],
+                [self.haystacks[i] for i in rows[need]],
+                scorer=fuzz.token_set_ratio,
+                score_cutoff=cutoff,
+                dtype=np.float64,
+                workers=-1,
+            )[0]
+        return out
+
+    def search(
+        self,
+        q_norm: str,
+        theme_ids: List[int],
+        min_parts: int,
+        allow_figures: bool,
+        limit: int,
+        min_score: int,
+    ) -> List[Dict]:
+        mask = self.base_ok & (self.num_parts >= int(min_parts))
+        if not allow_figures:
+            mask &= self.not_figure
+        if theme_ids:
+            mask &= np.isin(self.theme_ids, np.asarray(theme_ids, dtype=np.int64))
+        idx = np.flatnonzero(mask)
+
+        if theme_ids and not q_norm:
+            return [dict(self.items[i]) for i in idx[: int(limit)]]
+        if idx.size == 0:
+            return []
+
+        q_tokens = set(q_norm.split())
+        cutoff = int(min_score)
+        scores = np.zeros(len(self.items), dtype=np.float64)
+
+        # no shared token: token_set_ratio == ratio of the sorted token strings
+        # (scores below the cutoff come back as 0)
+        scores[idx] = process.cdist(
+            [" ".join(sorted(q_tokens))],
+            [self.sorted_tokens[i] for i in idx],
+            scorer=fuzz.ratio,
+            score_cutoff=cutoff,
+            dtype=np.float64,
+            workers=-1,
+        )[0]
+
+        # shared token: the union of the query tokens' postings
+        posted = [self.postings[t] for t in q_tokens if t in self.postings]
+        if posted:
+            overlap = np.unique(np.concatenate(posted))
+            overlap = overlap[mask[overlap]]
+            scores[overlap] = self._shared_token_scores(q_norm, q_tokens, overlap, cutoff)
+
+        # both scoring paths agree only up to float noise; round so equal
+        # scores tie-break on catalog order
+        scores = np.round(scores, 6)
+        hits = idx[scores[idx] >= cutoff]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [dict(self.items[i]) for i in hits[: int(limit)]]
+
+
+_FUZZY_INDEX: CatalogCache[_FuzzySetIndex] = CatalogCache(_FuzzySetIndex)
+
+
 def fuzzy_search_sets(q: str, limit: int = 80, min_score: int = 70) -> List[Dict]:
     q_raw_full = (q or "").strip()
     if not q_raw_full:
         return []
 
-    con = _db()
-    cur = con.cursor()
-    limit = _clamp_limit(limit)
+    key = ("fuzzy", _query_intent(q_raw_full), _clamp_limit(limit), int(min_score))
+    return SEARCH_CACHE.get_or_compute(
+        key, lambda: _run_fuzzy_search(q_raw_full, limit, min_score), DB_PATH
+    )
 
-    theme_ids, q_rest_raw, theme_forced = _theme_filter_from_query(con, q_raw_full)
-    theme_sql, theme_params = _in_clause_ints("s.theme_id", theme_ids)
+
+def _run_fuzzy_search(q_raw_full: str, limit: int, min_score: int) -> List[Dict]:
+    theme_ids, q_rest_raw, theme_forced = _theme_filter_from_query(q_raw_full)
+    limit = _clamp_limit(limit)
 
     q_norm_full = _norm_q(q_raw_full)
     wants_figures = _wants_figures(q_norm_full)
@@ -748,76 +1193,16 @@ def fuzzy_search_sets(q: str, limit: int = 80, min_score: int = 70) -> List[Dict
     looks_set = _looks_like_set_num(q_raw_full)
     min_parts = 20 if (looks_set or allow_small) else 50
 
-    q_norm = _norm_q(q_rest_raw)
-
-    if theme_ids and not q_norm:
-        cur.execute(
-            f"""
-            SELECT
-                s.set_num, s.name, s.year, s.num_parts, s.set_img_url,
-                t.name AS theme_name
-            FROM sets s
-            LEFT JOIN themes t ON t.theme_id = s.theme_id
-            WHERE
-                ({_base_where_clause(min_parts)})
-                {_theme_noise_clause()}
-                {" " if (wants_figures or theme_forced) else _no_figures_clause()}
-                {theme_sql}
-            LIMIT 2500
-            """,
-            (*theme_params,),
-        )
-    else:
-        like = f"%{q_norm}%"
-        cur.execute(
-            f"""
-            SELECT
-                s.set_num, s.name, s.year, s.num_parts, s.set_img_url,
-                t.name AS theme_name
-            FROM sets s
-            LEFT JOIN themes t ON t.theme_id = s.theme_id
-            WHERE
-                ({_base_where_clause(min_parts)})
-                {_theme_noise_clause()}
-                {" " if (wants_figures or theme_forced) else _no_figures_clause()}
-                {theme_sql}
-                AND (
-                    LOWER(REPLACE(s.name, '-', ' ')) LIKE ?
-                    OR s.set_num LIKE ?
-                    OR (t.name IS NOT NULL AND LOWER(REPLACE(t.name, '-', ' ')) LIKE ?)
-                )
-            LIMIT 2500
-            """,
-            (*theme_params, like, like, like),
-        )
-
-    rows = cur.fetchall()
-    con.close()
-    if not rows:
-        return []
-
-    candidates: List[Dict] = []
-    for row in rows:
-        set_num = (row["set_num"] or "").strip()
-        name = (row["name"] or "").strip()
-        theme_name = (row["theme_name"] or "").strip()
-        hay = _norm_q(f"{set_num} {name} {theme_name}")
-
-        if theme_ids and not q_norm:
-            score = 100
-        else:
-            score = fuzz.token_set_ratio(q_norm, hay)
-
-        if score >= int(min_score):
-            item = _row_to_set(row)
-            item["_score"] = score
-            candidates.append(item)
-
-    candidates.sort(key=lambda x: x.get("_score", 0), reverse=True)
-    trimmed = candidates[: int(limit)]
-    for item in trimmed:
-        item.pop("_score", None)
-    return trimmed
+    if not os.path.exists(DB_PATH):
+        raise HTTPException(status_code=500, detail="lego_catalog.db missing")
+    return _FUZZY_INDEX.get(DB_PATH).search(
+        _norm_q(q_rest_raw),
+        theme_ids,
+        min_parts=min_parts,
+        allow_figures=(wants_figures or theme_forced),
+        limit=limit,
+        min_score=min_score,
+    )
 
 
 def _search_with_fuzzy(q: str, fuzzy: bool = False, limit: int = DEFAULT_LIMIT, sort: str = "recent") -> List[Dict]:
@@ -858,4 +1243,152 @@ def legacy_search_sets(
     limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
     sort: str = Query("recent"),
 ) -> List[Dict]:
-    return _do_search(q, limit=limit, sort=sort)
\ No newline at end of file
+    return _do_search(q, limit=limit, sort=sort)
+
+
+# -------------------------
+# Typeahead suggestions
+# -------------------------
+
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 25
+SUGGEST_MAX_THEMES = 3
+
+
+class _SuggestIndex:
+    """
+    Sorted-array prefix index, built once per catalog version.
+
+    keys[i] is a lookup string, target[i] the row it points at:
+      - sets:   set_num ("75192-1") and every word-suffix of the normalized
+                name ("millennium falcon", "falcon"), so typing any word of a
+                name finds it
+      - themes: every word-suffix of the normalized theme name
+
+    A prefix is the contiguous key range [bisect_left(p), bisect_left(p + max));
+    the best rows in that range come from one argpartition over a score slice.
+    """
+
+    _HIGH = "\uffff"
+
+    def __init__(self, path: str):
+        con = sqlite3.connect(path)
+        con.row_factory = sqlite3.Row
+        try:
+            sets = con.execute(
+                f"""
+                SELECT s.set_num, s.name, s.year, s.num_parts, s.set_img_url
+                FROM sets s
+                LEFT JOIN themes t ON t.theme_id = s.theme_id
+                WHERE ({_base_where_clause(1)})
+                  {_theme_noise_clause()}
+                  {_no_figures_clause()}
+                """
+            ).fetchall()
+            themes = con.execute(
+                """
+                SELECT t.theme_id, t.name, COUNT(s.set_num) AS n_sets
+                FROM themes t
+                LEFT JOIN sets s ON s.theme_id = t.theme_id
+                GROUP BY t.theme_id
+                """
+            ).fetchall()
+        finally:
+            con.close()
+
+        self.sets: List[Dict] = [_row_to_set(r) for r in sets]
+        # several themes share a name (sub-themes); suggest the biggest one
+        by_name: Dict[str, Dict] = {}
+        for r in themes:
+            name = (r["name"] or "").strip()
+            item = {"theme_id": int(r["theme_id"]), "name": name, "set_count": int(r["n_sets"] or 0)}
+            cur = by_name.get(name.lower())
+            if name and (cur is None or item["set_count"] > cur["set_count"]):
+                by_name[name.lower()] = item
+        self.themes: List[Dict] = list(by_name.values())
+
+        entries: List[Tuple[str, int, int]] = []  # (key, kind 0=set 1=theme, row)
+        for i, item in enumerate(self.sets):
+            entries.append((item["set_num"].lower(), 0, i))
+            for key in self._word_suffixes(item["name"]):
+                entries.append((key, 0, i))
+        for i, item in enumerate(self.themes):
+            for key in self._word_suffixes(item["name"]):
+                entries.append((key, 1, i))
+        entries.sort()
+
+        self.keys: List[str] = [e[0] for e in entries]
+        self.is_theme = np.array([e[1] == 1 for e in entries], dtype=bool)
+        self.row = np.array([e[2] for e in entries], dtype=np.int64)
+        # popularity: sets by num_parts then year, themes by set count
+        set_score = np.array(
+            [item["num_parts"] * 10000 + (item["year"] or 0) for item in self.sets] or [0], dtype=np.int64
+        )
+        theme_score = np.array([item["set_count"] for item in self.themes] or [0], dtype=np.int64)
+        self.score = np.where(self.is_theme, theme_score[np.where(self.is_theme, self.row, 0)],
+                              set_score[np.where(self.is_theme, 0, self.row)])
+
+    @staticmethod
+    def _word_suffixes(name: str) -> List[str]:
+        toks = _norm_q(name).split()
+        return [" ".join(toks[i:]) for i in range(len(toks))]
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + self._HIGH, lo)
+        return lo, hi
+
+    def _top(self, ranges: List[Tuple[int, int]], theme: bool, n: int) -> List[int]:
+        """Distinct rows of one kind, best score first, from the key ranges."""
+        if n <= 0:
+            return []
+        idx = np.concatenate([np.arange(lo, hi) for lo, hi in ranges])
+        idx = idx[self.is_theme[idx] == theme]
+        if idx.size == 0:
+            return []
+        # a row can sit under several keys: over-fetch, then widen if dedupe ran short
+        k = n * 4
+        while True:
+            if k < idx.size:
+                best = idx[np.argpartition(-self.score[idx], k - 1)[:k]]
+            else:
+                best = idx
+            best = best[np.argsort(-self.score[best], kind="stable")]
+            out = list(dict.fromkeys(int(r) for r in self.row[best]))[:n]
+            if len(out) == n or k >= idx.size:
+                return out
+            k *= 4
+
+    def suggest(self, q: str, limit: int) -> List[Dict]:
+        raw = (q or "").strip().lower()
+        norm = _norm_q(q)
+        prefixes = {p for p in (raw, norm) if p}
+        if not prefixes:
+            return []
+        ranges = [self._range(p) for p in prefixes]
+
+        out: List[Dict] = []
+        for r in self._top(ranges, True, min(SUGGEST_MAX_THEMES, limit)):
+            t = self.themes[r]
+            out.append({"type": "theme", "label": t["name"], "theme_id": t["theme_id"], "set_count": t["set_count"]})
+        for r in self._top(ranges, False, limit - len(out)):
+            item = self.sets[r]
+            out.append({"type": "set", "label": item["name"], **item})
+        return out
+
+
+_SUGGEST_INDEX: CatalogCache[_SuggestIndex] = CatalogCache(_SuggestIndex)
+
+
+@router.get("/search/suggest")
+def search_suggest(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(SUGGEST_DEFAULT_LIMIT, ge=1, le=SUGGEST_MAX_LIMIT),
+) -> List[Dict]:
+    """
+    Typeahead: themes (by set count, at most 3) then sets (by num_parts, year)
+    whose set number or any name word starts with the typed text.
+    """
+    if not os.path.exists(DB_PATH):
+        raise HTTPException(status_code=500, detail="lego_catalog.db missing")
+    return _SUGGEST_INDEX.get(DB_PATH).suggest(q, limit)
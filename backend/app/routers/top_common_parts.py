@@ -8,69 +8,8 @@ from app.catalog_db import db
 router = APIRouter()
 
 
-def _rebuild_top_common_parts(limit: int) -> None:
-    with db() as con:
-        cur = con.cursor()
-        cur.execute("BEGIN")
-        try:
-            cur.execute("DROP TABLE IF EXISTS top_common_parts")
-            cur.execute(
-                """
-                CREATE TABLE top_common_parts (
-                  part_num   TEXT NOT NULL,
-                  color_id   INTEGER NOT NULL,
-                  total_qty  INTEGER NOT NULL,
-                  set_count  INTEGER NOT NULL,
-                  updated_at TEXT NOT NULL DEFAULT (datetime('now'))
-                )
-                """
-            )
-
-            insert_sql = """
-                INSERT INTO top_common_parts (part_num, color_id, total_qty, set_count)
-                SELECT
-                  sp.part_num,
-                  sp.color_id,
-                  CAST(SUM(sp.qty_per_set) AS INTEGER)        AS total_qty,
-                  CAST(COUNT(DISTINCT sp.set_num) AS INTEGER) AS set_count
-                FROM set_parts AS sp
-                GROUP BY sp.part_num, sp.color_id
-                ORDER BY total_qty DESC
-                LIMIT ?
-            """
-            cur.execute(insert_sql, (limit,))
-
-            cur.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_tcp_part_color
-                ON top_common_parts(part_num, color_id)
-                """
-            )
-            cur.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_tcp_total_qty
-                ON top_common_parts(total_qty DESC)
-                """
-            )
-            cur.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_tcp_set_count
-                ON top_common_parts(set_count DESC)
-                """
-            )
-
-            cur.execute("COMMIT")
-        except Exception:
-            cur.execute("ROLLBACK")
-            raise
-
-
-@router.post("/top_common_parts/rebuild")
-def rebuild_top_common_parts(
-    limit: int = Query(5000, ge=1),
-) -> Dict[str, int]:
-    _rebuild_top_common_parts(limit)
-    return {"limit": limit}
+# Built by the catalog importer (catalog_import _fill_top_common_parts) and
+# refreshed by POST /api/catalog/derived/rebuild.
 
 
 @router.get("/top_common_parts")
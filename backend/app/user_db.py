@@ -2,6 +2,8 @@ from contextlib import contextmanager
 from pathlib import Path
 import sqlite3
 
+from app import catalog_db
+
 BASE_DIR = Path(__file__).resolve().parent
 USER_DB_PATH = BASE_DIR / "data" / "aim2build_app.db"
 
@@ -12,4 +14,26 @@ def user_db():
     try:
         yield con
     finally:
-        con.close()
\ No newline at end of file
+        con.close()
+
+
+def attach_catalog(con: sqlite3.Connection, alias: str = "cat") -> bool:
+    """
+    ATTACH lego_catalog.db to a USER DB connection so inventory reads can
+    join catalog tables (element_images, parts, ...) in a single query.
+
+    Returns False (and attaches nothing) if the catalog file is missing.
+    """
+    path = Path(catalog_db.catalog_path())
+    if not path.exists():
+        return False
+    con.execute(f"ATTACH DATABASE ? AS {alias}", (str(path),))
+    return True
+
+
+def attached_table_exists(con: sqlite3.Connection, alias: str, name: str) -> bool:
+    row = con.execute(
+        f"SELECT 1 FROM {alias}.sqlite_master WHERE type='table' AND name=? LIMIT 1",
+        (name,),
+    ).fetchone()
+    return row is not None
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark inventory image enrichment on a large synthetic inventory.
+
+Compares:
+  - per-row:  one catalog connection + element_images query per inventory row
+              (the old _img_for loop in routers/inventory.py)
+  - batched:  _load_db_parts_with_images (ATTACH lego_catalog.db + LEFT JOIN)
+
+Everything runs against throwaway DBs in a temp dir; the real
+aim2build_app.db / lego_catalog.db are never touched.
+
+Usage (from backend/):
+  python scripts/a2b_bench_inventory_images.py --lots 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import app.catalog_db as catalog_db  # noqa: E402
+import app.db as app_db  # noqa: E402
+import app.user_db as user_db_mod  # noqa: E402
+
+
+def _build_catalog(path: Path, n_parts: int, n_colors: int) -> None:
+    con = sqlite3.connect(path)
+    con.execute(
+        """
+        CREATE TABLE element_images (
+            part_num TEXT NOT NULL,
+            color_id INTEGER NOT NULL,
+            img_url  TEXT NOT NULL,
+            PRIMARY KEY (part_num, color_id)
+        )
+        """
+    )
+    rows = (
+        (f"p{i}", c, f"https://cdn.rebrickable.com/media/parts/elements/{i}{c}.jpg")
+        for i in range(n_parts)
+        for c in range(n_colors)
+        if (i + c) % 3 != 0  # leave gaps so some rows have no image
+    )
+    con.executemany("INSERT INTO element_images VALUES (?,?,?)", rows)
+    con.commit()
+    con.close()
+
+
+def _build_inventory(user_id: int, lots: int, n_parts: int, n_colors: int) -> None:
+    rnd = random.Random(42)
+    keys = set()
+    while len(keys) < lots:
+        keys.add((f"p{rnd.randrange(n_parts)}", rnd.randrange(n_colors)))
+
+    with user_db_mod.user_db() as con:
+        con.executemany(
+            "INSERT INTO user_inventory_parts(user_id, part_num, color_id, qty) VALUES (?,?,?,?)",
+            ((user_id, pn, cid, rnd.randint(1, 50)) for pn, cid in keys),
+        )
+        con.commit()
+
+
+def _per_row(user_id: int) -> list:
+    from app.routers.inventory import _load_db_parts
+
+    parts = _load_db_parts(user_id)
+    for p in parts:
+        with catalog_db.db() as con:
+            row = con.execute(
+                "SELECT img_url FROM element_images WHERE part_num=? AND color_id=? LIMIT 1",
+                (p["part_num"], int(p["color_id"])),
+            ).fetchone()
+        p["part_img_url"] = row["img_url"] if row else None
+    return parts
+
+
+def _batched(user_id: int) -> list:
+    from app.routers.inventory import _load_db_parts_with_images
+
+    return _load_db_parts_with_images(user_id)
+
+
+def _time(fn, user_id: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(user_id)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lots", type=int, default=10000)
+    ap.add_argument("--parts", type=int, default=20000)
+    ap.add_argument("--colors", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        catalog_db.DB_PATH = tmp_dir / "lego_catalog.db"
+        app_db.DB_PATH = tmp_dir / "aim2build_app.db"
+        user_db_mod.USER_DB_PATH = tmp_dir / "aim2build_app.db"
+        app_db.init_db()
+
+        print(f"Building synthetic catalog ({args.parts} parts x {args.colors} colours)...")
+        _build_catalog(catalog_db.DB_PATH, args.parts, args.colors)
+        print(f"Building synthetic inventory ({args.lots} lots)...")
+        _build_inventory(1, args.lots, args.parts, args.colors)
+
+        a = _per_row(1)
+        b = _batched(1)
+        if a != b:
+            print("MISMATCH: per-row and batched results differ", file=sys.stderr)
+            return 1
+
+        t_row = _time(_per_row, 1, args.repeat)
+        t_batch = _time(_batched, 1, args.repeat)
+
+    print(f"lots={args.lots}")
+    print(f"per-row : {t_row * 1000:9.1f} ms")
+    print(f"batched : {t_batch * 1000:9.1f} ms")
+    print(f"speedup : {t_row / t_batch:9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for /api/search/suggest (typeahead).
+
+Replays every prefix of each query as if typed one key at a time and reports
+latency percentiles for routers/search.py _SuggestIndex.suggest. The index is
+built once per catalog version; its build time is reported separately.
+Read-only against lego_catalog.db.
+
+Usage (from backend/):
+  python scripts/a2b_bench_search_suggest.py
+  python scripts/a2b_bench_search_suggest.py --db /path/lego_catalog.db --budget-ms 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.routers import search  # noqa: E402
+
+# What people type into the search box (themes, names, set numbers).
+CORPUS = [
+    "star wars", "millennium falcon", "harry potter", "hogwarts castle", "technic",
+    "75192", "10179-1", "21330", "ninjago city", "death star", "x wing", "batman",
+    "lord of the rings", "rivendell", "modular", "police station", "fire station",
+    "space shuttle", "speed champions", "ferrari", "lamborghini", "minecraft",
+    "jurassic", "dinosaur", "castle", "pirate ship", "train", "ideas", "botanical",
+    "orchid", "bonsai", "titanic", "eiffel tower", "colosseum", "disney castle",
+    "marvel", "avengers tower", "creator expert", "winter village", "advent calendar",
+]
+
+
+def _percentile(sorted_vals: List[float], p: float) -> float:
+    i = min(len(sorted_vals) - 1, max(0, int(round(p / 100.0 * len(sorted_vals))) - 1))
+    return sorted_vals[i]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", default=search.DB_PATH, help="lego_catalog.db path")
+    ap.add_argument("--queries", help="file with one query per line (default: built-in corpus)")
+    ap.add_argument("--limit", type=int, default=search.SUGGEST_DEFAULT_LIMIT)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float, default=10.0, help="fail if p99 exceeds this")
+    args = ap.parse_args()
+
+    search.DB_PATH = str(args.db)
+    queries = CORPUS
+    if args.queries:
+        queries = [ln.strip() for ln in Path(args.queries).read_text().splitlines() if ln.strip()]
+    prefixes = [q[:i] for q in queries for i in range(1, len(q) + 1)]
+
+    t0 = time.perf_counter()
+    index = search._SUGGEST_INDEX.get(search.DB_PATH)
+    t_build = time.perf_counter() - t0
+
+    samples: List[float] = []
+    empty = 0
+    for _ in range(args.repeat):
+        for p in prefixes:
+            t = time.perf_counter()
+            out = index.suggest(p, args.limit)
+            samples.append(time.perf_counter() - t)
+            empty += not out
+    samples.sort()
+
+    ms = [x * 1000 for x in samples]
+    p99 = _percentile(ms, 99)
+    print(f"keys={len(index.keys)} index build={t_build * 1000:.1f} ms (once per catalog version)")
+    print(f"lookups={len(samples)} ({len(prefixes)} prefixes x {args.repeat}) empty={empty // args.repeat}")
+    print(f"p50 {_percentile(ms, 50):7.3f} ms")
+    print(f"p95 {_percentile(ms, 95):7.3f} ms")
+    print(f"p99 {p99:7.3f} ms")
+    print(f"max {ms[-1]:7.3f} ms")
+    if p99 > args.budget_ms:
+        print(f"FAIL: p99 {p99:.3f} ms over budget {args.budget_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Benchmark theme intent extraction for set search.
+
+Compares, over a corpus of real search queries:
+  - sql:     the old resolver (one `trim(lower(name)) = ?` / `LIKE ? || '%'`
+             query per n-gram + a recursive CTE for descendants)
+  - memory:  routers/search.py _theme_filter_from_query (in-memory trie +
+             precomputed descendant closure)
+
+Both must return identical (theme_ids, remaining_query, theme_forced).
+Read-only against lego_catalog.db.
+
+Usage (from backend/):
+  python scripts/a2b_bench_theme_intent.py
+  python scripts/a2b_bench_theme_intent.py --db /path/lego_catalog.db --queries queries.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.routers import search  # noqa: E402
+
+# Queries seen in the search box (mix of themes, mixed intent, set numbers, noise).
+CORPUS = [
+    "star wars", "harry potter brickheadz", "technic", "brickheadz", "brick headz",
+    "millennium falcon", "castle", "city police", "ninjago", "21330", "75192-1",
+    "hogwarts castle", "lego city fire station", "creator expert", "minifigures",
+    "speed champions", "friends house", "train", "space shuttle", "batman",
+    "disney princess", "marvel avengers", "jurassic world", "ideas",
+    "polybag star wars", "death star", "x wing", "minecraft", "architecture",
+    "duplo", "theme:158", "technic crane", "star destroyer", "icons", "botanical",
+    "harry potter", "super heroes", "creator 3 in 1", "lord of the rings",
+    "modular buildings", "pirates ship", "space police", "bionicle", "hidden side",
+    "dreamzzz", "monkie kid", "ucs", "winter village", "seasonal christmas",
+    "avatar", "art", "dots", "chima", "nexo knights", "elves", "mindstorms",
+]
+
+
+# -------------------------
+# Old SQL resolver (verbatim logic, for comparison)
+# -------------------------
+
+def _sql_exact(con: sqlite3.Connection, qn: str) -> Optional[int]:
+    qn = (qn or "").strip().lower()
+    if not qn:
+        return None
+    row = con.execute(
+        "SELECT theme_id FROM themes WHERE trim(lower(name)) = ? LIMIT 1", (qn,)
+    ).fetchone()
+    return int(row[0]) if row else None
+
+
+def _sql_prefix(con: sqlite3.Connection, qn: str, limit: int = 50) -> List[int]:
+    qn = (qn or "").strip().lower()
+    if not qn:
+        return []
+    rows = con.execute(
+        "SELECT theme_id FROM themes WHERE trim(lower(name)) LIKE ? || '%' "
+        "ORDER BY length(name) ASC LIMIT ?",
+        (qn, int(limit)),
+    ).fetchall()
+    return [int(r[0]) for r in rows]
+
+
+def _sql_expand(con: sqlite3.Connection, root_ids: List[int], max_ids: int = 300) -> List[int]:
+    ids = [int(x) for x in (root_ids or []) if int(x) > 0]
+    if not ids:
+        return []
+    placeholders = ",".join(["?"] * len(ids))
+    rows = con.execute(
+        f"""
+        WITH RECURSIVE kids(theme_id) AS (
+            SELECT theme_id FROM themes WHERE theme_id IN ({placeholders})
+            UNION ALL
+            SELECT t.theme_id FROM themes t JOIN kids k ON t.parent_id = k.theme_id
+        )
+        SELECT DISTINCT theme_id FROM kids LIMIT ?
+        """,
+        tuple(ids + [int(max_ids)]),
+    ).fetchall()
+    out = [int(r[0]) for r in rows]
+    root_set = set(ids)
+    final: List[int] = []
+    seen: Set[int] = set()
+    for x in ids[:] + [x for x in out if x not in root_set]:
+        if x not in seen:
+            seen.add(x)
+            final.append(x)
+    return final
+
+
+def _sql_extract(con: sqlite3.Connection, q_raw: str) -> Tuple[List[int], str, bool]:
+    q_raw0 = (q_raw or "").strip()
+    if not q_raw0:
+        return [], q_raw0, False
+    toks = [t for t in search._norm_q(q_raw0).split() if t]
+    if not toks:
+        return [], q_raw0, False
+
+    best = None
+    for i in range(len(toks)):
+        if toks[i] == "brickheadz" or (i + 1 < len(toks) and toks[i] == "brick" and toks[i + 1] == "headz"):
+            width = 1 if toks[i] == "brickheadz" else 2
+            tid = _sql_exact(con, "brickheadz")
+            if tid is None:
+                roots = _sql_prefix(con, "brickheadz", limit=10)
+                if roots:
+                    best = (i, i + width, roots)
+                    break
+            else:
+                best = (i, i + width, [tid])
+                break
+
+    if best is None:
+        for n in range(3, 0, -1):
+            for i in range(0, len(toks) - n + 1):
+                phrase = search._alias_theme_phrase(" ".join(toks[i: i + n]).strip())
+                if phrase in search._STOP_WORDS:
+                    continue
+                if n == 1 and phrase in search._GENERIC_THEME_WORDS:
+                    continue
+                tid = _sql_exact(con, phrase)
+                if tid is not None:
+                    best = (i, i + n, [tid])
+                    break
+                if len(phrase) >= 3:
+                    roots = _sql_prefix(con, phrase, limit=10)
+                    if roots:
+                        best = (i, i + n, roots)
+                        break
+            if best is not None:
+                break
+
+    if best is None:
+        return [], q_raw0, False
+    i0, i1, roots = best
+    remaining = toks[:i0] + toks[i1:]
+    return _sql_expand(con, roots), " ".join(remaining).strip(), len(remaining) == 0
+
+
+def _sql_filter(con: sqlite3.Connection, q_raw: str) -> Tuple[List[int], str, bool]:
+    q_raw0 = (q_raw or "").strip()
+    if not q_raw0:
+        return [], q_raw0, False
+    tid, rest = search._parse_theme_token(q_raw0)
+    if tid is not None:
+        return _sql_expand(con, [tid]), rest, True
+    theme_ids, remaining, forced = _sql_extract(con, q_raw0)
+    if theme_ids:
+        return theme_ids, remaining, forced
+    return [], q_raw0, False
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", default=search.DB_PATH, help="lego_catalog.db path")
+    ap.add_argument("--queries", help="file with one query per line (default: built-in corpus)")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    search.DB_PATH = str(args.db)
+    queries = CORPUS
+    if args.queries:
+        queries = [ln.strip() for ln in Path(args.queries).read_text().splitlines() if ln.strip()]
+
+    con = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+
+    t0 = time.perf_counter()
+    search._themes()
+    t_build = time.perf_counter() - t0
+
+    mismatches = 0
+    for q in queries:
+        a = _sql_filter(con, q)
+        b = search._theme_filter_from_query(q)
+        if a != b:
+            mismatches += 1
+            print(f"MISMATCH {q!r}: sql={a} memory={b}", file=sys.stderr)
+
+    def run(fn) -> float:
+        best = float("inf")
+        for _ in range(args.repeat):
+            t = time.perf_counter()
+            for q in queries:
+                fn(q)
+            best = min(best, time.perf_counter() - t)
+        return best / len(queries)
+
+    t_sql = run(lambda q: _sql_filter(con, q))
+    t_mem = run(search._theme_filter_from_query)
+    con.close()
+
+    print(f"queries={len(queries)} index build={t_build * 1000:.1f} ms (once per catalog version)")
+    print(f"sql    : {t_sql * 1e6:9.1f} us/query")
+    print(f"memory : {t_mem * 1e6:9.1f} us/query")
+    print(f"speedup: {t_sql / t_mem:9.1f}x")
+    if mismatches:
+        print(f"FAIL: {mismatches} queries resolved differently", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN QUERY PLAN check for every query the API routers run.
+
+Builds a throwaway catalog from catalog_import/sample_data with the real
+importer (same index plan; its few-row statistics are dropped so the planner
+costs tables as catalog-sized), calls every endpoint once through
+TestClient and explains each SELECT the routers send to SQLite, on the
+connection that ran it (same ATTACHes, temp tables and bound parameters).
+Fails if a plan reads a catalog-sized table end to end ("SCAN <table>",
+with or without an index) unless FULL_SCANS_OK lists it for that call site.
+
+With --db the routers read an existing catalog instead (e.g. the live one,
+whose ANALYZE statistics are the ones that matter); nothing writes to it.
+User data (aim2build_app.db, wishlist JSON) always goes to a temp dir.
+
+Usage (from backend/):
+  python scripts/a2b_check_query_plans.py
+  python scripts/a2b_check_query_plans.py --db app/data/lego_catalog.db -v
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR.parent))
+
+import app.catalog_db as catalog_db  # noqa: E402
+import app.catalog_jobs as catalog_jobs  # noqa: E402
+import app.db as app_db  # noqa: E402
+import app.user_db as user_db_mod  # noqa: E402
+import catalog_import.db as import_db  # noqa: E402
+from app.routers import auth, search, wishlist  # noqa: E402
+from catalog_import.import_csv import import_catalog, refresh_image_tables  # noqa: E402
+
+SAMPLE_DIR = BACKEND_DIR.parent / "catalog_import" / "sample_data"
+APP_DIR = BACKEND_DIR / "app"
+
+# Lookup tables and bounded top-N tables (a few thousand rows at most):
+# reading them whole is fine.
+SMALL_TABLES = {
+    "catalog_meta",
+    "colors",
+    "part_categories",
+    "part_category_samples",
+    "sqlite_master",
+    "sqlite_schema",
+    "theme_filters",
+    "themes",
+    "top_common_parts",
+    "top_common_parts_by_color",
+}
+
+# (call site, table) pairs that read the whole table on purpose -> why.
+FULL_SCANS_OK = {
+    ("routers/search.py:_FuzzySetIndex.__init__", "sets"): "resident fuzzy index, loaded once per catalog",
+    ("routers/search.py:_SuggestIndex.__init__", "sets"): "resident suggest index, loaded once per catalog",
+    ("routers/buildability_discover.py:discover_buildability", "sets"): "scores every set, matched or not",
+}
+
+_SCAN_RE = re.compile(r"^SCAN (\S+)( USING (?:COVERING )?INDEX \S+)?$")
+_NAMED_RE = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\S+)")
+_TABLE_REF_RE = re.compile(
+    r"\b(?:FROM|JOIN)\s+([A-Za-z_][\w.]*)(?:\s+(?:AS\s+)?([A-Za-z_]\w*))?", re.IGNORECASE
+)
+_SQL_WORDS = {
+    "as", "cross", "group", "having", "inner", "join", "left", "limit",
+    "natural", "on", "order", "union", "using", "where", "window",
+}
+
+_real_connect = sqlite3.connect
+_route = "startup"
+# normalised SQL -> (route, call site, sql, plan lines, full scans)
+_plans: Dict[str, Tuple[str, str, str, List[str], List[str]]] = {}
+
+
+def _normalise(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def _call_site() -> str:
+    """file:function of the innermost app/ frame that ran the statement."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        path = Path(frame.f_code.co_filename)
+        if APP_DIR in path.parents:
+            return f"{path.relative_to(APP_DIR)}:{frame.f_code.co_qualname}"
+        frame = frame.f_back
+    return "?"
+
+
+def _full_scans(sql: str, plan: List[str], tables: Set[str]) -> List[str]:
+    """
+    Tables a plan reads from end to end: "SCAN t" and full index walks
+    ("SCAN t USING INDEX i"), except an ordered walk that stops at LIMIT.
+    Plans name tables by alias, so aliases are resolved from the SQL.
+    """
+    aliases: Dict[str, str] = {}
+    for table, alias in _TABLE_REF_RE.findall(sql):
+        table = table.split(".")[-1]
+        aliases.setdefault(table, table)
+        if alias and alias.lower() not in _SQL_WORDS:
+            aliases[alias] = table
+    named = {m.group(1) for line in plan if (m := _NAMED_RE.match(line))}
+    ordered_walk = " LIMIT " in sql.upper() and not any("FOR ORDER BY" in line for line in plan)
+    out = []
+    for line in plan:
+        m = _SCAN_RE.match(line)
+        if not m or m.group(1) in named:
+            continue
+        table = aliases.get(m.group(1).split(".")[-1], m.group(1).split(".")[-1])
+        if table not in tables or table in SMALL_TABLES:
+            continue
+        if m.group(2) and ordered_walk:
+            continue
+        out.append(table)
+    return out
+
+
+def _explain(con: sqlite3.Connection, sql: str, params: Any) -> None:
+    key = _normalise(sql)
+    if key in _plans or not key.upper().startswith(("SELECT", "WITH")):
+        return
+    cur = sqlite3.Connection.cursor(con)
+    plan = [str(r[3]) for r in cur.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()]
+    tables = {str(r[1]) for r in cur.execute("PRAGMA table_list") if r[2] == "table"}
+    _plans[key] = (_route, _call_site(), key, plan, _full_scans(key, plan, tables))
+
+
+class _PlanCursor(sqlite3.Cursor):
+    def execute(self, sql, params=()):  # type: ignore[override]
+        _explain(self.connection, sql, params)
+        return super().execute(sql, params)
+
+
+class _PlanConnection(sqlite3.Connection):
+    def cursor(self, factory=_PlanCursor):  # type: ignore[override]
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):  # type: ignore[override]
+        _explain(self, sql, params)
+        return super().execute(sql, params)
+
+
+def _connect(*args, **kwargs) -> sqlite3.Connection:
+    kwargs.setdefault("factory", _PlanConnection)
+    return _real_connect(*args, **kwargs)
+
+
+def _build_sample_catalog(path: Path) -> None:
+    import_db.DB_PATH = path
+    import_catalog(str(SAMPLE_DIR))
+    con = _real_connect(path)
+    with con:
+        # Same shape as backend/scripts/a2b_install_element_images.py.
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS element_images (
+                part_num TEXT NOT NULL,
+                color_id INTEGER NOT NULL,
+                img_url  TEXT NOT NULL,
+                PRIMARY KEY (part_num, color_id)
+            )
+            """
+        )
+        con.execute(
+            """
+            INSERT OR IGNORE INTO element_images(part_num, color_id, img_url)
+            SELECT part_num, color_id, 'https://example.com/' || part_num || '.jpg'
+            FROM inventory_parts
+            """
+        )
+    con.close()
+    refresh_image_tables(str(path))
+    # ANALYZE of a handful of rows tells the planner every table is tiny and
+    # a scan is cheapest; without statistics it assumes catalog-sized tables.
+    con = _real_connect(path)
+    with con:
+        con.execute("DELETE FROM sqlite_stat1")
+    con.close()
+
+
+def _sample_values(path: Path) -> Dict[str, Any]:
+    con = _real_connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        set_num, part_num, color_id = con.execute(
+            "SELECT set_num, part_num, color_id FROM set_parts ORDER BY set_num LIMIT 1"
+        ).fetchone()
+        name, theme_id = con.execute(
+            "SELECT name, theme_id FROM sets WHERE set_num = ?", (set_num,)
+        ).fetchone()
+        part_cat_id = con.execute(
+            "SELECT part_cat_id FROM parts WHERE part_num = ?", (part_num,)
+        ).fetchone()[0]
+        theme = con.execute("SELECT name FROM themes WHERE theme_id = ?", (theme_id,)).fetchone()
+    finally:
+        con.close()
+    return {
+        "set": set_num,
+        "base": set_num.split("-", 1)[0],
+        "part": part_num,
+        "color": color_id,
+        "cat": part_cat_id,
+        "word": (name or "set").split()[0].lower(),
+        "theme": (theme[0] if theme else "city").lower(),
+    }
+
+
+def _calls(v: Dict[str, Any]) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """(method, path, kwargs) covering every mounted route."""
+    canonical = {"part_num": v["part"], "color_id": v["color"]}
+    return [
+        ("GET", "/api/health", {}),
+        ("GET", "/api/search", {"params": {"q": v["word"]}}),
+        ("GET", "/api/search", {"params": {"q": v["base"]}}),
+        ("GET", "/api/search", {"params": {"q": v["theme"], "sort": "recent"}}),
+        ("GET", "/api/search", {"params": {"q": v["word"], "fuzzy": True}}),
+        ("GET", "/api/search/paged", {"params": {"q": v["word"], "page_size": 1}}),
+        ("GET", "/api/search/paged", {"params": {"q": v["base"]}}),
+        ("GET", "/api/search/sets", {"params": {"q": v["word"]}}),
+        ("GET", "/api/sets/search_sets", {"params": {"q": v["word"]}}),
+        ("GET", "/api/search/suggest", {"params": {"q": v["word"][:2]}}),
+        ("GET", "/api/search/cache/stats", {}),
+        ("GET", "/api/catalog/part-categories", {}),
+        ("GET", "/api/catalog/part-categories", {"params": {"parent_id": v["cat"]}}),
+        ("GET", f"/api/catalog/part-categories/{v['cat']}", {}),
+        ("GET", "/api/catalog/part-categories/top", {}),
+        ("GET", "/api/catalog/parts/by-category", {"params": {"category_id": v["cat"]}}),
+        ("GET", "/api/catalog/parts", {"params": {"set": v["set"]}}),
+        ("GET", f"/api/catalog/sets/{v['set']}/bundle", {}),
+        ("GET", "/api/catalog/parts/search", {"params": {"q": v["part"]}}),
+        ("GET", "/api/catalog/parts/search", {"params": {"q": "brick", "category_id": v["cat"], "color_id": v["color"]}}),
+        ("GET", "/api/catalog/elements/by-part", {"params": {"part_num": v["part"]}}),
+        ("GET", "/api/catalog/top_common_parts", {}),
+        ("GET", "/api/catalog/top_common_parts_by_color", {"params": {"min_set_count": 0}}),
+        ("GET", "/api/catalog/top_common_parts_by_color", {"params": {"color_id": v["color"]}}),
+        ("GET", "/api/catalog/top_common_parts_by_color/stats", {}),
+        ("GET", "/api/catalog/derived/status", {}),
+        ("POST", "/api/mysets/add", {"params": {"set": v["set"]}}),
+        ("GET", "/api/mysets", {}),
+        ("POST", "/api/wishlist/add", {"params": {"set": v["set"]}}),
+        ("GET", "/api/wishlist", {}),
+        ("POST", "/api/inventory/pour-set", {"params": {"set": v["set"]}}),
+        ("POST", "/api/inventory/add-canonical", {"json": {**canonical, "qty": 2}}),
+        ("POST", "/api/inventory/set-canonical", {"json": {**canonical, "qty": 5}}),
+        ("POST", "/api/inventory/decrement-canonical", {"json": {**canonical, "delta": 1}}),
+        ("GET", "/api/inventory/has_any", {}),
+        ("GET", "/api/inventory/parts", {}),
+        ("GET", "/api/inventory/parts_with_images", {}),
+        ("GET", "/api/inventory/parts/paged", {"params": {"limit": 1}}),
+        ("GET", "/api/inventory/parts/paged", {"params": {"sort": "qty_desc", "color_id": v["color"], "part_cat_id": v["cat"]}}),
+        ("GET", "/api/inventory/sets", {}),
+        ("GET", "/api/inventory/canonical-parts", {}),
+        ("GET", "/api/inventory/changes", {}),
+        ("GET", "/api/inventory/stats", {}),
+        ("GET", "/api/buildability/compare", {"params": {"set": v["set"]}}),
+        ("POST", "/api/buildability/batch_compare", {"json": {"sets": [v["set"]]}}),
+        ("GET", "/api/buildability/discover", {"params": {"min_coverage": 0}}),
+        ("POST", "/api/inventory/unpour-set", {"params": {"set": v["set"]}}),
+        ("DELETE", "/api/mysets/remove", {"params": {"set": v["set"]}}),
+        ("DELETE", "/api/wishlist/remove", {"params": {"set": v["set"]}}),
+        ("POST", "/api/inventory/clear-canonical", {}),
+    ]
+
+
+def main() -> int:
+    global _route
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", help="check against this catalog instead of the sample one")
+    ap.add_argument("-v", "--verbose", action="store_true", help="print every plan")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        if args.db:
+            catalog = Path(args.db).resolve()
+        else:
+            catalog = tmp_dir / "lego_catalog.db"
+            _build_sample_catalog(catalog)
+        values = _sample_values(catalog)
+
+        catalog_db.DB_PATH = catalog
+        search.DB_PATH = str(catalog)
+        app_db.DB_PATH = tmp_dir / "aim2build_app.db"
+        user_db_mod.USER_DB_PATH = tmp_dir / "aim2build_app.db"
+        wishlist.DATA_DIR = tmp_dir
+        catalog_jobs.STATUS_PATH = tmp_dir / "catalog_derived_job.json"
+        sqlite3.connect = _connect
+
+        from fastapi.testclient import TestClient
+
+        import app.main as main_mod
+
+        client = TestClient(main_mod.app)
+        creds = {"email": "plans@example.com", "password": "password1"}
+        auth.ADMIN_EMAILS = {creds["email"]}
+        client.post("/api/auth/register", json=creds)
+        token = client.post("/api/auth/login", json=creds).json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        failed_calls: List[str] = []
+        for method, path, kwargs in _calls(values):
+            _route = f"{method} {path}"
+            resp = client.request(method, path, **kwargs)
+            if resp.status_code >= 500:
+                failed_calls.append(f"{_route} -> {resp.status_code}")
+        sqlite3.connect = _real_connect
+
+    problems: List[str] = []
+    for route, site, sql, plan, scans in _plans.values():
+        bad = [t for t in scans if (site, t) not in FULL_SCANS_OK]
+        if args.verbose or bad:
+            print(f"\n[{route}] {site}\n  {sql[:160]}{'...' if len(sql) > 160 else ''}")
+            for line in plan:
+                print(f"    {line}")
+        if bad:
+            problems.append(f"{route} ({site}): full scan of {', '.join(bad)}")
+
+    print(f"\nqueries explained: {len(_plans)}")
+    for line in failed_calls:
+        print(f"ERROR  {line}")
+    for line in problems:
+        print(f"SCAN   {line}")
+    if problems or failed_calls:
+        return 1
+    print("OK: no full table scans")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,16 +7,24 @@ Scan Rebrickable element image URLs and cache working ones in lego_catalog.db.
 - Reads from:   app/data/lego_catalog.db
 - Uses table:   elements(element_id, part_num, color_id, ...)
 - Writes to:    element_images(part_num, color_id, img_url)
+- Then refreshes the derived image tables (element_images_resolved,
+  part_primary_image, ...) via catalog_import.import_csv.refresh_image_tables,
+  which publishes them as a new catalog version.
 
 We DO NOT touch parts.part_img_url here.
 """
 
 import sqlite3
+import sys
 from pathlib import Path
 import time
 
 import requests
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from catalog_import.import_csv import refresh_image_tables  # noqa: E402
+
 
 # Adjust if your path is different, but this should work from repo root.
 DB_PATH = Path(__file__).resolve().parents[1] / "app" / "data" / "lego_catalog.db"
@@ -111,6 +119,9 @@ def main() -> None:
     con.close()
     print("Done populating element_images.")
 
+    summary = refresh_image_tables(str(DB_PATH), report=print)
+    print(f"Refreshed derived image tables: {summary}")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,8 +5,8 @@ Refresh inventory JSON image URLs from lego_catalog.db.
 For each inventory_parts_user_*.json file in DATA_DIR:
 
 - For each (part_num, color_id) row:
-    * Resolve the best image URL from element_images (same rules as
-      inventory router: exact colour first, then any colour).
+    * Resolve the image URL from element_images_resolved (exact colour),
+      else part_primary_image (same tables and rules as the routers).
     * If found, update row["part_img_url"] to that URL.
 
 This does NOT change colour IDs or quantities.
@@ -19,47 +19,34 @@ from pathlib import Path
 from typing import Optional
 
 from app.paths import DATA_DIR
-from app.catalog_db import db
+from app.catalog_db import db, element_images_table
 
 
 def resolve_img_url(part_num: str, color_id: int) -> Optional[str]:
-    """Resolve a part image using element_images, matching inventory logic."""
+    """Resolve a part image from the importer's image tables, like the routers."""
     with db() as con:
         # 1) exact colour match when colour is known
         if color_id != 0:
-            cur = con.execute(
-                """
+            row = con.execute(
+                f"""
                 SELECT img_url
-                FROM element_images
+                FROM {element_images_table()}
                 WHERE part_num = ?
                   AND color_id = ?
-                  AND img_url IS NOT NULL
-                  AND TRIM(img_url) != ''
-                LIMIT 1
                 """,
                 (part_num, color_id),
-            )
-            row = cur.fetchone()
-            if row and row["img_url"]:
+            ).fetchone()
+            if row:
                 return row["img_url"]
 
-        # 2) any image for that part as representative (for colour_id == 0
-        #    or when that specific colour has no element image)
-        cur_any = con.execute(
-            """
-            SELECT img_url
-            FROM element_images
-            WHERE part_num = ?
-              AND img_url IS NOT NULL
-              AND TRIM(img_url) != ''
-            ORDER BY color_id
-            LIMIT 1
-            """,
+        # 2) the part's primary image (for colour_id == 0 or when that
+        #    specific colour has no element image)
+        row = con.execute(
+            "SELECT img_url FROM part_primary_image WHERE part_num = ?",
             (part_num,),
-        )
-        row_any = cur_any.fetchone()
-        if row_any and row_any["img_url"]:
-            return row_any["img_url"]
+        ).fetchone()
+        if row:
+            return row["img_url"]
 
     return None
 
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for the canonical inventory mutations.
+
+Many threads hammer the SAME (part_num, color_id) lot with add-canonical,
+decrement-canonical and set-canonical while a poured set holds a floor on it.
+Afterwards we check that no update was lost:
+
+  - final qty == start + sum(applied adds) - sum(applied decrements)
+    (checked in the add/decrement phase, before any set-canonical runs)
+  - qty never ends below the poured floor
+  - the change journal replays to the final qty
+  - user_inventory_stats totals agree with user_inventory_parts
+
+Runs against throwaway DBs in a temp dir; the real aim2build_app.db is never
+touched. Exit code 0 = all invariants held.
+
+Usage (from backend/):
+  python scripts/a2b_stress_inventory_concurrency.py --threads 16 --ops 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import app.catalog_db as catalog_db  # noqa: E402
+import app.db as app_db  # noqa: E402
+import app.user_db as user_db_mod  # noqa: E402
+
+PART = "3001"
+COLOR = 4
+SET_NUM = "9999-1"
+SET_QTY = 10
+
+
+def _build_catalog(path: Path) -> None:
+    con = sqlite3.connect(path)
+    con.execute(
+        """
+        CREATE TABLE set_parts(
+            set_num TEXT NOT NULL, part_num TEXT NOT NULL, color_id INTEGER NOT NULL,
+            qty_per_set INTEGER NOT NULL, PRIMARY KEY (set_num, part_num, color_id)
+        )
+        """
+    )
+    con.execute("INSERT INTO set_parts VALUES (?,?,?,?)", (SET_NUM, PART, COLOR, SET_QTY))
+    con.commit()
+    con.close()
+
+
+def _qty(user_id: int) -> int:
+    with user_db_mod.user_db() as con:
+        row = con.execute(
+            "SELECT qty FROM user_inventory_parts WHERE user_id=? AND part_num=? AND color_id=?",
+            (user_id, PART, COLOR),
+        ).fetchone()
+    return int(row["qty"]) if row else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--ops", type=int, default=200, help="operations per thread")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        catalog_db.DB_PATH = tmp_dir / "lego_catalog.db"
+        app_db.DB_PATH = tmp_dir / "aim2build_app.db"
+        user_db_mod.USER_DB_PATH = tmp_dir / "aim2build_app.db"
+        _build_catalog(catalog_db.DB_PATH)
+        app_db.init_db()
+
+        from fastapi import HTTPException
+
+        from app.routers import inventory as inv
+        from app.routers.auth import User
+
+        user = User(id=1, email="stress@example.com")
+        # keep the whole journal so it can be replayed at the end
+        inv.EVENTS_COMPACT_SLACK = 10**9
+
+        inv.pour_set(set=SET_NUM, current_user=user)
+        inv.get_inventory_stats(current_user=user)  # create the stats row
+        start = _qty(user.id)
+
+        lock = threading.Lock()
+        applied = {"add": 0, "dec": 0, "blocked": 0, "errors": 0}
+
+        def worker(seed: int, allow_set: bool) -> None:
+            rnd = random.Random(seed)
+            for _ in range(args.ops):
+                op = rnd.choice(["add", "dec", "dec", "set"] if allow_set else ["add", "dec", "dec"])
+                n = rnd.randint(1, 3)
+                try:
+                    if op == "add":
+                        inv.add_canonical_part(
+                            inv.AddCanonicalPayload(part_num=PART, color_id=COLOR, qty=n),
+                            current_user=user,
+                        )
+                        with lock:
+                            applied["add"] += n
+                    elif op == "dec":
+                        res = inv.decrement_canonical_part(
+                            inv.DecCanonicalPayload(part_num=PART, color_id=COLOR, delta=n),
+                            current_user=user,
+                        )
+                        if res.get("changed"):
+                            with lock:
+                                applied["dec"] += n
+                    else:
+                        inv.set_canonical(
+                            {"part_num": PART, "color_id": COLOR, "qty": rnd.randint(0, 2 * SET_QTY)},
+                            current_user=user,
+                        )
+                except HTTPException as e:
+                    if e.status_code != 409:
+                        raise
+                    with lock:
+                        applied["blocked"] += 1
+                except sqlite3.OperationalError:
+                    with lock:
+                        applied["errors"] += 1
+
+        def run(allow_set: bool, seed0: int) -> None:
+            threads = [
+                threading.Thread(target=worker, args=(seed0 + i, allow_set))
+                for i in range(args.threads)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        failures = []
+
+        # Phase 1: add + decrement only -> exact arithmetic must hold.
+        run(allow_set=False, seed0=args.seed)
+        end = _qty(user.id)
+        phase1_add, phase1_dec = applied["add"], applied["dec"]
+        expected = start + phase1_add - phase1_dec
+        if end != expected:
+            failures.append(f"lost update: qty={end}, expected {expected}")
+
+        # Phase 2: mix in set-canonical -> floor / journal / stats must hold.
+        run(allow_set=True, seed0=args.seed + 1000)
+        final = _qty(user.id)
+        if final < SET_QTY:
+            failures.append(f"qty {final} fell below poured floor {SET_QTY}")
+
+        with user_db_mod.user_db() as con:
+            journal = con.execute(
+                "SELECT COALESCE(SUM(delta), 0) FROM user_inventory_events "
+                "WHERE user_id=? AND part_num=? AND color_id=?",
+                (user.id, PART, COLOR),
+            ).fetchone()[0]
+            stats = con.execute(
+                "SELECT total_pieces, lots FROM user_inventory_stats WHERE user_id=?",
+                (user.id,),
+            ).fetchone()
+        if int(journal) != final:
+            failures.append(f"journal replays to {journal}, qty is {final}")
+        if stats is None or (int(stats["total_pieces"]), int(stats["lots"])) != (final, 1 if final else 0):
+            failures.append(f"stats {tuple(stats) if stats else None} disagree with qty {final}")
+        if applied["errors"]:
+            failures.append(f"{applied['errors']} sqlite3.OperationalError (e.g. database is locked)")
+
+    print(f"threads={args.threads} ops/thread={args.ops}")
+    print(f"phase1 start={start} +{phase1_add} -{phase1_dec} -> {end}")
+    print(f"final qty={final} blocked(409)={applied['blocked']} busy_errors={applied['errors']}")
+    if failures:
+        for f in failures:
+            print(f"FAIL: {f}", file=sys.stderr)
+        return 1
+    print("OK: no lost updates, floor respected, journal and stats consistent")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,6 +8,11 @@ DB_PATH = DATA_DIR / "lego_catalog.db"
 def _ensure_data_dir() -> None:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+def db_path() -> Path:
+    """Path of the live catalog file."""
+    _ensure_data_dir()
+    return DB_PATH
+
 def db() -> sqlite3.Connection:
     """Return a SQLite connection configured like the API expects."""
     _ensure_data_dir()
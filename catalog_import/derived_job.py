@@ -0,0 +1,80 @@
+"""
+Ad-hoc rebuild of the derived catalog tables (import_csv.DERIVED_TABLES)
+between imports, published as a new catalog version, with progress written
+to a JSON status file:
+
+    python -m catalog_import.derived_job [--db PATH] [--status PATH]
+
+The API starts this as a detached process (POST /api/catalog/derived/rebuild)
+and serves the status file (GET /api/catalog/derived/status). The status is
+{"state": "running" | "done" | "failed", "pid", "step", "done", "total",
+"started_at", "finished_at", "tables", "error"}.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import traceback
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .db import DATA_DIR
+from .import_csv import refresh_derived_tables
+
+STATUS_PATH = DATA_DIR / "catalog_derived_job.json"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def write_status(path: Path, status: Dict[str, Any]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(status, fh, indent=2)
+    os.replace(tmp, path)
+
+
+def run(db_path: Optional[str] = None, status_path: Path = STATUS_PATH) -> int:
+    status: Dict[str, Any] = {
+        "state": "running",
+        "pid": os.getpid(),
+        "step": None,
+        "done": 0,
+        "total": None,
+        "started_at": _now(),
+        "finished_at": None,
+        "tables": None,
+        "error": None,
+    }
+
+    def progress(step: str, done: int, total: int) -> None:
+        status.update(step=step, done=done, total=total)
+        write_status(status_path, status)
+
+    write_status(status_path, status)
+    try:
+        status["tables"] = refresh_derived_tables(db_path, progress=progress)
+        status["state"] = "done"
+    except Exception as exc:
+        status["state"] = "failed"
+        status["error"] = f"{type(exc).__name__}: {exc}"
+        traceback.print_exc()
+    status["finished_at"] = _now()
+    write_status(status_path, status)
+    return 0 if status["state"] == "done" else 1
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Rebuild the derived catalog tables.")
+    ap.add_argument("--db", help="catalog to update in place (default: publish a new version of the live one)")
+    ap.add_argument("--status", default=str(STATUS_PATH), help="JSON status file")
+    args = ap.parse_args()
+    return run(args.db, Path(args.status))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
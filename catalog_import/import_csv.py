@@ -1,11 +1,31 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
+import itertools
+import json
 import os
+import re
+import sqlite3
+import time
+import tempfile
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional, Sequence, Any
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
 
 from .csv_std import csv_module as csv
-from .db import db
+from .db import db_path
+from .publish import (
+    CatalogValidationError,
+    new_version_path,
+    prune_versions,
+    publish_catalog,
+    validate_catalog,
+)
 
 
 TRUE_VALUES = {"1", "true", "t", "yes", "y"}
@@ -55,11 +75,53 @@ def _to_text(value: Optional[str]) -> Optional[str]:
 
 @dataclass
 class ColumnSpec:
+    """
+    One output column: the first non-blank CSV field among `sources`, passed
+    through `convert`; `default` replaces a None result.
+    """
+
     name: str
     sql_type: str
-    extractor: Callable[[Dict[str, str]], Any]
+    convert: Callable[[Optional[str]], Any]
+    sources: Tuple[str, ...]
+    default: Any = None
     required: bool = False
 
+    def extract(self, row: Dict[str, str]) -> Any:
+        value = self.convert(_first(row, *self.sources))
+        return self.default if value is None else value
+
+    def positional(self, header: Sequence[str]) -> Callable[[List[str]], Any]:
+        """Same as extract(), bound to column indexes of a csv.reader header."""
+        # DictReader keeps the last of duplicated header names; do the same.
+        index = {name: i for i, name in enumerate(header)}
+        idxs = tuple(index[key] for key in self.sources if key and key in index)
+        convert, default = self.convert, self.default
+
+        if len(idxs) == 1:
+            (only,) = idxs
+            # The converters already treat blank as None, so skip _first.
+
+            def extract_one(row: List[str]) -> Any:
+                value = convert(row[only] if only < len(row) else None)
+                return default if value is None else value
+
+            return extract_one
+
+        def extract(row: List[str]) -> Any:
+            raw = None
+            n = len(row)
+            for i in idxs:
+                if i < n:
+                    value = row[i].strip()
+                    if value:
+                        raw = value
+                        break
+            value = convert(raw)
+            return default if value is None else value
+
+        return extract
+
 
 @dataclass
 class DatasetSpec:
@@ -67,6 +129,8 @@ class DatasetSpec:
     filename: str
     columns: Sequence[ColumnSpec]
     row_filter: Optional[Callable[[Dict[str, str]], bool]] = None
+    # Keyless tables: column whose rows change together (delta import unit).
+    group_by: Optional[str] = None
 
 
 def _dataset_specs() -> Sequence[DatasetSpec]:
@@ -78,23 +142,29 @@ def _dataset_specs() -> Sequence[DatasetSpec]:
                 ColumnSpec(
                     "color_id",
                     "INTEGER PRIMARY KEY",
-                    lambda row: _to_int(_first(row, "id", "color_id")),
+                    _to_int,
+                    ("id", "color_id"),
                     required=True,
                 ),
                 ColumnSpec(
                     "name",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "name")) or "",
+                    _to_text,
+                    ("name",),
+                    default="",
                 ),
                 ColumnSpec(
                     "rgb",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "rgb")) or "",
+                    _to_text,
+                    ("rgb",),
+                    default="",
                 ),
                 ColumnSpec(
                     "is_trans",
                     "INTEGER NOT NULL DEFAULT 0",
-                    lambda row: _to_bool(_first(row, "is_trans", "transparent", "is_transparent")),
+                    _to_bool,
+                    ("is_trans", "transparent", "is_transparent"),
                 ),
             ],
         ),
@@ -105,18 +175,22 @@ def _dataset_specs() -> Sequence[DatasetSpec]:
                 ColumnSpec(
                     "part_cat_id",
                     "INTEGER PRIMARY KEY",
-                    lambda row: _to_int(_first(row, "id", "part_cat_id")),
+                    _to_int,
+                    ("id", "part_cat_id"),
                     required=True,
                 ),
                 ColumnSpec(
                     "name",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "name")) or "",
+                    _to_text,
+                    ("name",),
+                    default="",
                 ),
                 ColumnSpec(
                     "parent_id",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "parent_id")),
+                    _to_int,
+                    ("parent_id",),
                 ),
             ],
         ),
@@ -127,68 +201,82 @@ def _dataset_specs() -> Sequence[DatasetSpec]:
                 ColumnSpec(
                     "part_num",
                     "TEXT PRIMARY KEY",
-                    lambda row: _to_text(_first(row, "part_num")),
+                    _to_text,
+                    ("part_num",),
                     required=True,
                 ),
                 ColumnSpec(
                     "name",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "name")) or "",
+                    _to_text,
+                    ("name",),
+                    default="",
                 ),
                 ColumnSpec(
                     "part_cat_id",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "part_cat_id")),
+                    _to_int,
+                    ("part_cat_id",),
                 ),
                 ColumnSpec(
                     "part_material",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "part_material", "material")),
+                    _to_text,
+                    ("part_material", "material"),
                 ),
                 ColumnSpec(
                     "part_url",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "part_url", "url")),
+                    _to_text,
+                    ("part_url", "url"),
                 ),
                 ColumnSpec(
                     "part_img_url",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "part_img_url", "img_url")),
+                    _to_text,
+                    ("part_img_url", "img_url"),
                 ),
                 ColumnSpec(
                     "part_thumb_url",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "part_img_url_small", "part_thumb_url")),
+                    _to_text,
+                    ("part_img_url_small", "part_thumb_url"),
                 ),
                 ColumnSpec(
                     "year_from",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "year_from")),
+                    _to_int,
+                    ("year_from",),
                 ),
                 ColumnSpec(
                     "year_to",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "year_to")),
+                    _to_int,
+                    ("year_to",),
                 ),
                 ColumnSpec(
                     "print_of",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "print_of")),
+                    _to_text,
+                    ("print_of",),
                 ),
                 ColumnSpec(
                     "mold",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "mold")),
+                    _to_text,
+                    ("mold",),
                 ),
                 ColumnSpec(
                     "is_obsolete",
                     "INTEGER",
-                    lambda row: _to_bool(_first(row, "is_obsolete")),
+                    _to_bool,
+                    ("is_obsolete",),
                 ),
                 ColumnSpec(
                     "design_id",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "design_id")),
+                    _to_text,
+                    ("design_id",),
                 ),
             ],
         ),
@@ -199,22 +287,29 @@ def _dataset_specs() -> Sequence[DatasetSpec]:
                 ColumnSpec(
                     "rel_type",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "rel_type")) or "",
+                    _to_text,
+                    ("rel_type",),
+                    default="",
                 ),
                 ColumnSpec(
                     "child_part_num",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "child_part_num")) or "",
+                    _to_text,
+                    ("child_part_num",),
+                    default="",
                 ),
                 ColumnSpec(
                     "parent_part_num",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "parent_part_num")) or "",
+                    _to_text,
+                    ("parent_part_num",),
+                    default="",
                 ),
                 ColumnSpec(
                     "is_spare",
                     "INTEGER",
-                    lambda row: _to_bool(_first(row, "is_spare")),
+                    _to_bool,
+                    ("is_spare",),
                 ),
             ],
         ),
@@ -225,43 +320,52 @@ def _dataset_specs() -> Sequence[DatasetSpec]:
                 ColumnSpec(
                     "element_id",
                     "TEXT PRIMARY KEY",
-                    lambda row: _to_text(_first(row, "element_id")),
+                    _to_text,
+                    ("element_id",),
                     required=True,
                 ),
                 ColumnSpec(
                     "part_num",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "part_num")) or "",
+                    _to_text,
+                    ("part_num",),
+                    default="",
                 ),
                 ColumnSpec(
                     "color_id",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "color_id")),
+                    _to_int,
+                    ("color_id",),
                 ),
                 ColumnSpec(
                     "design_id",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "design_id")),
+                    _to_text,
+                    ("design_id",),
                 ),
                 ColumnSpec(
                     "element_img_url",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "element_img_url", "img_url")),
+                    _to_text,
+                    ("element_img_url", "img_url"),
                 ),
                 ColumnSpec(
                     "element_url",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "element_url", "url")),
+                    _to_text,
+                    ("element_url", "url"),
                 ),
                 ColumnSpec(
                     "year_from",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "year_from")),
+                    _to_int,
+                    ("year_from",),
                 ),
                 ColumnSpec(
                     "year_to",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "year_to")),
+                    _to_int,
+                    ("year_to",),
                 ),
             ],
         ),
@@ -272,18 +376,22 @@ def _dataset_specs() -> Sequence[DatasetSpec]:
                 ColumnSpec(
                     "theme_id",
                     "INTEGER PRIMARY KEY",
-                    lambda row: _to_int(_first(row, "id", "theme_id")),
+                    _to_int,
+                    ("id", "theme_id"),
                     required=True,
                 ),
                 ColumnSpec(
                     "name",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "name")) or "",
+                    _to_text,
+                    ("name",),
+                    default="",
                 ),
                 ColumnSpec(
                     "parent_id",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "parent_id")),
+                    _to_int,
+                    ("parent_id",),
                 ),
             ],
         ),
@@ -294,43 +402,52 @@ def _dataset_specs() -> Sequence[DatasetSpec]:
                 ColumnSpec(
                     "set_num",
                     "TEXT PRIMARY KEY",
-                    lambda row: _to_text(_first(row, "set_num")),
+                    _to_text,
+                    ("set_num",),
                     required=True,
                 ),
                 ColumnSpec(
                     "name",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "name")) or "",
+                    _to_text,
+                    ("name",),
+                    default="",
                 ),
                 ColumnSpec(
                     "year",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "year")),
+                    _to_int,
+                    ("year",),
                 ),
                 ColumnSpec(
                     "theme_id",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "theme_id")),
+                    _to_int,
+                    ("theme_id",),
                 ),
                 ColumnSpec(
                     "num_parts",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "num_parts")),
+                    _to_int,
+                    ("num_parts",),
                 ),
                 ColumnSpec(
                     "set_img_url",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "set_img_url", "img_url")),
+                    _to_text,
+                    ("set_img_url", "img_url"),
                 ),
                 ColumnSpec(
                     "set_url",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "set_url", "url")),
+                    _to_text,
+                    ("set_url", "url"),
                 ),
                 ColumnSpec(
                     "last_modified_dt",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "last_modified_dt")),
+                    _to_text,
+                    ("last_modified_dt",),
                 ),
             ],
         ),
@@ -341,77 +458,94 @@ def _dataset_specs() -> Sequence[DatasetSpec]:
                 ColumnSpec(
                     "inventory_id",
                     "INTEGER PRIMARY KEY",
-                    lambda row: _to_int(_first(row, "id", "inventory_id")),
+                    _to_int,
+                    ("id", "inventory_id"),
                     required=True,
                 ),
                 ColumnSpec(
                     "set_num",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "set_num")) or "",
+                    _to_text,
+                    ("set_num",),
+                    default="",
                 ),
                 ColumnSpec(
                     "version",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "version")),
+                    _to_int,
+                    ("version",),
                 ),
             ],
         ),
         DatasetSpec(
             table="inventory_parts",
             filename="inventory_parts.csv",
+            group_by="inventory_id",
             columns=[
                 ColumnSpec(
                     "inventory_id",
                     "INTEGER NOT NULL",
-                    lambda row: _to_int(_first(row, "inventory_id")),
+                    _to_int,
+                    ("inventory_id",),
                     required=True,
                 ),
                 ColumnSpec(
                     "part_num",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "part_num")) or "",
+                    _to_text,
+                    ("part_num",),
+                    default="",
                 ),
                 ColumnSpec(
                     "color_id",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "color_id")),
+                    _to_int,
+                    ("color_id",),
                 ),
                 ColumnSpec(
                     "quantity",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "quantity", "qty")),
+                    _to_int,
+                    ("quantity", "qty"),
                 ),
                 ColumnSpec(
                     "is_spare",
                     "INTEGER",
-                    lambda row: _to_bool(_first(row, "is_spare")),
+                    _to_bool,
+                    ("is_spare",),
                 ),
                 ColumnSpec(
                     "element_id",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "element_id")),
+                    _to_text,
+                    ("element_id",),
                 ),
             ],
         ),
         DatasetSpec(
             table="inventory_minifigs",
             filename="inventory_minifigs.csv",
+            group_by="inventory_id",
             columns=[
                 ColumnSpec(
                     "inventory_id",
                     "INTEGER NOT NULL",
-                    lambda row: _to_int(_first(row, "inventory_id")),
+                    _to_int,
+                    ("inventory_id",),
                     required=True,
                 ),
                 ColumnSpec(
                     "fig_num",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "fig_num")) or "",
+                    _to_text,
+                    ("fig_num",),
+                    default="",
                 ),
                 ColumnSpec(
                     "quantity",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "quantity", "qty")),
+                    _to_int,
+                    ("quantity", "qty"),
                 ),
             ],
         ),
@@ -422,66 +556,81 @@ def _dataset_specs() -> Sequence[DatasetSpec]:
                 ColumnSpec(
                     "fig_num",
                     "TEXT PRIMARY KEY",
-                    lambda row: _to_text(_first(row, "fig_num")),
+                    _to_text,
+                    ("fig_num",),
                     required=True,
                 ),
                 ColumnSpec(
                     "name",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "name")) or "",
+                    _to_text,
+                    ("name",),
+                    default="",
                 ),
                 ColumnSpec(
                     "num_parts",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "num_parts")),
+                    _to_int,
+                    ("num_parts",),
                 ),
                 ColumnSpec(
                     "fig_img_url",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "fig_img_url", "img_url")),
+                    _to_text,
+                    ("fig_img_url", "img_url"),
                 ),
                 ColumnSpec(
                     "fig_url",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "fig_url", "set_url", "url")),
+                    _to_text,
+                    ("fig_url", "set_url", "url"),
                 ),
                 ColumnSpec(
                     "last_modified_dt",
                     "TEXT",
-                    lambda row: _to_text(_first(row, "last_modified_dt")),
+                    _to_text,
+                    ("last_modified_dt",),
                 ),
             ],
         ),
         DatasetSpec(
             table="minifig_parts",
             filename="minifig_parts.csv",
+            group_by="fig_num",
             columns=[
                 ColumnSpec(
                     "fig_num",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "fig_num")) or "",
+                    _to_text,
+                    ("fig_num",),
+                    default="",
                     required=True,
                 ),
                 ColumnSpec(
                     "part_num",
                     "TEXT NOT NULL",
-                    lambda row: _to_text(_first(row, "part_num")) or "",
+                    _to_text,
+                    ("part_num",),
+                    default="",
                     required=True,
                 ),
                 ColumnSpec(
                     "color_id",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "color_id")),
+                    _to_int,
+                    ("color_id",),
                 ),
                 ColumnSpec(
                     "quantity",
                     "INTEGER",
-                    lambda row: _to_int(_first(row, "quantity", "qty")),
+                    _to_int,
+                    ("quantity", "qty"),
                 ),
                 ColumnSpec(
                     "is_spare",
                     "INTEGER",
-                    lambda row: _to_bool(_first(row, "is_spare")),
+                    _to_bool,
+                    ("is_spare",),
                 ),
             ],
         ),
@@ -489,15 +638,23 @@ def _dataset_specs() -> Sequence[DatasetSpec]:
 
 
 def _ensure_exists(base_dir: str, filename: str) -> str:
+    """Path of `filename`, or of its `.gz` as downloaded from Rebrickable."""
     path = os.path.join(base_dir, filename)
-    if not os.path.isfile(path):
-        raise FileNotFoundError(f"Missing required file: {filename} in {base_dir}")
-    return path
+    if os.path.isfile(path):
+        return path
+    if os.path.isfile(path + ".gz"):
+        return path + ".gz"
+    raise FileNotFoundError(f"Missing required file: {filename} in {base_dir}")
+
 
+def _open_csv(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="", encoding="utf-8")
+    return open(path, newline="", encoding="utf-8")
 
-def _load_dataset(con, base_dir: str, spec: DatasetSpec) -> int:
-    path = _ensure_exists(base_dir, spec.filename)
-    with open(path, newline="", encoding="utf-8") as fh:
+
+def _load_dataset(con, path: str, spec: DatasetSpec) -> int:
+    with _open_csv(path) as fh:
         reader = csv.DictReader(fh)
         if reader.fieldnames is None:
             raise ValueError(f"{spec.filename} has no header")
@@ -518,7 +675,7 @@ def _load_dataset(con, base_dir: str, spec: DatasetSpec) -> int:
             values: List[Any] = []
             skip_row = False
             for col in spec.columns:
-                value = col.extractor(row)
+                value = col.extract(row)
                 if col.required and value in (None, ""):
                     skip_row = True
                     break
@@ -536,26 +693,255 @@ def _load_dataset(con, base_dir: str, spec: DatasetSpec) -> int:
     return inserted
 
 
-def _build_summary_tables(con) -> Dict[str, int]:
-    summary_counts: Dict[str, int] = {}
+# -------------------------
+# Bulk mode: scratch DB, no journal, keys indexed after load
+# -------------------------
 
-    con.execute("DROP TABLE IF EXISTS inventory_parts_summary")
-    con.execute(
-        """
-        CREATE TABLE inventory_parts_summary(
-            set_num  TEXT NOT NULL,
-            part_num TEXT NOT NULL,
-            color_id INTEGER NOT NULL,
-            quantity INTEGER NOT NULL,
-            PRIMARY KEY (set_num, part_num, color_id)
-        )
-        """
+BULK_BATCH_ROWS = 50_000
+
+
+def _bulk_connect(path: str) -> sqlite3.Connection:
+    """
+    Connection for building a throwaway catalog file. Nothing is journaled or
+    fsynced: a crash leaves a corrupt scratch file that the next run deletes,
+    while the live catalog is only ever replaced by a finished one.
+    """
+    con = sqlite3.connect(path)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode = OFF")
+    con.execute("PRAGMA synchronous = OFF")
+    con.execute("PRAGMA locking_mode = EXCLUSIVE")
+    con.execute("PRAGMA temp_store = MEMORY")
+    con.execute("PRAGMA cache_size = -262144")
+    return con
+
+
+def _deferred_key(spec: DatasetSpec) -> Optional[str]:
+    """
+    Column whose TEXT PRIMARY KEY is replaced by a unique index built after
+    the load. INTEGER PRIMARY KEY is the rowid itself and stays inline.
+    """
+    for col in spec.columns:
+        if "PRIMARY KEY" in col.sql_type and not col.sql_type.startswith("INTEGER"):
+            return col.name
+    return None
+
+
+def _iter_rows(path: str, spec: DatasetSpec) -> Iterator[List[Any]]:
+    """Converted column values of every accepted CSV row, by header position."""
+    with _open_csv(path) as fh:
+        reader = csv.reader(fh)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError(f"{spec.filename} has no header")
+
+        getters = [(col.positional(header), col.required) for col in spec.columns]
+        for row in reader:
+            if spec.row_filter and not spec.row_filter(dict(zip(header, row))):
+                continue
+            values: List[Any] = []
+            for extract, required in getters:
+                value = extract(row)
+                if required and value in (None, ""):
+                    break
+                values.append(value)
+            else:
+                yield values
+
+
+def _load_dataset_bulk(con, path: str, spec: DatasetSpec) -> int:
+    """
+    Same rows as _load_dataset: csv.reader rows mapped by header position,
+    inserted in large batches, with the table's text key indexed afterwards
+    (keeping the last duplicate, as INSERT OR REPLACE would).
+    """
+    key = _deferred_key(spec)
+    col_defs = ", ".join(
+        f"{col.name} {col.sql_type.replace(' PRIMARY KEY', '') if col.name == key else col.sql_type}"
+        for col in spec.columns
     )
+    placeholders = ", ".join("?" for _ in spec.columns)
+    col_names = ", ".join(col.name for col in spec.columns)
+    insert_sql = f"INSERT OR REPLACE INTO {spec.table} ({col_names}) VALUES ({placeholders})"
+
+    con.execute(f"DROP TABLE IF EXISTS {spec.table}")
+    con.execute(f"CREATE TABLE {spec.table} ({col_defs})")
+
+    inserted = 0
+    rows = _iter_rows(path, spec)
+    while True:
+        batch = list(itertools.islice(rows, BULK_BATCH_ROWS))
+        if not batch:
+            break
+        con.executemany(insert_sql, batch)
+        inserted += len(batch)
+
+    if key:
+        index_sql = f"CREATE UNIQUE INDEX idx_{spec.table}_{key} ON {spec.table}({key})"
+        try:
+            con.execute(index_sql)
+        except sqlite3.IntegrityError:
+            con.execute(
+                f"DELETE FROM {spec.table} WHERE rowid NOT IN "
+                f"(SELECT MAX(rowid) FROM {spec.table} GROUP BY {key})"
+            )
+            con.execute(index_sql)
+            inserted = con.execute(f"SELECT COUNT(*) FROM {spec.table}").fetchone()[0]
+    return inserted
+
+
+def _copy_table(con, schema: str, table: str) -> int:
+    """
+    Recreate `schema`.`table` (with its indexes) in main and copy its rows.
+    Identical schemas let SQLite's INSERT ... SELECT transfer b-tree pages
+    instead of re-inserting row by row.
+    """
+    ddl = con.execute(
+        f"SELECT sql FROM {schema}.sqlite_master "
+        "WHERE tbl_name = ? AND sql IS NOT NULL ORDER BY type = 'index'",
+        (table,),
+    ).fetchall()
+    if not ddl:
+        return 0
+    con.execute(f"DROP TABLE IF EXISTS main.{table}")
+    for (sql,) in ddl:
+        con.execute(sql)
+    con.execute(f"INSERT INTO main.{table} SELECT * FROM {schema}.{table}")
+    return con.execute(f"SELECT COUNT(*) FROM main.{table}").fetchone()[0]
+
+
+# Tables filled outside the CSV import (slow to rebuild) that a bulk import
+# copies over from the catalog it replaces.
+CARRIED_OVER_TABLES = ("element_images",)
+
+
+def _carry_over_tables(con, live_path: str) -> Dict[str, int]:
+    if not os.path.isfile(live_path):
+        return {}
+    carried: Dict[str, int] = {}
+    con.commit()
+    con.execute("ATTACH DATABASE ? AS live", (live_path,))
+    try:
+        for table in CARRIED_OVER_TABLES:
+            if _table_exists_in(con, "live", table):
+                carried[table] = _copy_table(con, "live", table)
+        con.commit()
+    finally:
+        con.execute("DETACH DATABASE live")
+    return carried
+
+
+def _table_exists_in(con, schema: str, name: str) -> bool:
+    row = con.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ? LIMIT 1",
+        (name,),
+    ).fetchone()
+    return row is not None
+
+
+# -------------------------
+# Parallel bulk load: one worker process and one temp file per dataset
+# -------------------------
+
+def _load_dataset_file(table: str, path: str, out_path: str) -> Tuple[str, int, float]:
+    """Process-pool entry point: bulk-load one dataset into its own file."""
+    spec = next(s for s in _dataset_specs() if s.table == table)
+    t0 = time.perf_counter()
+    con = _bulk_connect(out_path)
+    try:
+        rows = _load_dataset_bulk(con, path, spec)
+        con.commit()
+    finally:
+        con.close()
+    return table, rows, time.perf_counter() - t0
+
+
+def _load_datasets_parallel(
+    paths: Dict[str, str],
+    work_dir: str,
+    workers: int,
+    on_loaded: Callable[[str, int, float], None],
+) -> Dict[str, str]:
+    """
+    Parse every dataset concurrently into work_dir/<table>.db, largest file
+    first so the long pole starts immediately. Returns table -> temp file.
+    """
+    order = sorted(paths, key=lambda t: os.path.getsize(paths[t]), reverse=True)
+    parts = {table: os.path.join(work_dir, f"{table}.db") for table in paths}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_load_dataset_file, table, paths[table], parts[table])
+            for table in order
+        ]
+        for future in as_completed(futures):
+            on_loaded(*future.result())
+    return parts
+
+
+def _merge_datasets(con, parts: Dict[str, str]) -> Dict[str, int]:
+    """ATTACH each per-dataset file and copy its table into `con`."""
+    inserted: Dict[str, int] = {}
+    con.commit()
+    for table, part_path in parts.items():
+        con.execute("ATTACH DATABASE ? AS part", (part_path,))
+        try:
+            inserted[table] = _copy_table(con, "part", table)
+            con.commit()
+        finally:
+            con.execute("DETACH DATABASE part")
+        os.remove(part_path)
+    return inserted
+
+
+def _rate_line(name: str, rows: Optional[int], seconds: float) -> str:
+    if rows is None:
+        return f"  {name:<28} {seconds:8.2f}s"
+    rate = rows / seconds if seconds > 0 else 0.0
+    return f"  {name:<28} {rows:>10,} rows {seconds:8.2f}s {rate:>12,.0f} rows/s"
+
+
+class _Timer:
+    """Collects {name: {seconds[, rows, rows_per_sec]}} and reports each line."""
+
+    def __init__(self, report: Optional[Callable[[str], None]] = None) -> None:
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.emit = report or (lambda line: None)
+
+    def record(self, name: str, rows: Optional[int], seconds: float) -> None:
+        entry: Dict[str, float] = {"seconds": round(seconds, 3)}
+        if rows is not None:
+            entry["rows"] = rows
+            entry["rows_per_sec"] = round(rows / seconds) if seconds > 0 else 0
+        self.timings[name] = entry
+        self.emit(_rate_line(name, rows, seconds))
+
+    def timed(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        rows: Callable[[Any], Optional[int]] = lambda out: None,
+    ) -> Any:
+        t0 = time.perf_counter()
+        out = fn()
+        self.record(name, rows(out), time.perf_counter() - t0)
+        return out
+
+
+# Restricts a derived-table fill to the sets listed in temp.delta_sets
+# (see import_catalog_delta).
+_DELTA_SETS = "SELECT set_num FROM temp.delta_sets"
+
+
+def _fill_inventory_parts_summary(con, scoped: bool = False) -> None:
+    """Non-spare part quantities of each set's latest inventory version."""
+    scope = f"AND inv.set_num IN ({_DELTA_SETS})" if scoped else ""
+    latest_scope = f"WHERE set_num IN ({_DELTA_SETS})" if scoped else ""
     con.execute(
-        """
+        f"""
         WITH latest AS (
             SELECT set_num, MAX(COALESCE(version, 0)) AS version
             FROM inventories
+            {latest_scope}
             GROUP BY set_num
         )
         INSERT INTO inventory_parts_summary(set_num, part_num, color_id, quantity)
@@ -570,17 +956,174 @@ def _build_summary_tables(con) -> Dict[str, int]:
         JOIN inventory_parts AS ip
           ON ip.inventory_id = inv.inventory_id
         WHERE COALESCE(ip.is_spare, 0) = 0
+          {scope}
         GROUP BY inv.set_num, ip.part_num, ip.color_id
         """
     )
-    summary_counts["inventory_parts_summary"] = con.execute(
-        "SELECT COUNT(*) FROM inventory_parts_summary"
-    ).fetchone()[0]
 
-    con.execute("CREATE INDEX IF NOT EXISTS idx_invparts_summary_set ON inventory_parts_summary(set_num)")
+
+def _fill_set_parts(con, scoped: bool = False) -> None:
+    scope = f"WHERE set_num IN ({_DELTA_SETS})" if scoped else ""
+    con.execute(
+        f"""
+        INSERT INTO set_parts(set_num, part_num, color_id, qty_per_set)
+        SELECT set_num, part_num, color_id, quantity
+        FROM inventory_parts_summary
+        {scope}
+        """
+    )
+
+
+# Most-used (part, colour) pairs, read by routers/top_common_parts*.py.
+TOP_COMMON_PARTS_LIMIT = 5000
+TOP_PARTS_PER_COLOR = 50
+TOP_PARTS_MIN_SET_COUNT = 10
+
+
+def _fill_top_common_parts(con, suffix: str = "") -> Dict[str, int]:
+    """
+    (Re)create top_common_parts and top_common_parts_by_color from set_parts
+    with one aggregation over it. `suffix` builds them under other names
+    (refresh_derived_tables stages them as <table>_next, then swaps).
+
+      top_common_parts           the TOP_COMMON_PARTS_LIMIT pairs with the
+                                 most pieces across all sets
+      top_common_parts_by_color  per colour, the TOP_PARTS_PER_COLOR parts in
+                                 the most sets (rank_in_color), kept only if
+                                 in at least TOP_PARTS_MIN_SET_COUNT sets
+    """
+    top, by_color = f"top_common_parts{suffix}", f"top_common_parts_by_color{suffix}"
+    # set_parts has one row per (set, part, colour): COUNT(*) counts sets.
+    con.execute("DROP TABLE IF EXISTS temp.part_totals")
+    con.execute(
+        """
+        CREATE TEMP TABLE part_totals AS
+        SELECT part_num,
+               color_id,
+               CAST(SUM(qty_per_set) AS INTEGER) AS total_qty,
+               COUNT(*) AS set_count
+        FROM set_parts
+        GROUP BY part_num, color_id
+        """
+    )
+
+    con.execute(f"DROP TABLE IF EXISTS {top}")
+    con.execute(
+        f"""
+        CREATE TABLE {top}(
+            part_num   TEXT NOT NULL,
+            color_id   INTEGER NOT NULL,
+            total_qty  INTEGER NOT NULL,
+            set_count  INTEGER NOT NULL,
+            updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+        """
+    )
+    con.execute(
+        f"""
+        INSERT INTO {top}(part_num, color_id, total_qty, set_count)
+        SELECT part_num, color_id, total_qty, set_count
+        FROM temp.part_totals
+        ORDER BY total_qty DESC, set_count DESC, part_num, color_id
+        LIMIT ?
+        """,
+        (TOP_COMMON_PARTS_LIMIT,),
+    )
+
+    con.execute(f"DROP TABLE IF EXISTS {by_color}")
+    con.execute(
+        f"""
+        CREATE TABLE {by_color}(
+            part_num      TEXT NOT NULL,
+            color_id      INTEGER NOT NULL,
+            total_qty     INTEGER NOT NULL,
+            set_count     INTEGER NOT NULL,
+            rank_in_color INTEGER NOT NULL,
+            updated_at    TEXT NOT NULL
+        )
+        """
+    )
+    con.execute(
+        f"""
+        INSERT INTO {by_color}(part_num, color_id, total_qty, set_count, rank_in_color, updated_at)
+        SELECT part_num, color_id, total_qty, set_count, rank_in_color, datetime('now')
+        FROM (
+            SELECT part_num, color_id, total_qty, set_count,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY color_id
+                       ORDER BY set_count DESC, total_qty DESC, part_num
+                   ) AS rank_in_color
+            FROM temp.part_totals
+            -- Ranks go by set_count first, so dropping the rare pairs before
+            -- ranking leaves the ranks of the kept ones unchanged.
+            WHERE set_count >= ?
+        )
+        WHERE rank_in_color <= ?
+        """,
+        (TOP_PARTS_MIN_SET_COUNT, TOP_PARTS_PER_COLOR),
+    )
+    con.execute("DROP TABLE temp.part_totals")
+
+    return {
+        "top_common_parts": con.execute(f"SELECT COUNT(*) FROM {top}").fetchone()[0],
+        "top_common_parts_by_color": con.execute(f"SELECT COUNT(*) FROM {by_color}").fetchone()[0],
+    }
+
+
+# Secondary indexes behind the routers' hot lookups: (name, table, columns).
+# Lookups by a table's key (sets.set_num, parts.part_num, set_parts by set,
+# element_images by part_num) are served by its primary key and need none.
+# backend/scripts/a2b_check_query_plans.py fails if a router query stops
+# using them.
+INDEX_PLAN: Tuple[Tuple[str, str, str], ...] = (
+    # discover / top common parts: inventory lots -> sets containing them
+    ("idx_set_parts_part_color", "set_parts", "part_num, color_id"),
+    ("idx_invparts_summary_part_color", "inventory_parts_summary", "part_num, color_id"),
+    ("idx_parts_cat", "parts", "part_cat_id, part_num"),
+    ("idx_part_categories_parent", "part_categories", "parent_id, name"),
+    ("idx_themes_parent", "themes", "parent_id"),
+    ("idx_sets_theme", "sets", "theme_id"),
+    ("idx_sets_base_variant", "sets", "base_set_num, variant"),
+    ("idx_tcp_part_color", "top_common_parts", "part_num, color_id"),
+    ("idx_tcp_total_qty", "top_common_parts", "total_qty DESC"),
+    ("idx_tcp_set_count", "top_common_parts", "set_count DESC"),
+    ("idx_tcp_by_color_rank", "top_common_parts_by_color", "color_id, rank_in_color"),
+)
+
+
+def _apply_index_plan(con) -> int:
+    """Create the INDEX_PLAN entries whose columns exist; returns how many did."""
+    columns: Dict[str, Set[str]] = {}
+    created = 0
+    for name, table, cols in INDEX_PLAN:
+        if table not in columns:
+            columns[table] = {row[1] for row in con.execute(f"PRAGMA table_info({table})")}
+        if not {c.split()[0] for c in cols.split(",")} <= columns[table]:
+            continue
+        con.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({cols})")
+        created += 1
+    return created
+
+
+def _build_summary_tables(con) -> Dict[str, int]:
+    summary_counts: Dict[str, int] = {}
+
+    con.execute("DROP TABLE IF EXISTS inventory_parts_summary")
     con.execute(
-        "CREATE INDEX IF NOT EXISTS idx_invparts_summary_part_color ON inventory_parts_summary(part_num, color_id)"
+        """
+        CREATE TABLE inventory_parts_summary(
+            set_num  TEXT NOT NULL,
+            part_num TEXT NOT NULL,
+            color_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            PRIMARY KEY (set_num, part_num, color_id)
+        )
+        """
     )
+    _fill_inventory_parts_summary(con)
+    summary_counts["inventory_parts_summary"] = con.execute(
+        "SELECT COUNT(*) FROM inventory_parts_summary"
+    ).fetchone()[0]
 
     con.execute("DROP TABLE IF EXISTS set_parts")
     con.execute(
@@ -594,38 +1137,1263 @@ def _build_summary_tables(con) -> Dict[str, int]:
         )
         """
     )
+    _fill_set_parts(con)
+    summary_counts["set_parts"] = con.execute("SELECT COUNT(*) FROM set_parts").fetchone()[0]
+    summary_counts.update(_fill_top_common_parts(con))
+
+    # Applied here so the later stages' joins on set_parts / parts use them;
+    # entries on columns added later (sets.base_set_num) wait for _build_indexes.
+    _apply_index_plan(con)
+
+    return summary_counts
+
+
+# Theme-name fragments that mark non-set catalog lines (gear, books, ...).
+NOISE_THEME_PATTERNS = (
+    "gear", "book", "magazine", "stationery", "keychain", "key chain",
+    "bag", "backpack", "watch", "clock",
+)
+# Theme / set-name fragments that mark minifigure and collectible lines.
+FIGURE_THEME_PATTERNS = ("minifig", "minifigure", "collectible")
+FIGURE_NAME_PATTERNS = ("minifig", "minifigure")
+
+
+def _like_any(expr: str, patterns: Sequence[str]) -> str:
+    return "(" + " OR ".join(f"LOWER({expr}) LIKE '%{p}%'" for p in patterns) + ")"
+
+
+def _build_set_flags(con) -> Dict[str, int]:
+    """
+    Search classification columns on sets, so search filters on integers:
+
+      is_valid_set  name and year present, set_num has a variant suffix ("-N")
+      is_gear       theme name looks like gear / books / bags / watches ...
+      is_figure     minifigure / collectible theme, or "minifig" in the name
+      base_set_num  set_num before the first "-"   ("75192-1" -> "75192")
+      variant       integer after the first "-"    ("75192-1" -> 1)
+    """
+    for col, sql_type in (
+        ("is_valid_set", "INTEGER NOT NULL DEFAULT 0"),
+        ("is_gear", "INTEGER NOT NULL DEFAULT 0"),
+        ("is_figure", "INTEGER NOT NULL DEFAULT 0"),
+        ("base_set_num", "TEXT"),
+        ("variant", "INTEGER"),
+    ):
+        con.execute(f"ALTER TABLE sets ADD COLUMN {col} {sql_type}")
+
+    _update_set_flags(con)
+
+    # Searchable sets only; one index per search sort order.
+    con.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_sets_search_recent
+        ON sets(year DESC, set_num, num_parts, theme_id, is_figure)
+        WHERE is_valid_set = 1 AND is_gear = 0
+        """
+    )
     con.execute(
         """
-        INSERT INTO set_parts(set_num, part_num, color_id, qty_per_set)
-        SELECT set_num, part_num, color_id, quantity
-        FROM inventory_parts_summary
+        CREATE INDEX IF NOT EXISTS idx_sets_search_popular
+        ON sets(num_parts DESC, year DESC, set_num, theme_id, is_figure)
+        WHERE is_valid_set = 1 AND is_gear = 0
         """
     )
-    summary_counts["set_parts"] = con.execute("SELECT COUNT(*) FROM set_parts").fetchone()[0]
 
-    con.execute("CREATE INDEX IF NOT EXISTS idx_set_parts_lookup ON set_parts(set_num, part_num, color_id)")
+    return {
+        "searchable_sets": con.execute(
+            "SELECT COUNT(*) FROM sets WHERE is_valid_set = 1 AND is_gear = 0"
+        ).fetchone()[0]
+    }
 
-    con.execute("CREATE INDEX IF NOT EXISTS idx_sets_num ON sets(set_num)")
-    con.execute("CREATE INDEX IF NOT EXISTS idx_sets_theme ON sets(theme_id)")
-    con.execute("CREATE INDEX IF NOT EXISTS idx_parts_num ON parts(part_num)")
 
-    return summary_counts
+def _update_set_flags(con, scoped: bool = False) -> None:
+    scope = f"WHERE set_num IN ({_DELTA_SETS})" if scoped else ""
+    con.execute(
+        f"""
+        UPDATE sets
+        SET
+            is_valid_set = (
+                name IS NOT NULL AND TRIM(name) != '' AND instr(set_num, '-') > 0
+                AND year IS NOT NULL
+            ),
+            is_gear = COALESCE((
+                SELECT {_like_any("t.name", NOISE_THEME_PATTERNS)}
+                FROM themes AS t WHERE t.theme_id = sets.theme_id
+            ), 0),
+            is_figure = (
+                COALESCE((
+                    SELECT {_like_any("t.name", FIGURE_THEME_PATTERNS)}
+                    FROM themes AS t WHERE t.theme_id = sets.theme_id
+                ), 0)
+                OR COALESCE({_like_any("name", FIGURE_NAME_PATTERNS)}, 0)
+            ),
+            base_set_num = CASE
+                WHEN instr(set_num, '-') > 0 THEN substr(set_num, 1, instr(set_num, '-') - 1)
+                ELSE set_num
+            END,
+            variant = CASE
+                WHEN instr(set_num, '-') > 0 THEN CAST(substr(set_num, instr(set_num, '-') + 1) AS INTEGER)
+            END
+        {scope}
+        """
+    )
+
+
+def _search_norm(value: Optional[str]) -> str:
+    # Same normalization as backend/app/routers/search.py:_norm_q
+    s = (value or "").strip().lower()
+    s = s.replace("-", " ").replace("_", " ")
+    s = re.sub(r"[^a-z0-9\s]", " ", s)
+    return re.sub(r"\s+", " ", s).strip()
+
+
+def _insert_sets_fts(con, scoped: bool = False) -> None:
+    themes: Dict[int, Any] = {
+        int(r[0]): (r[1], r[2])
+        for r in con.execute("SELECT theme_id, name, parent_id FROM themes")
+    }
+
+    def theme_path(theme_id: Optional[int]) -> str:
+        names: List[str] = []
+        seen = set()
+        while theme_id is not None and theme_id in themes and theme_id not in seen:
+            seen.add(theme_id)
+            name, parent_id = themes[theme_id]
+            names.append(_search_norm(name))
+            theme_id = parent_id
+        return " ".join(n for n in names if n)
+
+    scope = f"WHERE set_num IN ({_DELTA_SETS})" if scoped else ""
+    rows = (
+        (set_num, set_num, _search_norm(name), theme_path(theme_id))
+        for set_num, name, theme_id in con.execute(
+            f"SELECT set_num, name, theme_id FROM sets {scope}"
+        ).fetchall()
+    )
+    con.executemany(
+        "INSERT INTO sets_fts(set_num, num, name, themes) VALUES (?, ?, ?, ?)", rows
+    )
+
+
+def _build_search_tables(con) -> Dict[str, int]:
+    """
+    sets_fts: FTS5 index used by the set search endpoints.
+
+      set_num  UNINDEXED join key back to sets
+      num      set number ("75192-1" -> tokens 75192, 1)
+      name     normalized set name
+      themes   normalized theme name + every ancestor theme name
+
+    Skipped (search falls back to LIKE) when SQLite lacks FTS5.
+    """
+    con.execute("DROP TABLE IF EXISTS sets_fts")
+    try:
+        con.execute(
+            """
+            CREATE VIRTUAL TABLE sets_fts USING fts5(
+                set_num UNINDEXED,
+                num,
+                name,
+                themes,
+                tokenize = 'unicode61',
+                prefix = '2 3 4'
+            )
+            """
+        )
+    except sqlite3.OperationalError:
+        return {}
+
+    _insert_sets_fts(con)
+    con.execute("INSERT INTO sets_fts(sets_fts) VALUES ('optimize')")
+
+    return {"sets_fts": con.execute("SELECT COUNT(*) FROM sets_fts").fetchone()[0]}
+
+
+def _build_image_tables(con) -> Dict[str, int]:
+    """
+    Image lookups with the rules applied once, read by every router:
+
+      element_images_resolved(part_num, color_id, img_url)
+          element_images minus blank urls; exact (part_num, color_id) only
+      part_primary_image(part_num, color_id, img_url)
+          one image per part for colour-less views: the lowest non-zero
+          color_id with an image, color_id 0 only when it is the sole one
+
+    element_images is filled after import by
+    backend/scripts/a2b_install_element_images.py, which calls
+    refresh_image_tables() when it finishes. Without element_images both
+    tables are created empty.
+    """
+    con.execute("DROP TABLE IF EXISTS element_images_resolved")
+    con.execute(
+        """
+        CREATE TABLE element_images_resolved(
+            part_num TEXT NOT NULL,
+            color_id INTEGER NOT NULL,
+            img_url  TEXT NOT NULL,
+            PRIMARY KEY (part_num, color_id)
+        ) WITHOUT ROWID
+        """
+    )
+    con.execute("DROP TABLE IF EXISTS part_primary_image")
+    con.execute(
+        """
+        CREATE TABLE part_primary_image(
+            part_num TEXT PRIMARY KEY,
+            color_id INTEGER NOT NULL,
+            img_url  TEXT NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+
+    has_images = con.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'element_images'"
+    ).fetchone() is not None
+    if has_images:
+        con.execute(
+            """
+            INSERT INTO element_images_resolved(part_num, color_id, img_url)
+            SELECT part_num, color_id, img_url
+            FROM element_images
+            WHERE img_url IS NOT NULL
+              AND TRIM(img_url) <> ''
+            """
+        )
+        con.execute(
+            """
+            INSERT INTO part_primary_image(part_num, color_id, img_url)
+            SELECT part_num, color_id, img_url
+            FROM (
+                SELECT
+                    part_num,
+                    color_id,
+                    img_url,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY part_num
+                        ORDER BY color_id = 0, color_id
+                    ) AS rn
+                FROM element_images_resolved
+            )
+            WHERE rn = 1
+            """
+        )
+
+    return {
+        "element_images_resolved": con.execute(
+            "SELECT COUNT(*) FROM element_images_resolved"
+        ).fetchone()[0],
+        "part_primary_image": con.execute(
+            "SELECT COUNT(*) FROM part_primary_image"
+        ).fetchone()[0],
+    }
+
+
+# "2 x 4", "1 x 2 x 5": every adjacent pair of numbers joined by "x".
+_DIM_PAIR_RE = re.compile(r"(?=\b(\d+)\s*x\s*(\d+)\b)")
+
+
+def _dim_pairs(name: Optional[str]) -> List[Tuple[int, int]]:
+    return [(int(a), int(b)) for a, b in _DIM_PAIR_RE.findall((name or "").lower())]
+
+
+def _build_part_search(con) -> Dict[str, int]:
+    """
+    Part search index used by /api/catalog/parts/search.
+
+    parts_search (one row per part):
+      id               assigned in part_num order, so ORDER BY id sorts by part_num
+      part_num         NOCASE, so `part_num LIKE '3001%'` can use its index
+      dim_a, dim_b     footprint from the name ("Brick 2 x 4" -> 2, 4; smaller
+                       first), NULL when the name has no "N x M"
+      is_sticker       part category name contains "sticker"
+      primary_img_url  part_primary_image url, if any
+
+    parts_fts (contentless FTS5, rowid = parts_search.id):
+      name   part name
+      dims   "2x4 4x2" tokens for every adjacent "N x M" in the name, so
+             "1 x 2 x 5" matches 1x2 and 2x5 in either orientation
+
+    Needs _build_image_tables() first; refresh_image_tables() updates
+    primary_img_url. Skipped (part search falls back to LIKE) when SQLite lacks FTS5.
+    """
+    con.execute("DROP TABLE IF EXISTS parts_fts")
+    con.execute("DROP TABLE IF EXISTS parts_search")
+    try:
+        con.execute(
+            """
+            CREATE VIRTUAL TABLE parts_fts USING fts5(
+                name,
+                dims,
+                content = '',
+                tokenize = 'unicode61',
+                prefix = '2 3'
+            )
+            """
+        )
+    except sqlite3.OperationalError:
+        return {}
+
+    con.execute(
+        """
+        CREATE TABLE parts_search(
+            id              INTEGER PRIMARY KEY,
+            part_num        TEXT NOT NULL COLLATE NOCASE,
+            name            TEXT NOT NULL,
+            part_cat_id     INTEGER,
+            dim_a           INTEGER,
+            dim_b           INTEGER,
+            is_sticker      INTEGER NOT NULL DEFAULT 0,
+            primary_img_url TEXT
+        )
+        """
+    )
+
+    rows = con.execute(
+        """
+        SELECT
+            p.part_num,
+            p.name,
+            p.part_cat_id,
+            COALESCE(LOWER(pc.name) LIKE '%sticker%', 0) AS is_sticker,
+            ppi.img_url AS primary_img_url
+        FROM parts AS p
+        LEFT JOIN part_categories AS pc ON pc.part_cat_id = p.part_cat_id
+        LEFT JOIN part_primary_image AS ppi ON ppi.part_num = p.part_num
+        ORDER BY p.part_num
+        """
+    ).fetchall()
+
+    search_rows: List[Tuple[Any, ...]] = []
+    fts_rows: List[Tuple[int, str, str]] = []
+    for i, (part_num, name, part_cat_id, is_sticker, img_url) in enumerate(rows, start=1):
+        pairs = _dim_pairs(name)
+        dim_a, dim_b = sorted(pairs[0]) if pairs else (None, None)
+        dims = " ".join(f"{a}x{b} {b}x{a}" for a, b in pairs)
+        search_rows.append((i, part_num, name or "", part_cat_id, dim_a, dim_b, int(is_sticker), img_url))
+        fts_rows.append((i, name or "", dims))
+
+    con.executemany("INSERT INTO parts_search VALUES (?, ?, ?, ?, ?, ?, ?, ?)", search_rows)
+    con.executemany("INSERT INTO parts_fts(rowid, name, dims) VALUES (?, ?, ?)", fts_rows)
+    con.execute("INSERT INTO parts_fts(parts_fts) VALUES ('optimize')")
+
+    con.execute("CREATE UNIQUE INDEX idx_parts_search_num ON parts_search(part_num)")
+    con.execute("CREATE INDEX idx_parts_search_cat ON parts_search(part_cat_id)")
+
+    return {"parts_search": len(search_rows)}
+
+
+# Sample images kept per part category for the category browser tiles.
+CATEGORY_SAMPLE_POOL_SIZE = 24
+
+
+def _build_part_category_tables(con) -> Dict[str, int]:
+    """
+    Part category browsing tables:
+
+      part_category_closure(ancestor_id, descendant_id, depth)
+          every category paired with itself (depth 0) and all descendants
+      part_category_samples(part_cat_id, slot, img_url)
+          up to CATEGORY_SAMPLE_POOL_SIZE element_images_resolved urls drawn
+          at random from parts in the category or its descendants
+
+    Needs _build_image_tables() first; refresh_image_tables() redraws the pool.
+    """
+    con.execute("DROP TABLE IF EXISTS part_category_closure")
+    con.execute(
+        """
+        CREATE TABLE part_category_closure(
+            ancestor_id   INTEGER NOT NULL,
+            descendant_id INTEGER NOT NULL,
+            depth         INTEGER NOT NULL,
+            PRIMARY KEY (ancestor_id, descendant_id)
+        ) WITHOUT ROWID
+        """
+    )
+    con.execute(
+        """
+        WITH RECURSIVE closure(ancestor_id, descendant_id, depth) AS (
+            SELECT part_cat_id, part_cat_id, 0 FROM part_categories
+            UNION
+            SELECT c.ancestor_id, pc.part_cat_id, c.depth + 1
+            FROM closure AS c
+            JOIN part_categories AS pc ON pc.parent_id = c.descendant_id
+            WHERE c.depth < 32
+        )
+        INSERT OR IGNORE INTO part_category_closure(ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth FROM closure
+        """
+    )
+    con.execute(
+        "CREATE INDEX idx_part_category_closure_desc ON part_category_closure(descendant_id)"
+    )
+
+    return {
+        "part_category_closure": con.execute(
+            "SELECT COUNT(*) FROM part_category_closure"
+        ).fetchone()[0],
+        **_build_part_category_samples(con),
+    }
+
+
+def _build_part_category_samples(con) -> Dict[str, int]:
+    con.execute("DROP TABLE IF EXISTS part_category_samples")
+    con.execute(
+        """
+        CREATE TABLE part_category_samples(
+            part_cat_id INTEGER NOT NULL,
+            slot        INTEGER NOT NULL,
+            img_url     TEXT NOT NULL,
+            PRIMARY KEY (part_cat_id, slot)
+        ) WITHOUT ROWID
+        """
+    )
+    con.execute(
+        """
+        INSERT INTO part_category_samples(part_cat_id, slot, img_url)
+        SELECT ancestor_id, rn - 1, img_url
+        FROM (
+            SELECT
+                cc.ancestor_id,
+                ei.img_url,
+                ROW_NUMBER() OVER (PARTITION BY cc.ancestor_id ORDER BY RANDOM()) AS rn
+            FROM part_category_closure AS cc
+            JOIN parts AS p ON p.part_cat_id = cc.descendant_id
+            JOIN element_images_resolved AS ei ON ei.part_num = p.part_num
+        )
+        WHERE rn <= ?
+        """,
+        (CATEGORY_SAMPLE_POOL_SIZE,),
+    )
+    return {
+        "part_category_samples": con.execute(
+            "SELECT COUNT(*) FROM part_category_samples"
+        ).fetchone()[0]
+    }
+
+
+def _build_part_colors(con) -> Dict[str, int]:
+    """
+    part_colors: one row per (part_num, color_id) that has an element, keyed
+    (clustered) by part_num so the single-brick flow is one range scan.
+
+      color_name          colors.name
+      element_id          smallest element_id for the pair
+      img_url, has_image  exact element_images_resolved match
+      year_from, year_to  span over the pair's elements
+
+    Needs _build_image_tables() first; refresh_image_tables() rebuilds it.
+    """
+    con.execute("DROP TABLE IF EXISTS part_colors")
+    con.execute(
+        """
+        CREATE TABLE part_colors(
+            part_num   TEXT NOT NULL,
+            color_id   INTEGER NOT NULL,
+            color_name TEXT,
+            element_id TEXT,
+            img_url    TEXT,
+            has_image  INTEGER NOT NULL,
+            year_from  INTEGER,
+            year_to    INTEGER,
+            PRIMARY KEY (part_num, color_id)
+        ) WITHOUT ROWID
+        """
+    )
+    con.execute(
+        """
+        INSERT INTO part_colors(
+            part_num, color_id, color_name, element_id, img_url, has_image, year_from, year_to
+        )
+        SELECT
+            e.part_num,
+            e.color_id,
+            c.name,
+            e.element_id,
+            ei.img_url,
+            ei.img_url IS NOT NULL,
+            e.year_from,
+            e.year_to
+        FROM (
+            SELECT
+                part_num,
+                color_id,
+                MIN(element_id) AS element_id,
+                MIN(year_from) AS year_from,
+                MAX(year_to) AS year_to
+            FROM elements
+            WHERE color_id IS NOT NULL
+            GROUP BY part_num, color_id
+        ) AS e
+        LEFT JOIN colors AS c ON c.color_id = e.color_id
+        LEFT JOIN element_images_resolved AS ei
+          ON ei.part_num = e.part_num AND ei.color_id = e.color_id
+        """
+    )
+    return {"part_colors": con.execute("SELECT COUNT(*) FROM part_colors").fetchone()[0]}
+
+
+def _insert_set_bundles(con, scoped: bool = False) -> None:
+    set_scope = f"WHERE s.set_num IN ({_DELTA_SETS})" if scoped else ""
+    part_scope = f"WHERE sp.set_num IN ({_DELTA_SETS})" if scoped else ""
+    sets = {
+        r[0]: {
+            "set_num": r[0],
+            "name": r[1],
+            "year": r[2],
+            "num_parts": int(r[3] or 0),
+            "img_url": r[4],
+            "theme_id": r[5],
+            "theme_name": r[6],
+        }
+        for r in con.execute(
+            f"""
+            SELECT s.set_num, s.name, s.year, s.num_parts, s.set_img_url, s.theme_id, t.name
+            FROM sets AS s
+            LEFT JOIN themes AS t ON t.theme_id = s.theme_id
+            {set_scope}
+            """
+        )
+    }
+
+    rows = con.execute(
+        f"""
+        SELECT
+            sp.set_num,
+            sp.part_num,
+            p.name,
+            sp.color_id,
+            sp.qty_per_set,
+            ei.img_url,
+            c.name,
+            c.rgb,
+            COALESCE(c.is_trans, 0)
+        FROM set_parts AS sp
+        LEFT JOIN parts AS p ON p.part_num = sp.part_num
+        LEFT JOIN colors AS c ON c.color_id = sp.color_id
+        LEFT JOIN element_images_resolved AS ei
+          ON ei.part_num = sp.part_num AND ei.color_id = sp.color_id
+        {part_scope}
+        ORDER BY sp.set_num, sp.part_num, sp.color_id
+        """
+    )
+
+    def bundles() -> Iterator[Tuple[str, str, int, bytes]]:
+        for set_num, group in itertools.groupby(rows, key=lambda r: r[0]):
+            parts = [
+                {
+                    "part_num": r[1],
+                    "part_name": r[2],
+                    "color_id": int(r[3]),
+                    "quantity": int(r[4]),
+                    "part_img_url": r[5],
+                    "color_name": r[6],
+                    "rgb": r[7] or None,
+                    "is_trans": bool(r[8]),
+                }
+                for r in group
+            ]
+            bundle = {
+                "set": sets.get(set_num) or {"set_num": set_num},
+                "parts": parts,
+                "totals": {
+                    "lots": len(parts),
+                    "pieces": sum(p["quantity"] for p in parts),
+                    "lots_with_images": sum(1 for p in parts if p["part_img_url"]),
+                },
+            }
+            raw = json.dumps(bundle, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            etag = hashlib.sha1(raw).hexdigest()[:32]
+            yield set_num, etag, len(raw), gzip.compress(raw, compresslevel=6, mtime=0)
+
+    # set_parts is read through a separate cursor while inserting.
+    insert = con.cursor()
+    insert.executemany(
+        "INSERT INTO set_bundles(set_num, etag, raw_size, gz) VALUES (?, ?, ?, ?)", bundles()
+    )
+
+
+def _build_set_bundles(con) -> Dict[str, int]:
+    """
+    set_bundles: everything a set page needs, precompiled per set as gzipped
+    JSON and served byte-for-byte by /api/catalog/sets/{set_num}/bundle.
+
+      set     set_num, name, year, num_parts, img_url, theme_id, theme_name
+      parts   BOM rows: part_num, part_name, color_id, quantity, part_img_url,
+              color_name, rgb, is_trans (exact-match images only)
+      totals  lots, pieces, lots_with_images
+
+    etag is a hash of the JSON, so it only changes when the bundle does.
+    Needs _build_image_tables() first; refresh_image_tables() rebuilds it.
+    """
+    con.execute("DROP TABLE IF EXISTS set_bundles")
+    con.execute(
+        """
+        CREATE TABLE set_bundles(
+            set_num  TEXT PRIMARY KEY,
+            etag     TEXT NOT NULL,
+            raw_size INTEGER NOT NULL,
+            gz       BLOB NOT NULL
+        )
+        """
+    )
+
+    _insert_set_bundles(con)
+
+    return {"set_bundles": con.execute("SELECT COUNT(*) FROM set_bundles").fetchone()[0]}
+
+
+def _build_indexes(con) -> Dict[str, int]:
+    """
+    Last stage: the INDEX_PLAN entries the earlier stages could not create
+    yet, then ANALYZE so the planner picks them (sqlite_stat1 ships inside the
+    catalog file; the API never analyzes).
+    """
+    created = _apply_index_plan(con)
+    con.execute("ANALYZE")
+    return {"indexes": created}
+
+
+def _table_exists(con, name: str) -> bool:
+    row = con.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ? LIMIT 1", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def _refresh_image_tables(con) -> Dict[str, int]:
+    summary = _build_image_tables(con)
+    if _table_exists(con, "parts_search"):
+        con.execute(
+            """
+            UPDATE parts_search
+            SET primary_img_url = (
+                SELECT ppi.img_url
+                FROM part_primary_image AS ppi
+                WHERE ppi.part_num = parts_search.part_num
+            )
+            """
+        )
+    if _table_exists(con, "part_category_closure"):
+        summary.update(_build_part_category_samples(con))
+    if _table_exists(con, "part_colors"):
+        summary.update(_build_part_colors(con))
+    if _table_exists(con, "set_bundles"):
+        summary.update(_build_set_bundles(con))
+    # The rebuilt tables lost their statistics with the DROP.
+    _build_indexes(con)
+    return summary
+
 
+def refresh_image_tables(
+    db_path: Optional[str] = None,
+    report: Optional[Callable[[str], None]] = None,
+) -> Dict[str, int]:
+    """
+    Rebuild everything derived from element_images without a full import:
+    element_images_resolved, part_primary_image, parts_search.primary_img_url,
+    the category sample pools, part_colors and the set bundles.
 
-def import_catalog(dir_path: str) -> Dict[str, Any]:
+    The live catalog (the default) is not written to: it is copied to a new
+    version, refreshed there, validated and published. Any other `db_path` is
+    refreshed in place in a single transaction.
+    """
+    if _is_live_catalog(db_path):
+        summary, _ = _publish_copy("image tables", _refresh_image_tables, _Timer(report))
+        return summary
+    con = sqlite3.connect(db_path)
+    try:
+        with con:
+            # Explicit BEGIN: sqlite3 would run the DROP / CREATE in autocommit.
+            con.execute("BEGIN IMMEDIATE")
+            summary = _refresh_image_tables(con)
+            _stamp_catalog(con)
+    finally:
+        con.close()
+    return summary
+
+
+# Rebuilt from set_parts by refresh_derived_tables().
+DERIVED_TABLES = ("top_common_parts", "top_common_parts_by_color")
+
+
+def refresh_derived_tables(
+    db_path: Optional[str] = None,
+    progress: Optional[Callable[[str, int, int], None]] = None,
+) -> Dict[str, int]:
+    """
+    Rebuild DERIVED_TABLES on an existing catalog without a full import.
+    `progress(step, done, total)` is called as each step starts and once more
+    with done == total.
+
+    The live catalog (the default) is not written to: the tables are rebuilt
+    on a copy that is then validated and published as a new version. Any
+    other `db_path` is updated in place: the new rows are built as
+    <table>_next in a transaction of their own (readers keep using the
+    current tables meanwhile), then swapped in by DROP + RENAME in a second,
+    short one, so readers see either the old or the new table and never a
+    missing one.
+    """
+    report = progress or (lambda step, done, total: None)
+
+    if _is_live_catalog(db_path):
+        steps = ("copy", "build", "publish")
+
+        def build(con) -> Dict[str, int]:
+            counts = _fill_top_common_parts(con)
+            _apply_index_plan(con)
+            for table in DERIVED_TABLES:
+                con.execute(f"ANALYZE {table}")
+            return counts
+
+        counts, _ = _publish_copy(
+            "top_common_parts",
+            build,
+            _Timer(),
+            step=lambda name: report(name, steps.index(name), len(steps)),
+        )
+        report("done", len(steps), len(steps))
+        return counts
+
+    steps = ("build", "swap", "analyze")
+    con = sqlite3.connect(db_path)
+    try:
+        # Explicit BEGIN: sqlite3 would run the DDL below in autocommit.
+        report(steps[0], 0, len(steps))
+        with con:
+            con.execute("BEGIN")
+            counts = _fill_top_common_parts(con, suffix="_next")
+
+        report(steps[1], 1, len(steps))
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            for table in DERIVED_TABLES:
+                con.execute(f"DROP TABLE IF EXISTS {table}")
+                con.execute(f"ALTER TABLE {table}_next RENAME TO {table}")
+            _apply_index_plan(con)
+            _stamp_catalog(con)
+
+        report(steps[2], 2, len(steps))
+        with con:
+            for table in DERIVED_TABLES:
+                con.execute(f"ANALYZE {table}")
+        report("done", len(steps), len(steps))
+    finally:
+        con.close()
+    return counts
+
+
+def _stamp_catalog(con) -> Dict[str, str]:
+    """
+    catalog_meta.version: new opaque value every time catalog content changes
+    (full import, image refresh). The API derives ETags from it, so it must be
+    bumped by every stage that rewrites rows clients can see.
+    """
+    con.execute(
+        "CREATE TABLE IF NOT EXISTS catalog_meta(key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+    )
+    stamp = {
+        "version": uuid.uuid4().hex,
+        "built_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+    con.executemany(
+        "INSERT OR REPLACE INTO catalog_meta(key, value) VALUES (?, ?)", stamp.items()
+    )
+    return stamp
+
+
+def _remove_stale_builds(directory) -> None:
+    """Leftovers of an interrupted build (one importer runs at a time)."""
+    for name in os.listdir(directory):
+        if name.endswith((".db.building", ".db.building-journal")):
+            os.remove(os.path.join(directory, name))
+
+
+def _publish_build(building: str, target, timer: "_Timer") -> Dict[str, Any]:
+    """
+    Finish a build: move it to its versioned name, validate it against the
+    live catalog and, if it passes, swap it in and prune old versions. A
+    rejected build is kept as <name>.rejected for inspection.
+    """
+    os.replace(building, target)
+    live = db_path()
+    reference = str(live) if live.exists() else None
+    validation = timer.timed("validate", lambda: validate_catalog(target, reference))
+    if not validation["ok"]:
+        os.replace(target, str(target) + ".rejected")
+        raise CatalogValidationError(target, validation["problems"])
+    swap = timer.timed("publish", lambda: publish_catalog(target))
+    swap["pruned"] = prune_versions()
+    swap["validation"] = validation
+    return swap
+
+
+def _is_live_catalog(path: Optional[str]) -> bool:
+    return path is None or os.path.realpath(path) == os.path.realpath(db_path())
+
+
+def _copy_live_catalog(timer: "_Timer") -> Tuple[sqlite3.Connection, Path, str]:
+    """
+    Start a build from a copy of the live catalog: (connection, versioned
+    target, scratch path), for _publish_build once the changes are in.
+    """
+    target = new_version_path()
+    building = str(target) + ".building"
+    _remove_stale_builds(target.parent)
+    src = sqlite3.connect(f"file:{db_path()}?mode=ro", uri=True)
+    con = _bulk_connect(building)
+    try:
+        timer.timed("copy live catalog", lambda: src.backup(con))
+    finally:
+        src.close()
+    return con, target, building
+
+
+def _publish_copy(
+    name: str,
+    work: Callable[[sqlite3.Connection], Dict[str, int]],
+    timer: "_Timer",
+    step: Callable[[str], None] = lambda name: None,
+) -> Tuple[Dict[str, int], Dict[str, Any]]:
+    """
+    Run `work` on a copy of the live catalog, stamp it and publish it as a
+    new version; the published file itself is never modified. `step` is
+    called with "copy", "build" and "publish" as each one starts.
+    """
+    step("copy")
+    con, target, building = _copy_live_catalog(timer)
+    try:
+        step("build")
+        with con:
+            result = timer.timed(name, lambda: work(con))
+            _stamp_catalog(con)
+    except BaseException:
+        con.close()
+        os.remove(building)
+        raise
+    con.close()
+    step("publish")
+    return result, _publish_build(building, target, timer)
+
+
+def import_catalog(
+    dir_path: str,
+    bulk: bool = False,
+    report: Optional[Callable[[str], None]] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Load the Rebrickable CSVs (plain or .gz) in `dir_path` and rebuild every
+    derived table.
+
+    Every import builds a new versioned file (publish.py), carries
+    element_images over from the live catalog, then validates and publishes
+    it (blue/green); the live file is never written to. Default mode loads
+    it through a regular journaled connection. bulk=True turns journaling
+    off and indexes text keys after loading. In bulk mode the datasets are
+    parsed by `workers` processes (default: one per core, at most one per
+    dataset) into temp files that are merged before the derived stages;
+    workers=1 loads them one after another in this process. `report`
+    receives one progress line per table / stage.
+    """
     base_dir = os.path.abspath(os.path.expanduser(dir_path))
     specs = _dataset_specs()
-
-    for spec in specs:
-        _ensure_exists(base_dir, spec.filename)
+    paths = {spec.table: _ensure_exists(base_dir, spec.filename) for spec in specs}
+    timer = _Timer(report)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(int(workers), len(specs)))
 
     inserted: Dict[str, int] = {}
     summary: Dict[str, int] = {}
 
-    with db() as con:
-        for spec in specs:
-            inserted[spec.table] = _load_dataset(con, base_dir, spec)
-        summary = _build_summary_tables(con)
+    live_path = str(db_path())
+    target = new_version_path()
+    scratch_path = str(target) + ".building"
+    _remove_stale_builds(target.parent)
+    if bulk:
+        con = _bulk_connect(scratch_path)
+        load = _load_dataset_bulk
+    else:
+        con = sqlite3.connect(scratch_path)
+        con.row_factory = sqlite3.Row
+        load = _load_dataset
+
+    t_start = time.perf_counter()
+    try:
+        with con:
+            if bulk and workers > 1:
+                with tempfile.TemporaryDirectory(
+                    prefix=".import-", dir=os.path.dirname(scratch_path)
+                ) as work_dir:
+                    parts = timer.timed(
+                        f"load ({workers} workers)",
+                        lambda: _load_datasets_parallel(paths, work_dir, workers, timer.record),
+                    )
+                    inserted = timer.timed(
+                        "merge", lambda: _merge_datasets(con, parts), lambda n: sum(n.values())
+                    )
+            else:
+                for spec in specs:
+                    inserted[spec.table] = timer.timed(
+                        spec.table, lambda: load(con, paths[spec.table], spec), lambda n: n
+                    )
+                    if bulk:
+                        con.commit()
+            summary.update(timer.timed(
+                "carry over", lambda: _carry_over_tables(con, live_path)
+            ))
+            stages = (
+                _build_summary_tables,
+                _build_set_flags,
+                _build_search_tables,
+                _build_image_tables,
+                _build_part_search,
+                _build_part_category_tables,
+                _build_part_colors,
+                _build_set_bundles,
+                _build_indexes,
+            )
+            for stage in stages:
+                name = stage.__name__.replace("_build_", "", 1)
+                summary.update(timer.timed(name, lambda: stage(con)))
+            stamp = _stamp_catalog(con)
+    except BaseException:
+        con.close()
+        if os.path.exists(scratch_path):
+            os.remove(scratch_path)
+        raise
+    con.close()
+
+    published = _publish_build(scratch_path, target, timer)
+    timer.record("total", None, time.perf_counter() - t_start)
+
+    return {
+        "ok": True,
+        "dir": base_dir,
+        "mode": "bulk" if bulk else "default",
+        "catalog_version": stamp["version"],
+        "inserted": inserted,
+        "summary": summary,
+        "published": published,
+        "timings": timer.timings,
+    }
+
+
+# -------------------------
+# Delta import: diff the CSVs against the live catalog
+# -------------------------
+
+# Rebrickable bumps this on every edit of a set / minifig row.
+MODIFIED_COLUMN = "last_modified_dt"
+
+
+def _unit_column(spec: DatasetSpec) -> Optional[str]:
+    """
+    What a delta import replaces as a whole: one row by primary key, all rows
+    sharing spec.group_by, or (None) the entire table.
+    """
+    for col in spec.columns:
+        if "PRIMARY KEY" in col.sql_type:
+            return col.name
+    return spec.group_by
+
+
+def _same_rows(a: List[Tuple[Any, ...]], b: List[Tuple[Any, ...]]) -> bool:
+    # CSV and table usually list a unit's rows in the same order; otherwise
+    # compare them as hashed multisets (row order carries no meaning).
+    return a == b or Counter(a) == Counter(b)
+
+
+def _group_units(
+    rows: Any, idx: Optional[int], keyed: bool
+) -> Dict[Any, List[Tuple[Any, ...]]]:
+    units: Dict[Any, List[Tuple[Any, ...]]] = {}
+    for row in rows:
+        row = tuple(row)
+        unit = row[idx] if idx is not None else None
+        if keyed:
+            units[unit] = [row]  # last duplicate wins, like INSERT OR REPLACE
+        else:
+            units.setdefault(unit, []).append(row)
+    return units
+
+
+@dataclass
+class _TableDelta:
+    spec: DatasetSpec
+    unit: Optional[str]
+    # unit -> rows to write (added + updated) / rows being replaced (updated + deleted)
+    new: Dict[Any, List[Tuple[Any, ...]]]
+    old: Dict[Any, List[Tuple[Any, ...]]]
+    added: int = 0
+    updated: int = 0
+    deleted: int = 0
+
+    @property
+    def units(self) -> Set[Any]:
+        return set(self.new) | set(self.old)
+
+    def values(self, column: str) -> Set[Any]:
+        """Every value of `column` in the rows written or replaced."""
+        i = [c.name for c in self.spec.columns].index(column)
+        return {
+            row[i]
+            for side in (self.new, self.old)
+            for rows in side.values()
+            for row in rows
+            if row[i] is not None
+        }
+
+
+def _diff_dataset(con, path: str, spec: DatasetSpec) -> _TableDelta:
+    names = [col.name for col in spec.columns]
+    unit = _unit_column(spec)
+    idx = names.index(unit) if unit else None
+    keyed = unit is not None and unit != spec.group_by
+    mod = names.index(MODIFIED_COLUMN) if keyed and MODIFIED_COLUMN in names else None
+
+    new = _group_units(_iter_rows(path, spec), idx, keyed)
+    old = _group_units(con.execute(f"SELECT {', '.join(names)} FROM {spec.table}"), idx, keyed)
+
+    delta = _TableDelta(spec, unit, {}, {})
+    for key, rows in new.items():
+        before = old.get(key)
+        if before is None:
+            delta.new[key] = rows
+            delta.added += 1
+            continue
+        if mod is not None and rows[0][mod] and rows[0][mod] == before[0][mod]:
+            continue
+        if not _same_rows(rows, before):
+            delta.new[key] = rows
+            delta.old[key] = before
+            delta.updated += 1
+    for key in old.keys() - new.keys():
+        delta.old[key] = old[key]
+        delta.deleted += 1
+    return delta
+
+
+def _apply_delta(con, delta: _TableDelta) -> None:
+    spec = delta.spec
+    if not delta.new and not delta.old:
+        return
+    if delta.unit is None:
+        con.execute(f"DELETE FROM {spec.table}")
+    else:
+        if delta.unit == spec.group_by:
+            con.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{spec.table}_{delta.unit} "
+                f"ON {spec.table}({delta.unit})"
+            )
+        con.executemany(
+            f"DELETE FROM {spec.table} WHERE {delta.unit} = ?", ((key,) for key in delta.old)
+        )
+    placeholders = ", ".join("?" for _ in spec.columns)
+    col_names = ", ".join(col.name for col in spec.columns)
+    con.executemany(
+        f"INSERT OR REPLACE INTO {spec.table} ({col_names}) VALUES ({placeholders})",
+        (row for rows in delta.new.values() for row in rows),
+    )
+
+
+def _fill_delta_sets(con, set_nums: Set[str]) -> None:
+    con.execute("DELETE FROM temp.delta_sets")
+    con.executemany("INSERT INTO temp.delta_sets(set_num) VALUES (?)", ((s,) for s in set_nums))
+
+
+def _sets_using(con, column: str, values: Set[Any]) -> Set[str]:
+    if not values:
+        return set()
+    rows = con.execute(
+        f"SELECT DISTINCT set_num FROM inventory_parts_summary "
+        f"WHERE {column} IN (SELECT value FROM json_each(?))",
+        (json.dumps(sorted(values)),),
+    )
+    return {r[0] for r in rows}
+
+
+def _sets_in_themes(con, theme_ids: Set[int]) -> Set[str]:
+    if not theme_ids:
+        return set()
+    rows = con.execute(
+        """
+        WITH RECURSIVE sub(theme_id) AS (
+            SELECT value FROM json_each(?)
+            UNION
+            SELECT t.theme_id FROM themes AS t JOIN sub ON t.parent_id = sub.theme_id
+        )
+        SELECT set_num FROM sets WHERE theme_id IN (SELECT theme_id FROM sub)
+        """,
+        (json.dumps(sorted(theme_ids)),),
+    )
+    return {r[0] for r in rows}
+
+
+def import_catalog_delta(
+    dir_path: str,
+    report: Optional[Callable[[str], None]] = None,
+    manifest_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Update the catalog from a newer Rebrickable export, touching only what
+    changed: the live file is copied to a new version, updated, validated and
+    published like a bulk import (nothing is published if nothing changed).
+
+    Each table is diffed per unit (_unit_column) against its current rows;
+    sets/minifigs rows whose last_modified_dt is unchanged are skipped without
+    comparing. Changed units are deleted and re-inserted, then only the
+    affected sets get their inventory_parts_summary / set_parts rows, flags,
+    sets_fts rows and bundles recomputed. Part-level tables are rebuilt only
+    when parts, categories, elements or colors changed.
+
+    The returned manifest (also written to `manifest_path` as JSON) lists the
+    changed and removed sets and parts for targeted cache invalidation.
+    Without an existing catalog this falls back to a full bulk import.
+    """
+    base_dir = os.path.abspath(os.path.expanduser(dir_path))
+    specs = _dataset_specs()
+    paths = {spec.table: _ensure_exists(base_dir, spec.filename) for spec in specs}
+    timer = _Timer(report)
+
+    live = db_path()
+    if not live.exists():
+        return import_catalog(dir_path, bulk=True, report=report)
+    src = sqlite3.connect(f"file:{live}?mode=ro", uri=True)
+    try:
+        complete = all(
+            _table_exists(src, t) for t in [s.table for s in specs] + ["set_parts"]
+        )
+    finally:
+        src.close()
+    if not complete:
+        return import_catalog(dir_path, bulk=True, report=report)
+
+    t_start = time.perf_counter()
+    con, target, building = _copy_live_catalog(timer)
+    try:
+        with con:
+            meta: Dict[str, str] = {}
+            if _table_exists(con, "catalog_meta"):
+                meta = dict(con.execute("SELECT key, value FROM catalog_meta"))
+            previous = meta.get("version")
+            old_inventories = dict(con.execute("SELECT inventory_id, set_num FROM inventories"))
+
+            deltas: Dict[str, _TableDelta] = {}
+            for spec in specs:
+                deltas[spec.table] = timer.timed(
+                    f"diff {spec.table}", lambda: _diff_dataset(con, paths[spec.table], spec)
+                )
+            timer.timed("apply", lambda: [_apply_delta(con, d) for d in deltas.values()])
+            new_inventories = dict(con.execute("SELECT inventory_id, set_num FROM inventories"))
+
+            def inventory_sets(ids: Set[int]) -> Set[str]:
+                return {
+                    m[i] for i in ids for m in (old_inventories, new_inventories) if i in m
+                }
+
+            # Sets whose BOM may have changed.
+            bom_sets = (
+                deltas["sets"].units
+                | deltas["inventories"].values("set_num")
+                | inventory_sets(deltas["inventory_parts"].units)
+            )
+            removed_sets = {
+                key for key in deltas["sets"].old if key not in deltas["sets"].new
+            }
+
+            con.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS delta_sets(set_num TEXT PRIMARY KEY)"
+            )
+
+            def recompute_bom() -> None:
+                _fill_delta_sets(con, bom_sets)
+                for table in ("inventory_parts_summary", "set_parts"):
+                    con.execute(f"DELETE FROM {table} WHERE set_num IN ({_DELTA_SETS})")
+                _fill_inventory_parts_summary(con, scoped=True)
+                _fill_set_parts(con, scoped=True)
+
+            timer.timed("set_parts", recompute_bom)
+            if bom_sets or not _table_exists(con, "top_common_parts"):
+                timer.timed("top_common_parts", lambda: _fill_top_common_parts(con))
+
+            changed_parts = deltas["parts"].units
+            changed_colors = deltas["colors"].units
+            changed_themes = deltas["themes"].units
+            affected = (
+                bom_sets
+                | inventory_sets(deltas["inventory_minifigs"].units)
+                | _sets_using(con, "part_num", changed_parts)
+                | _sets_using(con, "color_id", changed_colors)
+                | _sets_in_themes(con, changed_themes)
+            )
+
+            def recompute_sets() -> None:
+                _fill_delta_sets(con, affected)
+                _update_set_flags(con, scoped=not changed_themes)
+                if _table_exists(con, "sets_fts"):
+                    if changed_themes:
+                        con.execute("DELETE FROM sets_fts")
+                    else:
+                        con.execute(f"DELETE FROM sets_fts WHERE set_num IN ({_DELTA_SETS})")
+                    _insert_sets_fts(con, scoped=not changed_themes)
+                if _table_exists(con, "set_bundles"):
+                    con.execute(f"DELETE FROM set_bundles WHERE set_num IN ({_DELTA_SETS})")
+                    _insert_set_bundles(con, scoped=True)
+
+            timer.timed("sets", recompute_sets)
+
+            if changed_parts or deltas["part_categories"].units:
+                timer.timed("part_search", lambda: _build_part_search(con))
+                timer.timed("part_category_tables", lambda: _build_part_category_tables(con))
+            if deltas["elements"].units or changed_colors:
+                timer.timed("part_colors", lambda: _build_part_colors(con))
+
+            con.execute("DROP TABLE temp.delta_sets")
+            changed = not previous or any(d.units for d in deltas.values())
+            if changed:
+                timer.timed("indexes", lambda: _build_indexes(con))
+                stamp = _stamp_catalog(con)
+            else:
+                # Nothing changed: keep the version so client ETags stay valid.
+                stamp = {"version": previous, "built_at": meta.get("built_at", "")}
+    except BaseException:
+        con.close()
+        os.remove(building)
+        raise
+    con.close()
+
+    published: Dict[str, Any] = {}
+    if changed:
+        published = _publish_build(building, target, timer)
+    else:
+        os.remove(building)
+    timer.record("total", None, time.perf_counter() - t_start)
 
-    return {"ok": True, "dir": base_dir, "inserted": inserted, "summary": summary}
+    manifest = {
+        "catalog_version": stamp["version"],
+        "previous_version": previous,
+        "built_at": stamp["built_at"],
+        "sets": sorted(affected - removed_sets),
+        "removed_sets": sorted(removed_sets),
+        "parts": sorted(changed_parts),
+        "tables": {
+            table: {"added": d.added, "updated": d.updated, "deleted": d.deleted}
+            for table, d in deltas.items()
+        },
+    }
+    if manifest_path:
+        tmp = manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=2)
+        os.replace(tmp, manifest_path)
 
+    return {
+        "ok": True,
+        "dir": base_dir,
+        "mode": "delta",
+        "catalog_version": stamp["version"],
+        "manifest": manifest,
+        "published": published,
+        "timings": timer.timings,
+    }
@@ -0,0 +1,207 @@
+"""
+Blue/green publishing of lego_catalog.db.
+
+Imports build a new file under data/catalogs/, validate it, and publish it by
+atomically repointing the lego_catalog.db symlink. The API resolves that
+symlink per connection (backend/app/catalog_db.py catalog_path), so it moves
+to the new version without a restart and never sees a half-built catalog.
+The previously published file is kept for rollback (publish_catalog(path)).
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .db import db_path
+
+VERSIONS_DIRNAME = "catalogs"
+# Published files kept on disk: the live one plus this many - 1 for rollback.
+KEEP_VERSIONS = 2
+# A new catalog may not lose more than 10% of the rows of a core table.
+MIN_ROW_RATIO = 0.9
+REQUIRED_TABLES = (
+    "colors",
+    "themes",
+    "parts",
+    "sets",
+    "inventories",
+    "inventory_parts",
+    "inventory_parts_summary",
+    "set_parts",
+    "top_common_parts",
+)
+# set_num -> non-spare piece count (backend/docs/BACKEND_SPECS.md known-good check).
+KNOWN_GOOD_SETS = {"71819-1": 708}
+
+
+class CatalogValidationError(Exception):
+    def __init__(self, path: Union[str, Path], problems: List[str]):
+        super().__init__(f"{path}: " + "; ".join(problems))
+        self.path = str(path)
+        self.problems = problems
+
+
+def versions_dir() -> Path:
+    path = db_path().parent / VERSIONS_DIRNAME
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def new_version_path() -> Path:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return versions_dir() / f"lego_catalog-{stamp}-{uuid.uuid4().hex[:6]}.db"
+
+
+def active_version() -> Optional[Path]:
+    """File the live catalog resolves to, or None if there is none."""
+    live = db_path()
+    if not live.exists():
+        return None
+    return Path(os.path.realpath(live))
+
+
+def _count(con, table: str) -> Optional[int]:
+    try:
+        return con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+
+
+def _pieces(con, set_num: str) -> Optional[int]:
+    try:
+        row = con.execute(
+            "SELECT COUNT(*), SUM(qty_per_set) FROM set_parts WHERE set_num = ?", (set_num,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return int(row[1]) if row[0] else None
+
+
+def validate_catalog(
+    path: Union[str, Path], reference: Union[str, Path, None] = None
+) -> Dict[str, Any]:
+    """
+    Checks a freshly built catalog before it goes live:
+
+      - SQLite quick_check passes
+      - every REQUIRED_TABLES table has rows, and none has fewer than
+        MIN_ROW_RATIO of the rows in `reference` (the live catalog)
+      - KNOWN_GOOD_SETS have their expected piece count (a known-good set
+        may only be absent if `reference` lacked it too)
+      - a sample set resolves by base number, through sets_fts and to a bundle
+
+    Returns {"ok", "counts", "problems"}.
+    """
+    problems: List[str] = []
+    counts: Dict[str, Optional[int]] = {}
+    con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    ref = sqlite3.connect(f"file:{reference}?mode=ro", uri=True) if reference else None
+    try:
+        check = con.execute("PRAGMA quick_check").fetchone()[0]
+        if check != "ok":
+            problems.append(f"quick_check: {check}")
+
+        for table in REQUIRED_TABLES:
+            n = counts[table] = _count(con, table)
+            if not n:
+                problems.append(f"{table}: {'missing' if n is None else 'empty'}")
+                continue
+            before = _count(ref, table) if ref else None
+            if before and n < before * MIN_ROW_RATIO:
+                problems.append(f"{table}: {n} rows, live catalog has {before}")
+
+        for set_num, expected in KNOWN_GOOD_SETS.items():
+            got = _pieces(con, set_num)
+            if got is None:
+                if ref is not None and _pieces(ref, set_num) is not None:
+                    problems.append(f"{set_num}: missing from set_parts")
+            elif got != expected:
+                problems.append(f"{set_num}: {got} pieces, expected {expected}")
+
+        sample = next(
+            (s for s in KNOWN_GOOD_SETS if _pieces(con, s) is not None), None
+        ) or (con.execute("SELECT set_num FROM set_parts LIMIT 1").fetchone() or [None])[0]
+        if sample:
+            base = sample.split("-", 1)[0]
+            try:
+                hit = con.execute(
+                    "SELECT 1 FROM sets WHERE base_set_num = ? AND set_num = ?", (base, sample)
+                ).fetchone()
+                if not hit:
+                    problems.append(f"{sample}: not found by base number {base}")
+                hit = con.execute(
+                    "SELECT 1 FROM sets_fts WHERE sets_fts MATCH ? AND set_num = ?",
+                    (f'num:"{base}"', sample),
+                ).fetchone()
+                if not hit:
+                    problems.append(f"{sample}: not found through sets_fts")
+                hit = con.execute(
+                    "SELECT 1 FROM set_bundles WHERE set_num = ?", (sample,)
+                ).fetchone()
+                if not hit:
+                    problems.append(f"{sample}: no set bundle")
+            except sqlite3.OperationalError as exc:
+                problems.append(f"smoke query failed: {exc}")
+    finally:
+        con.close()
+        if ref is not None:
+            ref.close()
+    return {"ok": not problems, "counts": counts, "problems": problems}
+
+
+def publish_catalog(path: Union[str, Path]) -> Dict[str, Optional[str]]:
+    """
+    Atomically point lego_catalog.db at `path` (a file in versions_dir()).
+
+    A plain-file lego_catalog.db from before blue/green is first hard-linked
+    into versions_dir(), so it stays available for rollback and readers never
+    see the name missing.
+    """
+    live = db_path()
+    target = Path(path).resolve()
+    previous = active_version()
+    if live.exists() and not live.is_symlink():
+        legacy = versions_dir() / f"lego_catalog-legacy-{uuid.uuid4().hex[:6]}.db"
+        try:
+            os.link(live, legacy)
+        except OSError:
+            shutil.copy2(live, legacy)
+        previous = legacy
+
+    swap = live.with_name(f".{live.name}.swap-{os.getpid()}")
+    if swap.is_symlink() or swap.exists():
+        swap.unlink()
+    os.symlink(os.path.relpath(target, live.parent), swap)
+    os.replace(swap, live)
+    return {"active": str(target), "previous": str(previous) if previous else None}
+
+
+def prune_versions(keep: int = KEEP_VERSIONS) -> List[str]:
+    """Delete published files beyond the newest `keep` (never the live one)."""
+    active = active_version()
+    files = sorted(
+        versions_dir().glob("lego_catalog-*.db"),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    kept = 1 if active else 0
+    removed: List[str] = []
+    for f in files:
+        if active and f.resolve() == active:
+            continue
+        if kept < keep:
+            kept += 1
+            continue
+        # Readers still on this version keep their open file until they close.
+        f.unlink()
+        removed.append(f.name)
+    for f in versions_dir().glob("lego_catalog-*.db.rejected"):
+        f.unlink()
+        removed.append(f.name)
+    return removed
@@ -199,6 +199,8 @@ export type SearchPagedResponse = {
   page_size: number;
   total: number;
   has_more: boolean;
+  // Opaque token for the next page; send it back as `cursor`.
+  next_cursor?: string | null;
 };
 
 export async function searchSetsPaged(
@@ -206,11 +208,12 @@ export async function searchSetsPaged(
   page: number,
   pageSize: number,
   fuzzy = false,
-  sort: "recent" | "popular" = "recent"
+  sort: "recent" | "popular" = "recent",
+  cursor?: string | null
 ): Promise<SearchPagedResponse> {
   const term = q.trim();
   if (!term) {
-    return { results: [], page: 1, page_size: pageSize, total: 0, has_more: false };
+    return { results: [], page: 1, page_size: pageSize, total: 0, has_more: false, next_cursor: null };
   }
 
   const params = new URLSearchParams();
@@ -219,6 +222,7 @@ export async function searchSetsPaged(
   params.set("page_size", String(pageSize));
   params.set("sort", sort);
   if (fuzzy) params.set("fuzzy", "true");
+  if (cursor) params.set("cursor", cursor);
 
   const res = await fetch(`${API_BASE}/api/search/paged?${params.toString()}`, {
     headers: { "Content-Type": "application/json" },
@@ -336,6 +340,28 @@ export async function getBuildability(set_num: string): Promise<BuildabilityResu
   return json<BuildabilityResult>(`/api/buildability/compare?set=${encodeURIComponent(set_num)}`);
 }
 
+export interface SetBundlePart {
+  part_num: string;
+  part_name?: string | null;
+  color_id: number;
+  quantity: number;
+  part_img_url?: string | null;
+  color_name?: string | null;
+  rgb?: string | null;
+  is_trans?: boolean;
+}
+
+export interface SetBundle {
+  set: SetSummary & { theme_id?: number | null; theme_name?: string | null };
+  parts: SetBundlePart[];
+  totals: { lots: number; pieces: number; lots_with_images: number };
+}
+
+// Precompiled set page payload (metadata + BOM + totals), ETag-cached by the browser.
+export async function getSetBundle(set_num: string): Promise<SetBundle> {
+  return json<SetBundle>(`/api/catalog/sets/${encodeURIComponent(set_num)}/bundle`);
+}
+
 export const apiClient = {
   get: <T>(path: string, init?: RequestInit) => json<T>(path, init),
   post: <T>(path: string, init?: RequestInit) =>
@@ -1,5 +1,5 @@
 import { API_BASE } from "../api/client";
-import React, { FormEvent, useCallback, useEffect, useMemo, useState } from "react";
+import React, { FormEvent, useCallback, useEffect, useMemo, useRef, useState } from "react";
 import {
   searchSetsPaged,
   addMySet,
@@ -29,6 +29,8 @@ const SearchPage: React.FC = () => {
   const [pageNum, setPageNum] = useState(1);
   const [total, setTotal] = useState(0);
   const [hasMore, setHasMore] = useState(false);
+  // page number -> cursor that loads it (filled from next_cursor as pages load)
+  const pageCursors = useRef<Record<number, string>>({});
 
   // membership
   const [mySetIds, setMySetIds] = useState<Set<string>>(new Set());
@@ -229,9 +231,21 @@ const SearchPage: React.FC = () => {
       setLoading(true);
       setError(null);
 
-      try {
-        const resp = await searchSetsPaged(trimmed, pageToLoad, PAGE_SIZE, false, sort);
+      if (pageToLoad === 1) pageCursors.current = {};
 
+      try {
+        const resp = await searchSetsPaged(
+          trimmed,
+          pageToLoad,
+          PAGE_SIZE,
+          false,
+          sort,
+          pageCursors.current[pageToLoad]
+        );
+
+        if (resp.next_cursor) {
+          pageCursors.current[(resp.page ?? pageToLoad) + 1] = resp.next_cursor;
+        }
         setResults(resp.results ?? []);
         setLastQuery(trimmed);
         setPageNum(resp.page ?? pageToLoad);